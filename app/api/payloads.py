@@ -0,0 +1,221 @@
+import re
+import json
+from typing import Annotated, Any, List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+# pydantic needs typing_extensions' TypedDict before Python 3.12
+from typing_extensions import NotRequired, TypedDict
+
+# Typed Recall webhook payloads, decoded straight from the raw request body with
+# `Model.model_validate_json(body)`. Unknown fields are skipped by the parser, so the
+# small envelope models only pay for the handful of fields they declare. Transcript
+# words, the bulk of every delivery, are validated into TypedDicts rather than models,
+# which keeps the worker's decode below a plain json.loads of the body.
+
+
+class _Payload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+
+class BotRef(_Payload):
+    id: Optional[str] = None
+    status: Optional[Any] = None
+
+
+# ---- realtime events (/api/webhook/recall) ----
+
+class _EnvelopeData(_Payload):
+    bot: Optional[BotRef] = None
+
+
+class RealtimeEnvelope(_Payload):
+    """Only the event name and bot id: realtime events other than transcripts and participant changes."""
+    event: Optional[str] = None
+    data: Optional[_EnvelopeData] = None
+
+    @property
+    def bot_id(self) -> Optional[str]:
+        return self.data.bot.id if self.data and self.data.bot else None
+
+
+class Timestamp(TypedDict):
+    relative: float
+
+
+class Word(TypedDict):
+    text: str
+    start_timestamp: Timestamp
+    end_timestamp: NotRequired[Optional[Timestamp]]
+
+
+class Participant(_Payload):
+    id: Union[int, str, None] = None
+    name: Optional[str] = None
+    is_host: bool = False
+    platform: Optional[str] = None
+    extra_data: Optional[dict] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "is_host": self.is_host,
+            "platform": self.platform or "unknown",
+            "extra_data": self.extra_data or {},
+        }
+
+
+class TranscriptData(_Payload):
+    words: List[Word]
+    participant: Participant
+
+    @property
+    def text(self) -> str:
+        return " ".join(w["text"] for w in self.words)
+
+    @property
+    def start_time(self) -> float:
+        return self.words[0]["start_timestamp"]["relative"]
+
+    @property
+    def end_time(self) -> float:
+        last = self.words[-1]
+        return (last.get("end_timestamp") or last["start_timestamp"])["relative"]
+
+
+class ParticipantEventData(_Payload):
+    participant: Participant
+    action: Optional[str] = None
+
+
+class _TranscriptEventData(_Payload):
+    bot: Optional[BotRef] = None
+    data: TranscriptData
+
+
+class _ParticipantEventOuter(_Payload):
+    bot: Optional[BotRef] = None
+    data: ParticipantEventData
+
+
+class TranscriptEvent(_Payload):
+    """`transcript.data`"""
+    event: Literal["transcript.data"]
+    data: _TranscriptEventData
+
+    @property
+    def bot_id(self) -> Optional[str]:
+        return self.data.bot.id if self.data.bot else None
+
+
+class ParticipantEvent(_Payload):
+    """`participant_events.join` / `participant_events.leave`"""
+    event: Literal["participant_events.join", "participant_events.leave"]
+    data: _ParticipantEventOuter
+
+    @property
+    def bot_id(self) -> Optional[str]:
+        return self.data.bot.id if self.data.bot else None
+
+
+RealtimeEvent = Union[TranscriptEvent, ParticipantEvent, RealtimeEnvelope]
+
+_REALTIME_EVENT = TypeAdapter(Annotated[Union[TranscriptEvent, ParticipantEvent], Field(discriminator="event")])
+
+# A "bot" key can only appear unescaped as a real key, never inside a JSON string
+_BOT_KEY = re.compile(rb'"bot"\s*:\s*\{')
+_decoder = json.JSONDecoder()
+
+
+def decode_realtime_event(body: bytes) -> RealtimeEvent:
+    """The delivery as its typed event, in a single parse; other event types come back as a RealtimeEnvelope."""
+    try:
+        return _REALTIME_EVENT.validate_json(body)
+    except ValidationError as e:
+        if any(error["type"] in ("union_tag_invalid", "union_tag_not_found") for error in e.errors()):
+            return RealtimeEnvelope.model_validate_json(body)
+        raise
+
+
+def realtime_bot_id(body: bytes) -> Optional[str]:
+    """The delivery's bot id, without decoding the rest of the body.
+
+    Only the `"bot": {...}` object is parsed, so a transcript's word list is
+    scanned but never decoded; the full event is decoded once, by the worker.
+    """
+    for match in _BOT_KEY.finditer(body):
+        try:
+            bot, _ = _decoder.raw_decode(body[match.end() - 1:].decode("utf-8", "replace"))
+        except ValueError:
+            continue
+        if isinstance(bot, dict) and isinstance(bot.get("id"), str):
+            return bot["id"]
+    return RealtimeEnvelope.model_validate_json(body).bot_id
+
+
+# ---- bot status events (/api/webhook/recall/bot-status) ----
+
+class _InnerStatusData(_Payload):
+    bot_id: Optional[str] = None
+    bot: Optional[BotRef] = None
+
+
+class _StatusData(_Payload):
+    bot: Optional[BotRef] = None
+    data: Optional[_InnerStatusData] = None
+    bot_id: Optional[str] = None
+    id: Optional[str] = None
+    status: Optional[Any] = None
+    sub_code: Optional[str] = None
+
+
+class BotStatusPayload(_Payload):
+    """Recall has delivered status changes in several shapes; this resolves them in one place."""
+    type: Optional[str] = None
+    event: Optional[str] = None
+    data: Optional[_StatusData] = None
+    bot: Optional[BotRef] = None
+    id: Optional[str] = None
+    status: Optional[Any] = None
+    sub_code: Optional[str] = None
+
+    @property
+    def event_type(self) -> Optional[str]:
+        # Some Recall deliveries may set `event` instead of `type`
+        return ((self.type or self.event or "").strip()) or None
+
+    @property
+    def bot_id(self) -> Optional[str]:
+        data = self.data or _StatusData()
+        inner = data.data or _InnerStatusData()
+        return (
+            (data.bot.id if data.bot else None)
+            or inner.bot_id
+            or (inner.bot.id if inner.bot else None)
+            or data.bot_id
+            or data.id
+            or (self.bot.id if self.bot else None)
+            or self.id
+        )
+
+    @property
+    def has_status(self) -> bool:
+        return self.status is not None or (self.data is not None and self.data.status is not None)
+
+    @property
+    def raw_status(self) -> Optional[str]:
+        data = self.data or _StatusData()
+        status = data.status or (self.bot.status if self.bot else None) or self.status
+        if isinstance(status, dict):
+            # Newer deliveries nest the code: {"status": {"code": "...", "sub_code": "..."}}
+            status = status.get("code")
+        return status
+
+    @property
+    def resolved_sub_code(self) -> Optional[str]:
+        data = self.data or _StatusData()
+        if data.sub_code or self.sub_code:
+            return data.sub_code or self.sub_code
+        if isinstance(data.status, dict):
+            return data.status.get("sub_code")
+        return None
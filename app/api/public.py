@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from typing import Optional
 import os
 from app.api.recall import add_bot 
 
@@ -16,6 +17,7 @@ class MeetingRequest(BaseModel):
     isTranscript: bool = False
     x_org_name: str
     saveTranscript: bool = True
+    bot_name: Optional[str] = None
 
 
 @router.get("/")
@@ -27,7 +29,7 @@ async def bot_html(request: Request):
 async def add_scooby_bot(body : MeetingRequest, request: Request):
     meeting_url = body.meeting_url
     is_transcript = body.saveTranscript or body.isTranscript
-    bot_id = await add_bot(meeting_url, is_transcript, x_org_name=body.x_org_name)
+    bot_id = await add_bot(meeting_url, is_transcript, x_org_name=body.x_org_name, bot_name=body.bot_name)
     if not bot_id:
         return {
             "message": "Scooby Bot already exists, Please remove and try again"
@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
 import os
+import uuid
+import asyncio
 import logging
 from app.service.recall_bot import RecallBot
 from app.core.manage_connections import ConnectionManager
 from app.service.gemini_live import GeminiLive
+from app.service.gemini_session import GeminiLiveSession
 from app.service.participants import ParticipantsManager
 from app.core.utils import TranscriptWriter, BotContext, InactivityMonitor
 from app.service.transcript_ingestion import TranscriptIngestion
+from app.service.streaming_ingestion import StreamingTranscriptIngestion
+from app.core.event_queue import BotEventQueues
+from app.api.payloads import BotStatusPayload, ParticipantEvent, TranscriptEvent, decode_realtime_event, realtime_bot_id
+from app.core.wake_word import get_detector
+from app.core.tools import GeminiTools, retrieval_cache
+from app.core.tool_runner import ToolRunner
+from app.core.response_shaper import ResponseShaper
+from app.core.session_registry import BotSession, SessionRegistry
+from app.core.lifecycle import BotLifecycle, IngestionJob, IngestionJobs
+from app.core.ingestion_outbox import IngestionOutbox, OutboxWorker
+from app.service.knowledge_snapshot import KnowledgeSnapshots
+from google import genai
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -16,99 +31,190 @@ TRANSCRIPTS_DIR = os.path.join(BASE_DIR, "transcripts")
 
 cm = ConnectionManager()
 rb = RecallBot()
-participants_manager = ParticipantsManager()
-bot_context = BotContext()
-
-current_bot_id = None
-current_meeting_url = None
-transcripts_enabled = False
-current_x_org_name = None
-processed_audio_segments = set()
-
-SCOOBY_VARIANTS = [
-    "scooby", "scoobie", "skuby", "skubi", "scubi",
-    "scuby", "scobee", "scobie", "skoby", "skooby",
-    "scoob", "scube", "skube", "scoobee"
-]
-
-transcript_writer = TranscriptWriter(
-    enabled_getter=lambda: transcripts_enabled,
-    transcripts_dir=TRANSCRIPTS_DIR,
-    meeting_url_getter=lambda: current_meeting_url,
-    org_name=None
-)
+registry = SessionRegistry()
 
-ti = TranscriptIngestion(org_name="")
+DEFAULT_BOT_NAME = os.getenv("SCOOBY_BOT_NAME", "scooby")
+PERSISTENT_GEMINI_SESSION = os.getenv("SCOOBY_GEMINI_PERSISTENT_SESSION", "true").lower() in ("1", "true", "yes")
+PREWARM_KNOWLEDGE_SNAPSHOT = os.getenv("SCOOBY_SNAPSHOT_PREWARM", "true").lower() in ("1", "true", "yes")
+STREAMING_INGESTION = os.getenv("SCOOBY_INGEST_STREAMING", "false").lower() in ("1", "true", "yes")
 
-model = GeminiLive(connection_manager=cm)
+# Shared across bots: one Gemini client, one set of retrieval clients, one tool thread pool
+gemini_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY")) if os.getenv("GEMINI_API_KEY") else None
+tool_executor = GeminiTools()
+tool_runner = ToolRunner()
+response_shaper = ResponseShaper()
+knowledge_snapshots = KnowledgeSnapshots(tool_executor)
 
-def _is_duplicate_audio_segment(start_time: float, end_time: float, speaker: str) -> bool:
-    """Simple check if this exact audio segment was already processed"""
-    segment_key = f"{start_time}:{end_time}:{speaker}"
-    
-    if segment_key in processed_audio_segments:
-        print(f"Duplicate audio segment detected: {start_time}s to {end_time}s from {speaker}")
+
+def _is_duplicate_audio_segment(session: BotSession, start_time: float, end_time: float, speaker: str) -> bool:
+    """Check whether this bot already processed the segment (or a near-identical resend)."""
+    if session.dedup.is_duplicate(start_time, end_time, speaker):
+        logger.debug(f"Duplicate audio segment detected: {start_time}s to {end_time}s from {speaker}")
         return True
         
-    processed_audio_segments.add(segment_key)
     return False
 
-def _set_inactive():
-    global current_bot_id, current_meeting_url, transcripts_enabled, current_x_org_name   
-    current_bot_id = None
-    current_meeting_url = None
-    transcripts_enabled = False
-    current_x_org_name = None
+# Ended sessions whose queued transcript events are still being written
+_ending_sessions: dict[str, BotSession] = {}
+
+
+def _session_for_events(bot_id: str) -> BotSession | None:
+    return registry.get(bot_id) or _ending_sessions.get(bot_id)
+
+
+def _end_session(bot_id: str) -> BotSession | None:
+    """Drop the bot from the registry and release its resources; queued events still drain (see ingestion)."""
+    # No new input; pending questions are cancelled but queued transcript lines must still reach the file
+    event_queues.close(bot_id, drain=("events",))
+    session = registry.remove(bot_id)
+    if session is not None:
+        _ending_sessions[bot_id] = session
+        if PREWARM_KNOWLEDGE_SNAPSHOT:
+            knowledge_snapshots.release(session.org_name)
+    registry.print_active_bots()
+    return session
+
+
+def _on_transcript_ingested(org_name: str) -> None:
+    """New knowledge landed for the org: drop cached retrievals, mark its vector replica stale, rebuild its snapshot."""
+    retrieval_cache.invalidate_org(org_name)
+    tool_executor.replicas.invalidate(org_name)
+    knowledge_snapshots.invalidate(org_name)
+
+
+async def _ingest_session_transcript(session: BotSession, job: IngestionJob) -> dict | None:
     try:
-        bot_context.clear()
-        BotContext.remove_model_context(model)
-    except Exception:
-        pass
-
-# Inactivity monitor instance
-inactivity_monitor = InactivityMonitor(
-    get_current_bot_id=lambda: current_bot_id,
-    participants_manager=participants_manager,
-    model=model,
-    transcript_writer=transcript_writer,
-    bot_name="scooby",
-    remove_bot=rb.handle_bot_removal,
-    on_cleared=lambda: (_set_inactive(), bot_context.print_active_bot()),
+        # The transcript is only complete once the bot's queued events have been written
+        job.set_step("draining_events")
+        try:
+            await event_queues.drained(session.bot_id)
+        finally:
+            _ending_sessions.pop(session.bot_id, None)
+        return await BotContext.ingest_and_cleanup_transcript(
+            session.bot_id,
+            transcripts_enabled=session.transcripts_enabled,
+            transcripts_dir=TRANSCRIPTS_DIR,
+            meeting_url=session.meeting_url,
+            ti=session.ingestion,
+            x_org_name=session.org_name,
+            transcript_writer=session.transcript_writer,
+            logger=logger,
+            on_ingested=_on_transcript_ingested,
+            on_step=job.set_step,
+            outbox=ingestion_outbox,
+        )
+    finally:
+        # Nothing to ingest (or it was skipped): still stop the periodic chunk uploads
+        if isinstance(session.ingestion, StreamingTranscriptIngestion):
+            await session.ingestion.stop()
+        await session.wait_closed()
+
+
+async def _ingest_outbox_row(row: dict, job: IngestionJob) -> dict | None:
+    """Retry a recorded ingestion (or one left behind by a restart) from the files on disk."""
+    return await BotContext.ingest_and_cleanup_transcript(
+        row["bot_id"],
+        transcripts_enabled=True,
+        transcripts_dir=TRANSCRIPTS_DIR,
+        meeting_url=None,
+        ti=TranscriptIngestion(org_name=row["org_name"]),
+        x_org_name=row["org_name"],
+        transcript_writer=None,
+        logger=logger,
+        on_ingested=_on_transcript_ingested,
+        on_step=job.set_step,
+        outbox=ingestion_outbox,
+        transcript_paths=row["files"],
+    )
+
+
+ingestion_jobs = IngestionJobs()
+ingestion_outbox = IngestionOutbox(
+    os.getenv("SCOOBY_OUTBOX_PATH") or os.path.join(TRANSCRIPTS_DIR, "ingestion_outbox.sqlite3")
+)
+outbox_worker = OutboxWorker(
+    ingestion_outbox, ingestion_jobs, transcripts_dir=TRANSCRIPTS_DIR, ingest_files=_ingest_outbox_row
+)
+lifecycle = BotLifecycle(
+    registry=registry,
+    jobs=ingestion_jobs,
+    end_session=_end_session,
+    ingest=_ingest_session_transcript,
 )
 
-async def add_bot(meeting_url: str, is_transcript: bool = False, *, x_org_name: str) -> str | None:
-    """Create a Recall bot and update local module state."""
-    global current_bot_id, current_meeting_url, transcripts_enabled, current_x_org_name
-    
-    # Enforce single active bot at a time
-    if current_bot_id is not None:
-        # A bot is already active; do not create another
+
+def _build_session(
+    bot_id: str, meeting_url: str, is_transcript: bool, x_org_name: str, bot_name: str, channel: str
+) -> BotSession:
+    model = GeminiLive(
+        connection_manager=cm,
+        client=gemini_client,
+        tool_executor=tool_executor,
+        tool_runner=tool_runner,
+        response_shaper=response_shaper,
+    )
+    model.bot_id = bot_id
+    model.org_name = x_org_name
+    model.audio_channel = channel
+    session = BotSession(
+        bot_id=bot_id,
+        meeting_url=meeting_url,
+        org_name=x_org_name,
+        bot_name=bot_name,
+        transcripts_enabled=is_transcript,
+        model=model,
+        participants=ParticipantsManager(),
+        transcript_writer=None,
+        ingestion=TranscriptIngestion(org_name=x_org_name),
+        channel=channel,
+    )
+    session.transcript_writer = TranscriptWriter(
+        enabled_getter=lambda: session.transcripts_enabled,
+        transcripts_dir=TRANSCRIPTS_DIR,
+        meeting_url_getter=lambda: session.meeting_url,
+        org_name=x_org_name,
+    )
+    if STREAMING_INGESTION and is_transcript:
+        # Intake opens on join and chunks go up during the call; only the tail is left at the end
+        session.ingestion = StreamingTranscriptIngestion(session.ingestion, session.transcript_writer)
+    session.monitor = InactivityMonitor(
+        get_current_bot_id=lambda: bot_id if registry.get(bot_id) is session else None,
+        participants_manager=session.participants,
+        model=model,
+        transcript_writer=session.transcript_writer,
+        bot_name=bot_name,
+        remove_bot=rb.handle_bot_removal,
+        on_cleared=lambda: lifecycle.terminate(bot_id, reason="inactivity"),
+    )
+    if PERSISTENT_GEMINI_SESSION:
+        session.gemini_session = GeminiLiveSession(model, bot_id)
+    return session
+
+
+async def add_bot(
+    meeting_url: str, is_transcript: bool = False, *, x_org_name: str, bot_name: str | None = None
+) -> str | None:
+    """Create a Recall bot and register a session for it."""
+    # One bot per meeting, and a global cap on concurrent meetings
+    if registry.find_by_meeting(meeting_url) is not None or registry.is_full():
         return None
-    bot_id = await rb.add_bots(meeting_url)
+    bot_name = bot_name or DEFAULT_BOT_NAME
+    # The bot id is only known after creation, so the audio channel gets its own id up front
+    channel = uuid.uuid4().hex
+    bot_id = await rb.add_bots(meeting_url, bot_name=bot_name, channel=channel)
     if bot_id:
-        current_bot_id = bot_id
-        current_meeting_url = meeting_url
-        transcripts_enabled = is_transcript
-        current_x_org_name = x_org_name
-        transcript_writer.org_name = current_x_org_name
-        try:
-            bot_context.bot_id = bot_id
-            bot_context.meeting_url = meeting_url
-            bot_context.transcripts_enabled = is_transcript
-        except Exception:
-            pass
-        participants_manager.reset()
-        try:
-            model.participants = list(participants_manager.list)
-        except Exception:
-            pass
-        try:
-            model.bot_id = bot_id
-        except Exception:
-            pass
-        bot_context.print_active_bot()
+        session = _build_session(bot_id, meeting_url, is_transcript, x_org_name, bot_name, channel)
+        registry.add(session)
+        if PREWARM_KNOWLEDGE_SNAPSHOT:
+            # Builds in the background; tool calls use whatever is already warm
+            session.model.knowledge_snapshot = knowledge_snapshots.acquire(x_org_name)
+        if session.gemini_session is not None:
+            session.gemini_session.start()
+        if isinstance(session.ingestion, StreamingTranscriptIngestion):
+            session.ingestion.start()
+        registry.print_active_bots()
         # Initialize inactivity tracking and start watcher
-        inactivity_monitor.start(bot_id)
+        session.monitor.start(bot_id)
     return bot_id
 
 
@@ -116,12 +222,18 @@ async def add_bot(meeting_url: str, is_transcript: bool = False, *, x_org_name:
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     connection_id = f"ws_{id(websocket)}"
-    cm.add_connection(connection_id, websocket)
+    # ?format=binary: audio arrives as binary frames (see app/core/audio_frames.py) instead of base64 JSON
+    binary = websocket.query_params.get("format") == "binary"
+    # ?channel=<id>: the bot's output-media page, which should only hear that bot
+    channel = websocket.query_params.get("channel") or None
+    cm.add_connection(connection_id, websocket, binary=binary, channel=channel)
 
     try:
-        await websocket.send_json({
+        # Goes through the connection's queue so its writer task stays the only sender
+        cm.send_to(connection_id, {
             "type": "status",
             "connected": True,
+            "audio_format": "binary" if binary else "json",
             "bot_type": "scooby"
         })
 
@@ -136,168 +248,55 @@ async def websocket_endpoint(websocket: WebSocket):
         cm.remove_connection(connection_id)
 
 
+# Explicit bot.* events mapped to the status they imply
+STATUS_EVENT_MAP = {
+    "bot.joining_call": "joining_call",
+    "bot.in_call": "in_call",
+    "bot.in_call_not_recording": "in_call",
+    "bot.in_call_recording": "in_call_recording",
+    "bot.call_ended": "call_ended",
+    "bot.done": "done",
+    "bot.fatal": "fatal",
+}
+
+
 @router.post("/api/webhook/recall/bot-status")
 async def recall_bot_status_webhook(request: Request):
     logger.info("Received BOT STATUS webhook from Recall.ai")
     try:
-        payload = await request.json()
-        logger.debug(f"Bot Status Payload: {payload}")
-        # Some Recall deliveries may set `event` instead of `type`
-        event_type = (payload.get("type") or payload.get("event") or "").strip() or None
-        data = payload.get("data", {}) or {}
+        body = await request.body()
+        logger.debug(f"Bot Status Payload: {body!r}")
+        payload = BotStatusPayload.model_validate_json(body)
+        event_type = payload.event_type
         if not event_type:
             # Log full payload at INFO to aid debugging when schema varies
-            logger.info(f"Bot Status Payload (no event/type): {payload}")
+            logger.info(f"Bot Status Payload (no event/type): {body!r}")
 
         # Accept common variants and explicit bot.* events
         normalized_event = (event_type or "").lower() if event_type else None
-        is_status_event = normalized_event in {"bot.status_change", "status_change", "bot.status"} or ("status" in data or "status" in payload)
+        is_status_event = normalized_event in {"bot.status_change", "status_change", "bot.status"} or payload.has_status
 
         # Map explicit bot.* events to a synthetic status when Recall sends them
-        mapped_status = None
-        if normalized_event and normalized_event.startswith("bot."):
-            status_map = {
-                "bot.joining_call": "joining_call",
-                "bot.in_call": "in_call",
-                "bot.in_call_not_recording": "in_call",
-                "bot.in_call_recording": "in_call_recording",
-                "bot.call_ended": "call_ended",
-                "bot.done": "done",
-                "bot.fatal": "fatal",
-            }
-            mapped_status = status_map.get(normalized_event)
-            if mapped_status:
-                is_status_event = True
+        mapped_status = STATUS_EVENT_MAP.get(normalized_event) if normalized_event else None
+        if mapped_status:
+            is_status_event = True
 
         if is_status_event:
-            # Extract fields from multiple possible locations
-            inner_data = (data.get("data", {}) or {})
-            bot_id = (
-                (data.get("bot", {}) or {}).get("id")
-                or inner_data.get("bot_id")
-                or (inner_data.get("bot", {}) or {}).get("id")
-                or data.get("bot_id")
-                or data.get("id")
-                or (payload.get("bot", {}) or {}).get("id")
-                or payload.get("id")
-            )
-            status = (
-                mapped_status
-                or data.get("status")
-                or (payload.get("bot", {}) or {}).get("status")
-                or payload.get("status")
-            )
-            sub_code = data.get("sub_code") or payload.get("sub_code")
+            bot_id = payload.bot_id
+            status = mapped_status or payload.raw_status
+            sub_code = payload.resolved_sub_code
 
             logger.info(f"Bot {bot_id} status changed to: {status}")
             if bot_id is None:
-                logger.debug(f"Bot Status Payload (missing bot_id): {payload}")
-                # Single active bot model: fallback to current_bot_id to avoid missing cleanup
-                if current_bot_id:
-                    bot_id = current_bot_id
-                    logger.debug(f"Falling back to current_bot_id for status handling: {bot_id}")
+                logger.debug(f"Bot Status Payload (missing bot_id): {body!r}")
+                # With exactly one active bot the event can only be about it; avoid missing cleanup
+                if len(registry) == 1:
+                    bot_id = next(iter(registry)).bot_id
+                    logger.debug(f"Falling back to the only active bot for status handling: {bot_id}")
             if sub_code:
                 logger.info(f"Sub code: {sub_code}")
 
-            if current_bot_id and bot_id != current_bot_id:
-                logger.debug(f"Ignoring status for non-current bot {bot_id}")
-                return {"status": "ok"}
-
-            if status == "joining_call":
-                logger.info(f"Bot {bot_id} is joining the meeting")
-
-            elif status == "in_call":
-                logger.info(f"Bot {bot_id} successfully joined the meeting")
-
-            elif status == "in_call_recording":
-                logger.info(f"Bot {bot_id} is now recording")
-
-            elif status == "call_ended":
-                logger.info(f"Bot {bot_id} call ended")
-                try:
-                    await BotContext.ingest_and_cleanup_transcript(
-                        bot_id,
-                        transcripts_enabled=transcripts_enabled,
-                        transcripts_dir=TRANSCRIPTS_DIR,
-                        meeting_url=current_meeting_url,
-                        ti=ti,
-                        x_org_name=current_x_org_name,
-                        transcript_writer=transcript_writer,
-                        logger=logger,
-                    )
-                    participants_manager.reset()
-                    try:
-                        model.participants = []
-                    except Exception:
-                        pass
-                    # stop inactivity monitor
-                    try:
-                        inactivity_monitor.stop()
-                    except Exception:
-                        pass
-                    _set_inactive()
-                except Exception:
-                    logger.exception("Error while handling call_ended cleanup")
-                bot_context.print_active_bot()
-
-            elif status == "done":
-                logger.info(f"Bot {bot_id} finished successfully")
-                try:
-                    await BotContext.ingest_and_cleanup_transcript(
-                        bot_id,
-                        transcripts_enabled=transcripts_enabled,
-                        transcripts_dir=TRANSCRIPTS_DIR,
-                        meeting_url=current_meeting_url,
-                        ti=ti,
-                        x_org_name=current_x_org_name,
-                        transcript_writer=transcript_writer,
-                        logger=logger,
-                    )
-                    participants_manager.reset()
-                    try:
-                        model.participants = []
-                    except Exception:
-                        pass
-                    _set_inactive()
-                    try:
-                        inactivity_monitor.stop()
-                    except Exception:
-                        pass
-                except Exception:
-                    logger.exception("Error while handling done cleanup")
-                bot_context.print_active_bot()
-
-            elif status == "fatal":
-                logger.error(f"Bot {bot_id} encountered a fatal error")
-                if sub_code:
-                    logger.error(f"Fatal error reason: {sub_code}")
-                try:
-                    await BotContext.ingest_and_cleanup_transcript(
-                        bot_id,
-                        transcripts_enabled=transcripts_enabled,
-                        transcripts_dir=TRANSCRIPTS_DIR,
-                        meeting_url=current_meeting_url,
-                        ti=ti,
-                        x_org_name=current_x_org_name,
-                        transcript_writer=transcript_writer,
-                        logger=logger,
-                    )
-                    participants_manager.reset()
-                    try:
-                        model.participants = []
-                    except Exception:
-                        pass
-                    _set_inactive()
-                    try:
-                        inactivity_monitor.stop()
-                    except Exception:
-                        pass
-                except Exception:
-                    logger.exception("Error while handling fatal cleanup")
-                bot_context.print_active_bot()
-
-            else:
-                logger.warning(f"Unhandled bot status: {status}")
+            lifecycle.handle_status(bot_id, status, sub_code)
 
         else:
             logger.warning(f"Unhandled bot status event type: {event_type}")
@@ -308,93 +307,158 @@ async def recall_bot_status_webhook(request: Request):
     return {"status": "ok"}
 
 
+async def _handle_realtime_event(bot_id: str, body: bytes) -> None:
+    """Decode and process one realtime event; runs on the bot's ordered event worker."""
+    session = _session_for_events(bot_id)
+    if session is None:
+        logger.debug(f"Dropping queued realtime event for inactive bot {bot_id}")
+        return
+
+    # The body's only full decode
+    event = decode_realtime_event(body)
+    event_type = event.event
+
+    if isinstance(event, TranscriptEvent):
+        session.monitor.record_activity()
+        session.monitor.record_transcript()
+        transcript = event.data.data
+        speaker = transcript.participant.name
+        spoken_text = transcript.text
+        
+        start_time = transcript.start_time
+        end_time = transcript.end_time
+    
+        logger.debug(f"Processing audio segment: {start_time}s to {end_time}s from {speaker}")
+        
+        if _is_duplicate_audio_segment(session, start_time, end_time, speaker):
+            logger.info(f"Skipping duplicate audio segment from {speaker}")
+            return
+        
+        logger.info(f"Transcribed text from {speaker}: {spoken_text}")
+        session.transcript_writer.save_line(
+            speaker, spoken_text, speaker_id=transcript.participant.id, start=start_time, end=end_time
+        )
+        
+        wake = get_detector(session.bot_name).find(spoken_text)
+        if wake is not None:
+            logger.info(f"Scooby mentioned by {speaker} at offset {wake.start}: {spoken_text}")
+            # Answer on a separate lane so a slow Gemini turn never stalls transcript intake
+            await event_queues.enqueue(bot_id, wake.question or spoken_text, lane="questions")
+
+        else:
+            session.model.chat_history.append(
+                {"role": "user", "content": spoken_text.strip(), "type": "audio_response"}
+            )
+
+    elif isinstance(event, ParticipantEvent) and event_type == "participant_events.join":
+        session.monitor.record_activity()
+        joined = event.data.data
+
+        if joined.action == "join":
+            session.participants.add(joined.participant.as_dict())
+            session.sync_participants()
+            logger.info(f"Total participants for bot {bot_id}: {len(session.participants.list)}")
+
+    elif isinstance(event, ParticipantEvent) and event_type == "participant_events.leave":
+        session.monitor.record_activity()
+        participant = event.data.data.participant
+
+        if (participant.name or "").lower() != session.bot_name.lower():
+            session.participants.mark_left(participant.id)
+            session.sync_participants()
+            p = session.participants.get(participant.id)
+            if p:
+                logger.info(f"Participant left: {p['name']}")
+
+    else:
+        logger.warning(f"Unhandled realtime event: {event_type}")
+
+
+async def _answer_question(bot_id: str, spoken_text: str) -> None:
+    """Run one Gemini turn for a wake-word question; runs on the bot's question worker."""
+    session = registry.get(bot_id)
+    if session is None:
+        logger.debug(f"Dropping queued question for inactive bot {bot_id}")
+        return
+    try:
+        logger.debug(f"Sending to Gemini: {spoken_text}")
+        if session.gemini_session is not None:
+            await session.gemini_session.ask(spoken_text)
+        else:
+            await session.model.connect_to_gemini(text=spoken_text)
+        logger.debug("Sent to Gemini successfully")
+    except Exception as e:
+        logger.exception(f"Error sending to Gemini: {e}")
+
+
+event_queues = BotEventQueues(handlers={
+    "events": _handle_realtime_event,
+    "questions": _answer_question,
+})
+
+
+@router.get("/api/ingestions")
+async def list_ingestions():
+    return ingestion_jobs.list()
+
+
+@router.get("/api/ingestions/outbox")
+async def ingestion_outbox_metrics():
+    return await outbox_worker.metrics()
+
+
+@router.get("/api/ingestions/{bot_id}")
+async def get_ingestion(bot_id: str):
+    job = ingestion_jobs.get(bot_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No ingestion job for bot {bot_id}")
+    return job.as_dict()
+
+
+@router.get("/api/metrics/queues")
+async def queue_metrics():
+    return event_queues.metrics()
+
+
+@router.get("/api/metrics/tools")
+async def tool_metrics():
+    return {
+        "tools": tool_runner.metrics(),
+        "response_shaping": response_shaper.metrics(),
+        "vector_replicas": tool_executor.replicas.metrics(),
+        "retrieval_cache": retrieval_cache.metrics(),
+    }
+
+
+@router.get("/api/metrics/snapshots")
+async def snapshot_metrics():
+    return knowledge_snapshots.metrics()
+
+
+@router.get("/api/metrics/websockets")
+async def websocket_metrics():
+    return cm.metrics()
+
+
 @router.post("/api/webhook/recall")
 async def recall_webhook(request: Request):
     logger.info("Received REALTIME webhook from Recall.ai")
     try:
-        payload = await request.json()
-        logger.debug(f"Realtime Payload: {payload}")
-
-        event_type = payload.get("event")
-        data = payload.get("data", {})
-        bot_info = data.get("bot", {})
-        bot_id = bot_info.get("id")
+        body = await request.body()
+        logger.debug(f"Realtime Payload: {body!r}")
 
-        if current_bot_id is None:
-            logger.debug("No current bot set; ignoring realtime event")
-            return {"status": "ok"}
+        # Only the bot id is read here; the worker decodes the body, once
+        bot_id = realtime_bot_id(body)
 
-        if current_bot_id and bot_id != current_bot_id:
-            logger.debug(f"Ignoring realtime event for non-current bot {bot_id}")
+        if bot_id not in registry:
+            logger.debug(f"Ignoring realtime event for unknown bot {bot_id}")
             return {"status": "ok"}
 
-        if event_type == "transcript.data":
-            inactivity_monitor.record_activity()
-            inactivity_monitor.record_transcript()
-            words = payload["data"]["data"]["words"]
-            speaker = payload["data"]["data"]["participant"]["name"]
-            spoken_text = " ".join([w["text"] for w in words])
-            
-            start_time = words[0]["start_timestamp"]["relative"]
-            end_time = words[-1]["end_timestamp"]["relative"]
-        
-            print(f"Processing audio segment: {start_time}s to {end_time}s from {speaker}")
-            
-            if _is_duplicate_audio_segment(start_time, end_time, speaker):
-                print(f"Skipping duplicate audio segment from {speaker}")
-                return {"status": "ok"}
-            
-            logger.info(f"Transcribed text from {speaker}: {spoken_text}")
-            transcript_writer.save_line(speaker, spoken_text)
-            
-            if any(alias in spoken_text.lower() for alias in SCOOBY_VARIANTS):
-                logger.info(f"Scooby mentioned by {speaker}: {spoken_text}")
-                try:
-                    logger.debug(f"Sending to Gemini: {spoken_text}")
-                    await model.connect_to_gemini(text=spoken_text)
-                    logger.debug("Sent to Gemini successfully")
-                except Exception as e:
-                    logger.exception(f"Error sending to Gemini: {e}")
-
-            else:
-                model.chat_history.append(
-                    {"role": "user", "content": spoken_text.strip(), "type": "audio_response"}
-                )
-
-        elif event_type == "participant_events.join":
-            inactivity_monitor.record_activity()
-            participant_data = payload["data"]["data"]["participant"]
-            action = payload["data"]["data"]["action"]
-
-            if action == "join":
-                participants_manager.add(participant_data)
-                try:
-                    model.participants = list(participants_manager.list)
-                except Exception:
-                    pass
-                logger.info(f"Total participants: {len(participants_manager.list)}")
-                bot_context.print_active_bot()
-
-        elif event_type == "participant_events.leave":
-            inactivity_monitor.record_activity()
-            participant_data = payload["data"]["data"]["participant"]
-            participant_id = participant_data["id"]
-            participant_name = participant_data["name"]
-
-            if participant_name.lower() != "scooby":
-                participants_manager.mark_left(participant_id)
-                try:
-                    model.participants = list(participants_manager.list)
-                except Exception:
-                    pass
-                p = participants_manager.get(participant_id)
-                if p:
-                    logger.info(f"Participant left: {p['name']}")
-            bot_context.print_active_bot()
-
-        else:
-            logger.warning(f"Unhandled realtime event: {event_type}")
+        await event_queues.enqueue(bot_id, body)
 
+    except asyncio.QueueFull:
+        # Transcript events are never dropped; a non-2xx reply lets Recall resend it later
+        raise HTTPException(status_code=503, detail=f"Event queue for bot {bot_id} is full")
     except Exception as e:
         logger.exception(f"Error processing realtime webhook: {e}")
 
@@ -0,0 +1,49 @@
+import struct
+from typing import Dict, Tuple
+
+# Binary /ws audio frame: a fixed little-endian header followed by raw PCM bytes.
+#
+#   offset  size  field
+#   0       1     version (AUDIO_FRAME_VERSION)
+#   1       1     sample format (SAMPLE_FORMAT_*)
+#   2       2     channels
+#   4       4     sample rate (Hz)
+#   8       4     stream id (one per model turn)
+#   12      4     sequence number within the stream
+#   16      ...   PCM payload
+#
+# Control messages (status, model_speaking) stay JSON text frames.
+
+AUDIO_FRAME_VERSION = 1
+SAMPLE_FORMAT_PCM16LE = 1
+
+_HEADER = struct.Struct("<BBHIII")
+HEADER_SIZE = _HEADER.size
+
+
+def encode_audio_frame(
+    pcm: bytes,
+    *,
+    stream_id: int,
+    seq: int,
+    sample_rate: int = 24000,
+    channels: int = 1,
+    sample_format: int = SAMPLE_FORMAT_PCM16LE,
+) -> bytes:
+    return _HEADER.pack(
+        AUDIO_FRAME_VERSION, sample_format, channels, sample_rate, stream_id & 0xFFFFFFFF, seq & 0xFFFFFFFF
+    ) + pcm
+
+
+def decode_audio_frame(frame: bytes) -> Tuple[Dict, memoryview]:
+    version, sample_format, channels, sample_rate, stream_id, seq = _HEADER.unpack_from(frame)
+    if version != AUDIO_FRAME_VERSION:
+        raise ValueError(f"Unsupported audio frame version: {version}")
+    header = {
+        "sample_format": sample_format,
+        "channels": channels,
+        "sample_rate": sample_rate,
+        "stream_id": stream_id,
+        "seq": seq,
+    }
+    return header, memoryview(frame)[HEADER_SIZE:]
@@ -0,0 +1,243 @@
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(value: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivially different phrasings share a key."""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", str(value or "").lower())).strip()
+
+
+class TTLCache:
+    """LRU cache whose entries also expire after a TTL.
+
+    Tools run on the event loop; the lock keeps it safe for code that reaches
+    it from executor threads.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: str, value: Any, *, org: str = "", ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._data[key] = (expires_at, org, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_org(self, org: str) -> int:
+        with self._lock:
+            stale = [k for k, (_, entry_org, _) in self._data.items() if entry_org == org]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCacheTier:
+    """Shared cache tier backed by a local SQLite file so several workers can reuse warm entries.
+
+    Every method blocks on SQLite; RetrievalCache calls them off the event loop.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS retrieval_cache ("
+            " key TEXT PRIMARY KEY, org TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS retrieval_cache_org ON retrieval_cache (org)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM retrieval_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return _MISSING
+        return json.loads(row[0])
+
+    def apply(self, writes: List[Tuple]) -> None:
+        """Apply queued writes in order, in one transaction.
+
+        Each is ("set", key, org, value, ttl_seconds) or ("invalidate", org); an
+        invalidation also drops expired entries.
+        """
+        now = time.time()
+        with self._lock:
+            for write in writes:
+                if write[0] == "set":
+                    _, key, org, value, ttl_seconds = write
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO retrieval_cache (key, org, value, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, org, json.dumps(value, default=str), now + ttl_seconds),
+                    )
+                else:
+                    self._conn.execute(
+                        "DELETE FROM retrieval_cache WHERE org = ? OR expires_at <= ?", (write[1], now)
+                    )
+            self._conn.commit()
+
+
+class RetrievalCache:
+    """Two-tier cache in front of the Pinecone and Neo4j retrieval tools.
+
+    Keys are scoped by org: vector searches by normalized query text, graph
+    lookups by the sorted, normalized set of event names. The in-process LRU
+    tier is always on; the shared SQLite tier is enabled by pointing
+    SCOOBY_RETRIEVAL_CACHE_DB at a file. Entries for an org are dropped when
+    a transcript ingestion for that org finishes.
+
+    The shared tier never blocks the event loop: a local miss reads it in a
+    worker thread, and writes and invalidations are queued and applied in
+    order by one background task, batched into a single transaction.
+
+    Configuration (env with defaults):
+    - SCOOBY_RETRIEVAL_CACHE_SIZE (default 512)
+    - SCOOBY_RETRIEVAL_CACHE_TTL_SECONDS (default 600)
+    - SCOOBY_RETRIEVAL_CACHE_DB (default unset, no shared tier)
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        shared_path: Optional[str] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SCOOBY_RETRIEVAL_CACHE_TTL_SECONDS", "600"))
+        self.local = TTLCache(
+            maxsize or int(os.getenv("SCOOBY_RETRIEVAL_CACHE_SIZE", "512")),
+            self.ttl_seconds,
+        )
+        self.shared: Optional[SqliteCacheTier] = None
+        shared_path = shared_path or os.getenv("SCOOBY_RETRIEVAL_CACHE_DB")
+        if shared_path:
+            try:
+                self.shared = SqliteCacheTier(shared_path)
+            except Exception as e:
+                logger.warning(f"Shared retrieval cache disabled ({shared_path}): {e}")
+        self.shared_hits = 0
+        self._writes: List[Tuple] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def query_key(kind: str, org: Optional[str], query: str) -> str:
+        return f"{kind}|{org or ''}|{normalize_text(query)}"
+
+    @staticmethod
+    def events_key(kind: str, org: Optional[str], event_names: Iterable[str]) -> str:
+        names = sorted({normalize_text(n) for n in (event_names or [])})
+        return f"{kind}|{org or ''}|" + "\x1f".join(names)
+
+    async def get(self, key: str) -> Any:
+        """Return the cached value or None on a miss."""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.shared is not None:
+            try:
+                value = await asyncio.to_thread(self.shared.get, key)
+            except Exception as e:
+                logger.debug(f"Shared retrieval cache read failed: {e}")
+                value = _MISSING
+            if value is not _MISSING:
+                self.shared_hits += 1
+                org = key.split("|", 2)[1]
+                self.local.set(key, value, org=org)
+                return value
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        org = key.split("|", 2)[1]
+        self.local.set(key, value, org=org)
+        if self.shared is not None:
+            self._queue_write(("set", key, org, value, self.ttl_seconds))
+
+    def invalidate_org(self, org: Optional[str]) -> None:
+        removed = self.local.invalidate_org(org or "")
+        if self.shared is not None:
+            self._queue_write(("invalidate", org or ""))
+        logger.info(f"Invalidated {removed} retrieval cache entries for org {org}")
+
+    def _queue_write(self, write: Tuple) -> None:
+        self._writes.append(write)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts): write through
+            self._apply(self._take_writes())
+            return
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    def _take_writes(self) -> List[Tuple]:
+        writes, self._writes = self._writes, []
+        return writes
+
+    def _apply(self, writes: List[Tuple]) -> None:
+        try:
+            self.shared.apply(writes)
+        except Exception as e:
+            logger.debug(f"Shared retrieval cache update failed: {e}")
+
+    async def _write_loop(self) -> None:
+        # Writes queued while a batch is in flight go out in the next one, after it
+        while self._writes:
+            await asyncio.to_thread(self._apply, self._take_writes())
+
+    def metrics(self) -> dict:
+        return {
+            "size": len(self.local),
+            "maxsize": self.local.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.local.hits,
+            "misses": self.local.misses,
+            "evictions": self.local.evictions,
+            "shared_enabled": self.shared is not None,
+            "shared_hits": self.shared_hits,
+            "shared_writes_queued": len(self._writes),
+        }
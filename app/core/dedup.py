@@ -0,0 +1,83 @@
+import os
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BucketKey = Tuple[int, int]
+
+
+class SegmentDeduper:
+    """Sliding-window duplicate detector for one bot's transcript segments.
+
+    Segments are stored as compact integer keys (speaker hash, start/end in
+    milliseconds) bucketed by start time, so both exact resends and
+    near-duplicates whose timestamps shifted by up to the tolerance are
+    caught with a constant number of lookups. Entries expire after the
+    window and the total is capped, so memory stays flat for long meetings.
+
+    Configuration (env with defaults):
+    - SCOOBY_DEDUP_WINDOW_SECONDS (default 300)
+    - SCOOBY_DEDUP_MAX_SEGMENTS (default 2000)
+    - SCOOBY_DEDUP_TOLERANCE_SECONDS (default 0.25)
+    """
+
+    def __init__(
+        self,
+        window_seconds: Optional[float] = None,
+        max_segments: Optional[int] = None,
+        tolerance_seconds: Optional[float] = None,
+    ) -> None:
+        self.window_seconds = window_seconds or float(os.getenv("SCOOBY_DEDUP_WINDOW_SECONDS", "300"))
+        self.max_segments = max_segments or int(os.getenv("SCOOBY_DEDUP_MAX_SEGMENTS", "2000"))
+        tolerance = tolerance_seconds if tolerance_seconds is not None else float(
+            os.getenv("SCOOBY_DEDUP_TOLERANCE_SECONDS", "0.25")
+        )
+        self._tol_ms = max(1, int(tolerance * 1000))
+        self._order: Deque[Tuple[float, _BucketKey, int, int]] = deque()
+        self._buckets: Dict[_BucketKey, List[Tuple[int, int]]] = {}
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _expire(self, now: float) -> None:
+        while self._order and (self._order[0][0] <= now or len(self._order) > self.max_segments):
+            _, bucket_key, start_ms, end_ms = self._order.popleft()
+            entries = self._buckets.get(bucket_key)
+            if entries:
+                try:
+                    entries.remove((start_ms, end_ms))
+                except ValueError:
+                    pass
+                if not entries:
+                    del self._buckets[bucket_key]
+
+    def is_duplicate(self, start_time: float, end_time: float, speaker: str) -> bool:
+        """Return True if this segment (or one within tolerance) was already seen; otherwise record it."""
+        now = time.monotonic()
+        self._expire(now)
+
+        speaker_key = hash(speaker)
+        start_ms = int(round(float(start_time) * 1000))
+        end_ms = int(round(float(end_time) * 1000))
+        bucket = start_ms // self._tol_ms
+
+        for b in (bucket - 1, bucket, bucket + 1):
+            for s, e in self._buckets.get((speaker_key, b), ()):
+                if abs(s - start_ms) <= self._tol_ms and abs(e - end_ms) <= self._tol_ms:
+                    self.duplicates += 1
+                    return True
+
+        bucket_key = (speaker_key, bucket)
+        self._buckets.setdefault(bucket_key, []).append((start_ms, end_ms))
+        self._order.append((now + self.window_seconds, bucket_key, start_ms, end_ms))
+        if len(self._order) > self.max_segments:
+            self._expire(now)
+        return False
+
+    def clear(self) -> None:
+        self._order.clear()
+        self._buckets.clear()
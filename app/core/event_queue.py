@@ -0,0 +1,211 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _LaneStats:
+    __slots__ = (
+        "enqueued", "processed", "failed", "dropped", "waited", "max_depth", "last_wait_ms", "last_run_ms"
+    )
+
+    def __init__(self) -> None:
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.waited = 0  # lossless lanes: enqueues that had to wait for room
+        self.max_depth = 0
+        self.last_wait_ms = 0.0
+        self.last_run_ms = 0.0
+
+
+class BotEventQueues:
+    """Bounded, per-bot ordered event queues drained by dedicated worker tasks.
+
+    Every (bot_id, lane) pair owns one asyncio.Queue and one worker, so events
+    for a bot are handled in arrival order while other bots, and other lanes
+    of the same bot, keep moving. Webhooks only enqueue and return.
+
+    Lanes named in `lossless` (the transcript "events" lane by default) are
+    never trimmed: they get a larger bound, and a full one makes `enqueue`
+    wait for room (backpressure on the webhook) and, after the put timeout,
+    raise asyncio.QueueFull so the sender can retry. Other lanes
+    ("questions") apply the overflow policy. Every dropped or discarded item
+    is counted and logged.
+
+    Closing a bot stops it taking new items; lanes named in `drain` keep
+    working through what is already queued until `drained()` is awaited,
+    the rest are cancelled straight away.
+
+    Configuration (env with defaults):
+    - SCOOBY_EVENT_QUEUE_MAXSIZE (default 1000): lossy lanes
+    - SCOOBY_EVENT_QUEUE_LOSSLESS_MAXSIZE (default 10000)
+    - SCOOBY_EVENT_QUEUE_OVERFLOW: "drop_oldest" or "drop_newest" (default "drop_oldest"), lossy lanes only
+    - SCOOBY_EVENT_QUEUE_PUT_TIMEOUT_SECONDS (default 10): longest a lossless enqueue waits for room
+    - SCOOBY_EVENT_QUEUE_DRAIN_SECONDS (default 30): longest `drained()` waits before discarding the rest
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[str, Any], Awaitable[None]]],
+        *,
+        maxsize: Optional[int] = None,
+        overflow: Optional[str] = None,
+        lossless: Iterable[str] = ("events",),
+    ) -> None:
+        self._handlers = handlers
+        self.maxsize = maxsize or int(os.getenv("SCOOBY_EVENT_QUEUE_MAXSIZE", "1000"))
+        self.lossless_maxsize = int(os.getenv("SCOOBY_EVENT_QUEUE_LOSSLESS_MAXSIZE", "10000"))
+        self.lossless: Set[str] = set(lossless)
+        self.put_timeout = float(os.getenv("SCOOBY_EVENT_QUEUE_PUT_TIMEOUT_SECONDS", "10"))
+        self.overflow = (overflow or os.getenv("SCOOBY_EVENT_QUEUE_OVERFLOW", "drop_oldest")).lower()
+        if self.overflow not in self.OVERFLOW_POLICIES:
+            logger.warning(f"Unknown overflow policy {self.overflow!r}; using drop_oldest")
+            self.overflow = "drop_oldest"
+
+        self.drain_seconds = float(os.getenv("SCOOBY_EVENT_QUEUE_DRAIN_SECONDS", "30"))
+        self._closed: Set[str] = set()
+        self._queues: Dict[Tuple[str, str], asyncio.Queue] = {}
+        self._workers: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._stats: Dict[Tuple[str, str], _LaneStats] = {}
+
+    def _maxsize(self, lane: str) -> int:
+        return self.lossless_maxsize if lane in self.lossless else self.maxsize
+
+    async def enqueue(self, bot_id: str, item: Any, lane: str = "events") -> bool:
+        """Queue an item for the bot's lane. Returns False if it was dropped.
+
+        Lossy lanes never wait. A full lossless lane waits up to the put
+        timeout for room, then raises asyncio.QueueFull.
+        """
+        if lane not in self._handlers:
+            raise ValueError(f"Unknown event lane: {lane}")
+        if bot_id in self._closed:
+            logger.debug(f"Bot {bot_id} is closed; not queueing {lane} event")
+            return False
+        key = (bot_id, lane)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self._maxsize(lane))
+            self._queues[key] = queue
+            self._stats[key] = _LaneStats()
+            self._workers[key] = asyncio.create_task(self._worker(key, queue))
+        stats = self._stats[key]
+        entry = (time.perf_counter(), item)
+
+        if queue.full() and lane in self.lossless:
+            stats.waited += 1
+            logger.warning(f"Event queue full for bot {bot_id} ({lane}); waiting for room")
+            try:
+                await asyncio.wait_for(queue.put(entry), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"Event queue for bot {bot_id} ({lane}) still full after {self.put_timeout}s; rejecting event"
+                )
+                raise asyncio.QueueFull
+            stats.enqueued += 1
+            stats.max_depth = max(stats.max_depth, queue.qsize())
+            return True
+
+        if queue.full():
+            stats.dropped += 1
+            if self.overflow == "drop_newest":
+                logger.warning(
+                    f"Event queue full for bot {bot_id} ({lane}); dropping newest event ({stats.dropped} dropped)"
+                )
+                return False
+            try:
+                queue.get_nowait()
+                queue.task_done()
+            except asyncio.QueueEmpty:
+                pass
+            logger.warning(
+                f"Event queue full for bot {bot_id} ({lane}); dropped oldest event ({stats.dropped} dropped)"
+            )
+
+        queue.put_nowait(entry)
+        stats.enqueued += 1
+        stats.max_depth = max(stats.max_depth, queue.qsize())
+        return True
+
+    async def _worker(self, key: Tuple[str, str], queue: asyncio.Queue) -> None:
+        bot_id, lane = key
+        handler = self._handlers[lane]
+        stats = self._stats[key]
+        while True:
+            enqueued_at, item = await queue.get()
+            started = time.perf_counter()
+            stats.last_wait_ms = (started - enqueued_at) * 1000
+            try:
+                await handler(bot_id, item)
+                stats.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.failed += 1
+                logger.exception(f"Error handling {lane} event for bot {bot_id}: {e}")
+            finally:
+                stats.last_run_ms = (time.perf_counter() - started) * 1000
+                queue.task_done()
+
+    def _discard(self, key: Tuple[str, str]) -> None:
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        task = self._workers.pop(key, None)
+        if task is not None and task is not current:
+            task.cancel()
+        queue = self._queues.pop(key, None)
+        self._stats.pop(key, None)
+        if queue is not None and queue.qsize():
+            logger.warning(f"Discarded {queue.qsize()} queued {key[1]} events for bot {key[0]}")
+
+    def close(self, bot_id: str, *, drain: Iterable[str] = ()) -> None:
+        """Stop taking items for the bot; cancel its lanes except those in `drain`, which finish their queue."""
+        self._closed.add(bot_id)
+        keep = set(drain)
+        for key in [k for k in self._queues if k[0] == bot_id]:
+            if key[1] not in keep:
+                self._discard(key)
+        if not any(k[0] == bot_id for k in self._queues):
+            self._closed.discard(bot_id)
+
+    async def drained(self, bot_id: str) -> None:
+        """Wait for a closed bot's draining lanes to empty, then release them."""
+        for key in [k for k in self._queues if k[0] == bot_id]:
+            queue = self._queues[key]
+            try:
+                await asyncio.wait_for(queue.join(), timeout=self.drain_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(f"{key[1]} lane for bot {bot_id} did not drain in {self.drain_seconds}s")
+            self._discard(key)
+        self._closed.discard(bot_id)
+
+    def depth(self, bot_id: str, lane: str = "events") -> int:
+        queue = self._queues.get((bot_id, lane))
+        return queue.qsize() if queue is not None else 0
+
+    def metrics(self) -> Dict[str, Dict[str, Dict]]:
+        out: Dict[str, Dict[str, Dict]] = {}
+        for (bot_id, lane), queue in self._queues.items():
+            s = self._stats[(bot_id, lane)]
+            out.setdefault(bot_id, {})[lane] = {
+                "depth": queue.qsize(),
+                "maxsize": queue.maxsize,
+                "max_depth": s.max_depth,
+                "enqueued": s.enqueued,
+                "processed": s.processed,
+                "failed": s.failed,
+                "dropped": s.dropped,
+                "waited": s.waited,
+                "last_wait_ms": round(s.last_wait_ms, 3),
+                "last_run_ms": round(s.last_run_ms, 3),
+            }
+        return out
@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.transcript_segments import SegmentedJsonlSink
+
+logger = logging.getLogger(__name__)
+
+# Row states: pending (waiting for an attempt, possibly after a backoff), running,
+# done (kept until expires_at so repeat deliveries are recognised) and failed (gave up).
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS ingestion_outbox ("
+    " bot_id TEXT PRIMARY KEY, org_name TEXT, files TEXT NOT NULL, state TEXT NOT NULL,"
+    " attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL DEFAULT 0, last_error TEXT,"
+    " created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL)",
+    "CREATE INDEX IF NOT EXISTS ingestion_outbox_due ON ingestion_outbox (state, next_attempt_at)",
+)
+
+
+class IngestionOutbox:
+    """Durable record of transcript ingestions, in a local SQLite file.
+
+    A bot's row is written before its first ingestion attempt, so a transcript
+    whose ingestion was interrupted by a crash or restart is still known at the
+    next start. Completed bots stay recorded (and are skipped if their
+    ingestion is requested again) until their expiry passes. Every read and
+    commit runs in a worker thread, so the event loop never waits on SQLite.
+
+    Configuration (env with defaults):
+    - SCOOBY_OUTBOX_MAX_ATTEMPTS (default 6)
+    - SCOOBY_OUTBOX_RETRY_SECONDS (default 30): first backoff, doubled per attempt up to an hour
+    - SCOOBY_OUTBOX_DONE_TTL_SECONDS (default 604800)
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.MAX_ATTEMPTS = int(os.getenv("SCOOBY_OUTBOX_MAX_ATTEMPTS", "6"))
+        self.RETRY_SECONDS = float(os.getenv("SCOOBY_OUTBOX_RETRY_SECONDS", "30"))
+        self.DONE_TTL_SECONDS = float(os.getenv("SCOOBY_OUTBOX_DONE_TTL_SECONDS", "604800"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            self._conn.commit()
+        return cur
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def _write(self, sql: str, params: tuple = ()) -> int:
+        """Write in a worker thread, off the event loop; returns the affected row count."""
+        return await asyncio.to_thread(lambda: self._execute(sql, params).rowcount)
+
+    async def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self._fetch, sql, params)
+
+    @staticmethod
+    def _as_dict(row: sqlite3.Row) -> Dict:
+        out = dict(row)
+        out["files"] = json.loads(out["files"])
+        return out
+
+    async def get(self, bot_id: str) -> Optional[Dict]:
+        rows = await self._query("SELECT * FROM ingestion_outbox WHERE bot_id = ?", (bot_id,))
+        return self._as_dict(rows[0]) if rows else None
+
+    async def begin(self, bot_id: str, org_name: Optional[str], files: List[str]) -> bool:
+        """Record an attempt for the bot. False if it is already done or another attempt is running."""
+        now = time.time()
+        updated = await self._write(
+            "INSERT INTO ingestion_outbox (bot_id, org_name, files, state, attempts, created_at, updated_at)"
+            " VALUES (?, ?, ?, 'running', 1, ?, ?)"
+            " ON CONFLICT (bot_id) DO UPDATE SET"
+            "  files = excluded.files, state = 'running', attempts = attempts + 1, updated_at = excluded.updated_at"
+            " WHERE state IN ('pending', 'failed')",
+            (bot_id, org_name, json.dumps(files), now, now),
+        )
+        return updated == 1
+
+    async def enqueue(self, bot_id: str, org_name: Optional[str], files: List[str]) -> bool:
+        """Add a pending ingestion unless the bot is already recorded."""
+        now = time.time()
+        inserted = await self._write(
+            "INSERT OR IGNORE INTO ingestion_outbox (bot_id, org_name, files, state, created_at, updated_at)"
+            " VALUES (?, ?, ?, 'pending', ?, ?)",
+            (bot_id, org_name, json.dumps(files), now, now),
+        )
+        return inserted == 1
+
+    async def complete(self, bot_id: str) -> None:
+        now = time.time()
+        await self._write(
+            "UPDATE ingestion_outbox SET state = 'done', last_error = NULL, updated_at = ?, expires_at = ?"
+            " WHERE bot_id = ?",
+            (now, now + self.DONE_TTL_SECONDS, bot_id),
+        )
+
+    def _fail(self, bot_id: str, error: Optional[str]) -> str:
+        # Read and update under one lock hold so the backoff matches the attempt count
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM ingestion_outbox WHERE bot_id = ?", (bot_id,)).fetchone()
+            attempts = row["attempts"] if row else self.MAX_ATTEMPTS
+            state = "failed" if attempts >= self.MAX_ATTEMPTS else "pending"
+            now = time.time()
+            delay = min(self.RETRY_SECONDS * (2 ** max(attempts - 1, 0)), 3600.0)
+            self._conn.execute(
+                "UPDATE ingestion_outbox SET state = ?, last_error = ?, next_attempt_at = ?, updated_at = ?"
+                " WHERE bot_id = ?",
+                (state, (error or "")[:500], now + delay, now, bot_id),
+            )
+            self._conn.commit()
+        return state
+
+    async def fail(self, bot_id: str, error: Optional[str]) -> str:
+        """Schedule a retry with backoff, or give up after MAX_ATTEMPTS. Returns the new state."""
+        return await asyncio.to_thread(self._fail, bot_id, error)
+
+    async def abandon(self, bot_id: str, error: str) -> None:
+        """Stop retrying the bot (e.g. its transcript files are gone)."""
+        await self._write(
+            "UPDATE ingestion_outbox SET state = 'failed', last_error = ?, updated_at = ? WHERE bot_id = ?",
+            (error, time.time(), bot_id),
+        )
+
+    async def due(self, limit: int) -> List[Dict]:
+        rows = await self._query(
+            "SELECT * FROM ingestion_outbox WHERE state = 'pending' AND next_attempt_at <= ?"
+            " ORDER BY next_attempt_at LIMIT ?",
+            (time.time(), limit),
+        )
+        return [self._as_dict(row) for row in rows]
+
+    async def recover(self) -> int:
+        """Attempts that were running when the process stopped go back to pending."""
+        return await self._write(
+            "UPDATE ingestion_outbox SET state = 'pending', next_attempt_at = 0 WHERE state = 'running'"
+        )
+
+    async def purge_expired(self) -> int:
+        return await self._write("DELETE FROM ingestion_outbox WHERE state = 'done' AND expires_at <= ?", (time.time(),))
+
+    async def known_files(self) -> set:
+        rows = await self._query("SELECT files FROM ingestion_outbox")
+        return {path for (files,) in rows for path in json.loads(files)}
+
+    async def counts(self) -> Dict[str, int]:
+        rows = await self._query("SELECT state, COUNT(*) FROM ingestion_outbox GROUP BY state")
+        return {state: count for state, count in rows}
+
+
+def find_orphaned_transcripts(transcripts_dir: str, known_files: set) -> List[Dict]:
+    """Transcripts on disk that no outbox row refers to, as {bot_id, org_name, files}.
+
+    Text transcripts are Scooby_<org>_<id>.txt; jsonl transcripts are found
+    through their Scooby_<org>_<id>.index.json.
+    """
+    orphans = []
+    try:
+        names = sorted(os.listdir(transcripts_dir))
+    except FileNotFoundError:
+        return orphans
+    for name in names:
+        if not name.startswith("Scooby_"):
+            continue
+        if name.endswith(".index.json"):
+            base = name[: -len(".index.json")]
+            sink = SegmentedJsonlSink(transcripts_dir, base, 0)
+            files = [path for path in sink.files() if os.path.exists(path)]
+        elif name.endswith(".txt"):
+            base = name[: -len(".txt")]
+            files = [os.path.join(transcripts_dir, name)]
+        else:
+            continue
+        if not files or any(path in known_files for path in files):
+            continue
+        org_name = base[len("Scooby_"):].rsplit("_", 1)[0]
+        orphans.append({"bot_id": f"orphan:{base}", "org_name": org_name, "files": files})
+    return orphans
+
+
+class OutboxWorker:
+    """Drains the outbox: retries failed ingestions and picks up transcripts left behind by a restart.
+
+    On start, interrupted attempts are put back to pending and transcript
+    files that no row refers to are enqueued. Every poll it purges expired
+    completed rows and submits due rows to IngestionJobs, which bounds how
+    many ingestions run at once.
+
+    Configuration (env with defaults):
+    - SCOOBY_OUTBOX_POLL_SECONDS (default 10)
+    """
+
+    def __init__(
+        self,
+        outbox: IngestionOutbox,
+        jobs,
+        *,
+        transcripts_dir: str,
+        ingest_files: Callable[[Dict, object], Awaitable[Optional[dict]]],
+    ) -> None:
+        self.outbox = outbox
+        self.jobs = jobs
+        self.transcripts_dir = transcripts_dir
+        self._ingest_files = ingest_files
+        self.POLL_SECONDS = float(os.getenv("SCOOBY_OUTBOX_POLL_SECONDS", "10"))
+        self._task: Optional[asyncio.Task] = None
+        self.resubmitted = 0
+
+    async def start(self) -> None:
+        recovered = await self.outbox.recover()
+        orphans = await asyncio.to_thread(
+            find_orphaned_transcripts, self.transcripts_dir, await self.outbox.known_files()
+        )
+        for orphan in orphans:
+            await self.outbox.enqueue(orphan["bot_id"], orphan["org_name"], orphan["files"])
+        if recovered or orphans:
+            logger.info(f"Ingestion outbox: {recovered} interrupted and {len(orphans)} orphaned transcripts queued")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.outbox.purge_expired()
+                await self.drain()
+            except Exception as e:
+                logger.exception(f"Ingestion outbox poll failed: {e}")
+            await asyncio.sleep(self.POLL_SECONDS)
+
+    async def drain(self) -> int:
+        """Submit every due row that has no ingestion in flight."""
+        submitted = 0
+        for row in await self.outbox.due(limit=500):
+            job = self.jobs.get(row["bot_id"])
+            if job is not None and job.task is not None:
+                continue
+            self.jobs.submit(
+                row["bot_id"],
+                row["org_name"],
+                lambda job, row=row: self._ingest_files(row, job),
+                reason="outbox_retry",
+                replace_finished=True,
+            )
+            submitted += 1
+        self.resubmitted += submitted
+        return submitted
+
+    async def metrics(self) -> Dict:
+        return {"path": self.outbox.path, "states": await self.outbox.counts(), "resubmitted": self.resubmitted}
@@ -0,0 +1,193 @@
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Recall statuses after which the bot is gone from the meeting
+TERMINAL_STATUSES = {"call_ended", "done", "fatal"}
+
+
+class IngestionJob:
+    """Progress of one background transcript ingestion."""
+
+    def __init__(self, bot_id: str, org_name: Optional[str], reason: str) -> None:
+        self.bot_id = bot_id
+        self.org_name = org_name
+        self.reason = reason
+        self.state = "pending"
+        self.step: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def set_step(self, step: str) -> None:
+        self.step = step
+
+    def as_dict(self) -> Dict:
+        return {
+            "bot_id": self.bot_id,
+            "org_name": self.org_name,
+            "reason": self.reason,
+            "state": self.state,
+            "step": self.step,
+            "success": (self.result or {}).get("success") if self.result is not None else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class IngestionJobs:
+    """Runs transcript ingestions as tracked background tasks, one per bot.
+
+    Jobs are scheduled immediately but at most SCOOBY_INGEST_CONCURRENCY run
+    at once; the rest wait in the "pending" state, so a burst of meetings
+    ending together neither blocks webhooks nor floods the intake API.
+
+    Configuration (env with defaults):
+    - SCOOBY_INGESTION_JOB_HISTORY (default 500): finished jobs kept for status queries
+    - SCOOBY_INGEST_CONCURRENCY (default 8)
+    """
+
+    def __init__(self, history: Optional[int] = None, concurrency: Optional[int] = None) -> None:
+        self.history = history or int(os.getenv("SCOOBY_INGESTION_JOB_HISTORY", "500"))
+        self.concurrency = concurrency or int(os.getenv("SCOOBY_INGEST_CONCURRENCY", "8"))
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    def get(self, bot_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(bot_id)
+
+    def list(self) -> List[Dict]:
+        return [job.as_dict() for job in self._jobs.values()]
+
+    def submit(
+        self,
+        bot_id: str,
+        org_name: Optional[str],
+        run: Callable[[IngestionJob], Awaitable[Optional[dict]]],
+        *,
+        reason: str,
+        replace_finished: bool = False,
+    ) -> IngestionJob:
+        """Schedule `run(job)` unless this bot already has a job; returns the bot's job either way.
+
+        With `replace_finished`, a bot whose job has finished gets a new one (outbox retries).
+        """
+        existing = self._jobs.get(bot_id)
+        if existing is not None and (existing.task is not None or not replace_finished):
+            return existing
+        job = IngestionJob(bot_id, org_name, reason)
+        self._jobs.pop(bot_id, None)
+        self._jobs[bot_id] = job
+        job.task = asyncio.create_task(self._run(job, run))
+        self._trim()
+        return job
+
+    async def _run(self, job: IngestionJob, run: Callable[[IngestionJob], Awaitable[Optional[dict]]]) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        try:
+            async with self._slots:
+                job.state = "running"
+                job.result = await run(job)
+            if job.result is None:
+                job.state = "skipped"
+            elif job.result.get("success"):
+                job.state = "succeeded"
+            else:
+                job.state = "failed"
+                job.error = job.result.get("message")
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception(f"Ingestion job for bot {job.bot_id} failed: {e}")
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job.task = None
+            logger.info(f"Ingestion job for bot {job.bot_id} {job.state} (step={job.step})")
+
+    def _trim(self) -> None:
+        while len(self._jobs) > self.history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.task is not None:
+                break
+            del self._jobs[oldest_id]
+
+    async def wait_all(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BotLifecycle:
+    """Applies Recall status changes to registered bot sessions.
+
+    States follow Recall's statuses (joining_call -> in_call -> in_call_recording);
+    any terminal status (or an inactivity removal) ends the session. Ending is
+    idempotent: the registry slot is freed straight away and the transcript
+    ingestion is handed to IngestionJobs, so webhooks return immediately and
+    repeated terminal deliveries are no-ops.
+    """
+
+    def __init__(
+        self,
+        *,
+        registry,
+        jobs: IngestionJobs,
+        end_session: Callable[[str], Optional[object]],
+        ingest: Callable[[object, IngestionJob], Awaitable[Optional[dict]]],
+    ) -> None:
+        self._registry = registry
+        self._jobs = jobs
+        self._end_session = end_session
+        self._ingest = ingest
+
+    def handle_status(self, bot_id: Optional[str], status: Optional[str], sub_code: Optional[str] = None) -> None:
+        session = self._registry.get(bot_id)
+        if session is None:
+            logger.debug(f"Ignoring status {status} for unknown or finished bot {bot_id}")
+            return
+
+        if status == "joining_call":
+            logger.info(f"Bot {bot_id} is joining the meeting")
+        elif status == "in_call":
+            logger.info(f"Bot {bot_id} successfully joined the meeting")
+        elif status == "in_call_recording":
+            logger.info(f"Bot {bot_id} is now recording")
+        elif status in TERMINAL_STATUSES:
+            if status == "fatal":
+                logger.error(f"Bot {bot_id} encountered a fatal error")
+                if sub_code:
+                    logger.error(f"Fatal error reason: {sub_code}")
+            else:
+                logger.info(f"Bot {bot_id} {'call ended' if status == 'call_ended' else 'finished successfully'}")
+            self.terminate(bot_id, reason=status)
+            return
+        else:
+            logger.warning(f"Unhandled bot status: {status}")
+            return
+
+        session.state = status
+
+    def terminate(self, bot_id: str, *, reason: str) -> Optional[IngestionJob]:
+        """End the bot's session (if still active) and schedule its transcript ingestion."""
+        session = self._end_session(bot_id)
+        if session is None:
+            return self._jobs.get(bot_id)
+        session.state = "ended"
+        return self._jobs.submit(
+            bot_id,
+            session.org_name,
+            lambda job: self._ingest(session, job),
+            reason=reason,
+        )
@@ -1,36 +1,195 @@
 from fastapi import WebSocket
-from typing import Dict
+from typing import Dict, Optional
+import os
+import time
+import base64
+import asyncio
 import logging
+from app.core.audio_frames import encode_audio_frame
 
 logger = logging.getLogger(__name__)
 
 # tenant wise connection management -> using org-id + tenent_id
 
 
+class ClientConnection:
+    """One browser connection with its own bounded outbound queue and writer task."""
+
+    def __init__(
+        self, connection_id: str, websocket: WebSocket, maxsize: int, binary: bool = False, channel: Optional[str] = None
+    ) -> None:
+        self.connection_id = connection_id
+        self.websocket = websocket
+        self.binary = binary
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.writer: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.consecutive_drops = 0
+        self.last_send_ms = 0.0
+        self.max_send_ms = 0.0
+        self.total_send_ms = 0.0
+
+    def metrics(self) -> dict:
+        return {
+            "depth": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "binary": self.binary,
+            "channel": self.channel,
+            "avg_send_ms": round(self.total_send_ms / self.sent, 3) if self.sent else 0.0,
+            "max_send_ms": round(self.max_send_ms, 3),
+            "last_send_ms": round(self.last_send_ms, 3),
+        }
+
+
 class ConnectionManager:
+    """Fan-out to browser WebSockets without blocking the caller.
+
+    Broadcasts are enqueued on every connection's bounded queue and written
+    by a dedicated task per connection, so a stalled browser only delays
+    itself. When a connection's queue is full the message is dropped for it;
+    after too many consecutive drops, or a send that exceeds the timeout,
+    the connection is evicted.
+
+    Connections may subscribe to a channel (one per meeting bot); audio for a
+    channel is looked up by key and only reaches that channel's pages.
+
+    Configuration (env with defaults):
+    - SCOOBY_WS_QUEUE_SIZE (default 256)
+    - SCOOBY_WS_EVICT_AFTER_DROPS (default 64)
+    - SCOOBY_WS_SEND_TIMEOUT_SECONDS (default 5)
+    """
+
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-    
-    def add_connection(self, connection_id: str, websocket: WebSocket):
-        self.active_connections[connection_id] = websocket
-        logger.info(f"Added WebSocket connection {connection_id}. Total active: {len(self.active_connections)}")
-    
+        self.active_connections: Dict[str, ClientConnection] = {}
+        self.channels: Dict[str, Dict[str, ClientConnection]] = {}
+        self.QUEUE_SIZE = int(os.getenv("SCOOBY_WS_QUEUE_SIZE", "256"))
+        self.EVICT_AFTER_DROPS = int(os.getenv("SCOOBY_WS_EVICT_AFTER_DROPS", "64"))
+        self.SEND_TIMEOUT_SECONDS = float(os.getenv("SCOOBY_WS_SEND_TIMEOUT_SECONDS", "5"))
+        self.evicted = 0
+
+    def add_connection(
+        self, connection_id: str, websocket: WebSocket, binary: bool = False, channel: Optional[str] = None
+    ):
+        conn = ClientConnection(connection_id, websocket, self.QUEUE_SIZE, binary=binary, channel=channel)
+        conn.writer = asyncio.create_task(self._writer(conn))
+        self.active_connections[connection_id] = conn
+        if channel:
+            self.channels.setdefault(channel, {})[connection_id] = conn
+        logger.info(
+            f"Added WebSocket connection {connection_id} (channel={channel}). Total active: {len(self.active_connections)}"
+        )
+
     def remove_connection(self, connection_id: str):
-        if connection_id in self.active_connections:
-            del self.active_connections[connection_id]
+        conn = self.active_connections.pop(connection_id, None)
+        if conn is not None:
+            if conn.channel:
+                members = self.channels.get(conn.channel)
+                if members is not None:
+                    members.pop(connection_id, None)
+                    if not members:
+                        del self.channels[conn.channel]
+            if conn.writer is not None and conn.writer is not asyncio.current_task():
+                conn.writer.cancel()
             logger.info(f"Removed WebSocket connection {connection_id}. Total active: {len(self.active_connections)}")
-    
-    async def send_to_all(self, message: dict):
-        if not self.active_connections:
-            return
-            
-        disconnected = []
-        for connection_id, websocket in self.active_connections.items():
+
+    def _evict(self, conn: ClientConnection, reason: str) -> None:
+        logger.warning(f"Evicting slow WebSocket {conn.connection_id}: {reason}")
+        self.evicted += 1
+        self.remove_connection(conn.connection_id)
+        asyncio.create_task(self._close_quietly(conn.websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def _writer(self, conn: ClientConnection) -> None:
+        while True:
+            message = await conn.queue.get()
+            started = time.perf_counter()
             try:
-                await websocket.send_json(message)
+                if isinstance(message, bytes):
+                    send = conn.websocket.send_bytes(message)
+                else:
+                    send = conn.websocket.send_json(message)
+                await asyncio.wait_for(send, timeout=self.SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._evict(conn, f"send exceeded {self.SEND_TIMEOUT_SECONDS}s")
+                return
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.exception(f"Error sending to WebSocket {connection_id}: {e}")
-                disconnected.append(connection_id)
-        
-        for connection_id in disconnected:
-            self.remove_connection(connection_id)
\ No newline at end of file
+                logger.exception(f"Error sending to WebSocket {conn.connection_id}: {e}")
+                self.remove_connection(conn.connection_id)
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            conn.sent += 1
+            conn.last_send_ms = elapsed_ms
+            conn.total_send_ms += elapsed_ms
+            conn.max_send_ms = max(conn.max_send_ms, elapsed_ms)
+
+    def _enqueue(self, conn: ClientConnection, message) -> None:
+        try:
+            conn.queue.put_nowait(message)
+            conn.consecutive_drops = 0
+        except asyncio.QueueFull:
+            conn.dropped += 1
+            conn.consecutive_drops += 1
+            if conn.consecutive_drops >= self.EVICT_AFTER_DROPS:
+                self._evict(conn, f"{conn.consecutive_drops} consecutive drops")
+
+    def broadcast(self, message: dict) -> None:
+        """Queue a message for every connection without waiting on any of them."""
+        for conn in list(self.active_connections.values()):
+            self._enqueue(conn, message)
+
+    def send_to(self, connection_id: str, message: dict) -> None:
+        conn = self.active_connections.get(connection_id)
+        if conn is not None:
+            self._enqueue(conn, message)
+
+    async def send_to_all(self, message: dict):
+        self.broadcast(message)
+
+    def send_audio(
+        self, pcm: bytes, *, stream_id: int, seq: int, sample_rate: int = 24000, channel: Optional[str] = None
+    ) -> None:
+        """Queue one PCM chunk: a binary frame for binary clients, base64 JSON for the rest.
+
+        With a channel, only that channel's subscribers receive it; without one
+        it goes to every connection. Each representation is built at most once
+        per chunk, and only if some connection needs it.
+        """
+        if channel is None:
+            targets = self.active_connections
+        else:
+            targets = self.channels.get(channel)
+            if not targets:
+                return
+        frame = None
+        legacy = None
+        for conn in list(targets.values()):
+            if conn.binary:
+                if frame is None:
+                    frame = encode_audio_frame(pcm, stream_id=stream_id, seq=seq, sample_rate=sample_rate)
+                self._enqueue(conn, frame)
+            else:
+                if legacy is None:
+                    legacy = {
+                        "type": "audio",
+                        "data": base64.b64encode(pcm).decode("ascii"),
+                        "bot_type": "scooby",
+                    }
+                self._enqueue(conn, legacy)
+
+    def metrics(self) -> dict:
+        return {
+            "connections": {cid: conn.metrics() for cid, conn in self.active_connections.items()},
+            "channels": {channel: len(members) for channel, members in self.channels.items()},
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,145 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Progressively tighter (max string chars, max nested list items) passes
+_LEVELS: List[Tuple[int, int]] = [(400, 20), (200, 10), (100, 5), (60, 3)]
+_ELLIPSIS = "…"
+# Values the model hands back verbatim (cursors, ids) are useless once cut
+_OPAQUE_KEYS = {"next_cursor", "cursor", "id"}
+# Paged results: rows dropped here could never be reached through the cursor
+_PAGED_KEYS = {"next_cursor"}
+
+
+def _is_opaque(key: Any) -> bool:
+    return isinstance(key, str) and (key in _OPAQUE_KEYS or key.endswith("_id"))
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count of a JSON-serialisable value (~4 characters per token)."""
+    try:
+        text = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    except Exception:
+        text = str(value)
+    return (len(text) + 3) // 4
+
+
+def _compact(value: Any) -> Any:
+    """Drop None/empty fields and exact duplicate list items."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            item = _compact(item)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            out[key] = item
+        return out
+    if isinstance(value, list):
+        seen = set()
+        out = []
+        for item in value:
+            item = _compact(item)
+            marker = json.dumps(item, sort_keys=True, default=str)
+            if marker in seen:
+                continue
+            seen.add(marker)
+            out.append(item)
+        return out
+    return value
+
+
+def _truncate(value: Any, max_chars: int, max_items: int, ranked: bool = True) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[: max_chars - 1].rstrip() + _ELLIPSIS
+    if isinstance(value, dict):
+        # A top-level bundle's lists ({"events": [...]}, {"connections": [...]}) are still the ranked results
+        return {
+            key: item if _is_opaque(key) else _truncate(item, max_chars, max_items, ranked and isinstance(item, list))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        # Ranked result lists are only trimmed as a last resort; nested lists (sub_events, connections) get capped
+        items = value if ranked else value[:max_items]
+        return [_truncate(item, max_chars, max_items, False) for item in items]
+    return value
+
+
+class ResponseShaper:
+    """Fits tool results into a per-tool token budget before they go back to Gemini.
+
+    Results are compacted first (empty fields and duplicate rows removed), then
+    long strings and nested lists are cut in progressively tighter passes; if
+    a ranked top-level list is still over budget its lowest-ranked items are
+    dropped. Cursors and ids are never cut, and paged results (those with a
+    next_cursor) never lose rows here: their tools fit the page to the budget
+    when building it. Sizes before and after are logged and kept per tool.
+
+    Configuration (env with defaults):
+    - SCOOBY_TOOL_TOKEN_BUDGET (default 1500)
+    - SCOOBY_TOOL_TOKEN_BUDGETS (default unset): per-tool overrides, e.g. "pc_retrieval_tool=800,retrieve_with_context_tool=2500"
+    """
+
+    def __init__(self, default_budget: Optional[int] = None) -> None:
+        self.default_budget = default_budget or int(os.getenv("SCOOBY_TOOL_TOKEN_BUDGET", "1500"))
+        self.budgets: Dict[str, int] = {}
+        for pair in os.getenv("SCOOBY_TOOL_TOKEN_BUDGETS", "").split(","):
+            name, _, budget = pair.partition("=")
+            if name.strip() and budget.strip().isdigit():
+                self.budgets[name.strip()] = int(budget)
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def budget_for(self, tool_name: str) -> int:
+        return self.budgets.get(tool_name, self.default_budget)
+
+    def _fit(self, data: Any, budget: int) -> Any:
+        shaped = _compact(data)
+        if estimate_tokens(shaped) <= budget:
+            return shaped
+        for max_chars, max_items in _LEVELS:
+            candidate = _truncate(shaped, max_chars, max_items)
+            if estimate_tokens(candidate) <= budget:
+                return candidate
+        shaped = candidate
+        if isinstance(shaped, dict) and _PAGED_KEYS & shaped.keys():
+            # Paged tools fit their own pages to the budget so the cursor stays in step
+            logger.warning(f"Paged tool result is ~{estimate_tokens(shaped)} tokens, over its {budget} budget")
+            return shaped
+        ranked_key = None
+        if isinstance(shaped, dict):
+            # Bundles like {"events": [...]} or {"connections": [...]}: trim their longest list
+            lists = [key for key, item in shaped.items() if isinstance(item, list)]
+            ranked_key = max(lists, key=lambda key: len(shaped[key]), default=None)
+        items = shaped if isinstance(shaped, list) else shaped.get(ranked_key) if ranked_key else None
+        while items and estimate_tokens(shaped) > budget:
+            items.pop()
+            if isinstance(shaped, dict):
+                shaped["truncated"] = True
+        return shaped
+
+    def shape(self, tool_name: str, data: Any) -> Any:
+        budget = self.budget_for(tool_name)
+        before = estimate_tokens(data)
+        shaped = self._fit(data, budget)
+        after = estimate_tokens(shaped)
+        stats = self._stats.setdefault(tool_name, {"calls": 0, "tokens_in": 0, "tokens_out": 0, "shaped": 0})
+        stats["calls"] += 1
+        stats["tokens_in"] += before
+        stats["tokens_out"] += after
+        if after < before:
+            stats["shaped"] += 1
+        logger.info(f"Tool {tool_name} response: ~{before} -> ~{after} tokens (budget {budget})")
+        return shaped
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                **s,
+                "budget": self.budget_for(name),
+                "avg_tokens_in": round(s["tokens_in"] / s["calls"], 1) if s["calls"] else 0.0,
+                "avg_tokens_out": round(s["tokens_out"] / s["calls"], 1) if s["calls"] else 0.0,
+            }
+            for name, s in self._stats.items()
+        }
@@ -0,0 +1,138 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from app.core.dedup import SegmentDeduper
+from app.core.utils import BotContext
+
+logger = logging.getLogger(__name__)
+
+
+class BotSession:
+    """Everything that belongs to one meeting bot.
+
+    Holds the bot's Gemini model (and optional persistent live session),
+    participants, transcript writer, inactivity monitor and segment dedup,
+    so several meetings can run side by side without sharing state.
+    """
+
+    def __init__(
+        self,
+        *,
+        bot_id: str,
+        meeting_url: str,
+        org_name: str,
+        bot_name: str,
+        transcripts_enabled: bool,
+        model,
+        participants,
+        transcript_writer,
+        ingestion,
+        channel: Optional[str] = None,
+    ) -> None:
+        self.bot_id = bot_id
+        self.meeting_url = meeting_url
+        self.org_name = org_name
+        self.bot_name = bot_name
+        self.transcripts_enabled = transcripts_enabled
+        self.model = model
+        self.participants = participants
+        self.transcript_writer = transcript_writer
+        self.ingestion = ingestion
+        # /ws channel the bot's output-media page subscribes to
+        self.channel = channel
+        self.dedup = SegmentDeduper()
+        self.monitor = None
+        self.gemini_session = None
+        # Live-session closes started by close(); awaited by wait_closed()
+        self._closing: set = set()
+        self.state = "joining_call"
+        self.created_at = datetime.now(timezone.utc)
+
+    def sync_participants(self) -> None:
+        try:
+            self.model.participants = list(self.participants.list)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Release per-bot resources. Safe to call more than once.
+
+        The live session closes in a tracked task (its failure is logged);
+        await `wait_closed()` to know it is gone.
+        """
+        if self.monitor is not None:
+            try:
+                self.monitor.stop()
+            except Exception:
+                pass
+        if self.gemini_session is not None:
+            task = asyncio.create_task(self.gemini_session.close())
+            self._closing.add(task)
+            task.add_done_callback(self._close_done)
+            self.gemini_session = None
+        # dedup is left intact: queued transcript events keep draining after close
+        try:
+            self.participants.reset()
+            self.model.participants = []
+        except Exception:
+            pass
+        BotContext.remove_model_context(self.model)
+
+    def _close_done(self, task: asyncio.Task) -> None:
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Closing the Gemini session of bot {self.bot_id} failed: {task.exception()}")
+
+    async def wait_closed(self) -> None:
+        """Wait for the live-session close started by close() to finish."""
+        if self._closing:
+            await asyncio.gather(*list(self._closing), return_exceptions=True)
+
+
+class SessionRegistry:
+    """Active bot sessions keyed by Recall bot id.
+
+    Configuration (env with defaults):
+    - SCOOBY_MAX_SESSIONS (default 200)
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None) -> None:
+        self.max_sessions = max_sessions or int(os.getenv("SCOOBY_MAX_SESSIONS", "200"))
+        self._sessions: Dict[str, BotSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, bot_id: str) -> bool:
+        return bot_id in self._sessions
+
+    def __iter__(self) -> Iterator[BotSession]:
+        return iter(list(self._sessions.values()))
+
+    def is_full(self) -> bool:
+        return len(self._sessions) >= self.max_sessions
+
+    def get(self, bot_id: Optional[str]) -> Optional[BotSession]:
+        if bot_id is None:
+            return None
+        return self._sessions.get(bot_id)
+
+    def find_by_meeting(self, meeting_url: str) -> Optional[BotSession]:
+        return next((s for s in self._sessions.values() if s.meeting_url == meeting_url), None)
+
+    def add(self, session: BotSession) -> None:
+        self._sessions[session.bot_id] = session
+        logger.info(f"Registered bot {session.bot_id} for org {session.org_name}. Active sessions: {len(self._sessions)}")
+
+    def remove(self, bot_id: str) -> Optional[BotSession]:
+        session = self._sessions.pop(bot_id, None)
+        if session is not None:
+            session.close()
+            logger.info(f"Removed bot {bot_id}. Active sessions: {len(self._sessions)}")
+        return session
+
+    def print_active_bots(self) -> None:
+        logger.info(f"Active bots: {list(self._sessions) or None}")
@@ -0,0 +1,57 @@
+import time
+import logging
+from typing import Any, Awaitable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _ToolStats:
+    __slots__ = ("calls", "errors", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+
+class ToolRunner:
+    """Awaits Gemini tool calls and records each call's latency per tool name.
+
+    Every tool is a coroutine on the event loop (Neo4j and Pinecone are async
+    clients), and tools keep their own blocking work, such as file or SQLite
+    access, off the loop. One runner is shared by all bots.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, _ToolStats] = {}
+
+    async def timed(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        """Await a tool invocation and record its latency under `name`."""
+        stats = self._stats.setdefault(name, _ToolStats())
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.last_ms = elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            logger.info(f"Tool {name} finished in {elapsed_ms:.0f}ms")
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                "calls": s.calls,
+                "errors": s.errors,
+                "avg_ms": round(s.total_ms / s.calls, 3) if s.calls else 0.0,
+                "max_ms": round(s.max_ms, 3),
+                "last_ms": round(s.last_ms, 3),
+            }
+            for name, s in self._stats.items()
+        }
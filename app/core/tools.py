@@ -1,9 +1,17 @@
 from app.service.vector_store import PineconeStore
+from app.service.local_vector_index import VectorReplicas
 import os
-from app.service.graph_store import Neo4jDriver
+from app.service.graph_store import AsyncNeo4jDriver
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List, Optional
 from app.service.recall_bot import RecallBot
+from app.core.cache import RetrievalCache, normalize_text
+from app.core.response_shaper import estimate_tokens
+from datetime import datetime, timezone
+import re
+import asyncio
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,36 +21,431 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "idx-pulse-dev")
 
-graph = Neo4jDriver(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
+# Fan-out caps for connections_retrieval_tool; model-supplied limits are clamped to these
+CONNECTIONS_PER_EVENT_LIMIT = int(os.getenv("SCOOBY_CONNECTIONS_PER_EVENT_LIMIT", "25"))
+CONNECTIONS_TOTAL_LIMIT = int(os.getenv("SCOOBY_CONNECTIONS_TOTAL_LIMIT", "100"))
+
+
+def _clamp(value: Optional[int], ceiling: int) -> int:
+    try:
+        value = int(value) if value is not None else ceiling
+    except (TypeError, ValueError):
+        value = ceiling
+    return max(1, min(value, ceiling))
+
+
+# retrieve_with_context_tool: events that get graph context, their fan-out, and keyword fusion
+FUSED_CONTEXT_EVENTS = int(os.getenv("SCOOBY_FUSED_CONTEXT_EVENTS", "3"))
+FUSED_CONNECTIONS_PER_EVENT = int(os.getenv("SCOOBY_FUSED_CONNECTIONS_PER_EVENT", "10"))
+FUSED_KEYWORD_SEARCH = os.getenv("SCOOBY_FUSED_KEYWORD_SEARCH", "true").lower() in ("1", "true", "yes")
+RRF_K = int(os.getenv("SCOOBY_RRF_K", "60"))
+# Event properties the keyword search filters on; without them it cannot honour org or date scoping
+GRAPH_EVENT_ORG_PROPERTY = os.getenv("SCOOBY_GRAPH_EVENT_ORG_PROPERTY") or None
+GRAPH_EVENT_TIME_PROPERTY = os.getenv("SCOOBY_GRAPH_EVENT_TIME_PROPERTY") or None
+
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[str]], k: int = RRF_K) -> List[tuple]:
+    """Fuse ranked title lists: score = sum(1 / (k + rank)). Returns [(title, score, sources)] best first."""
+    scores: Dict[str, float] = {}
+    sources: Dict[str, List[str]] = {}
+    for source, titles in rankings.items():
+        for rank, title in enumerate(titles, start=1):
+            scores[title] = scores.get(title, 0.0) + 1.0 / (k + rank)
+            sources.setdefault(title, []).append(source)
+    ordered = sorted(scores, key=lambda t: scores[t], reverse=True)
+    return [(title, scores[title], sources[title]) for title in ordered]
+
+
+def _to_epoch(value: Optional[str]) -> Optional[float]:
+    """ISO date/datetime (naive = UTC) to epoch seconds, for Pinecone range filters."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r}; expected ISO format like 2025-01-31")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _encode_cursor(offsets: Dict[str, int], types: Optional[List[str]], per_event: int, limit: int) -> str:
+    state = {"o": offsets, "t": types or None, "p": per_event, "l": limit}
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return {
+            "offsets": {str(name): int(offset) for name, offset in state["o"].items()},
+            "types": state.get("t"),
+            "per_event": state.get("p"),
+            "limit": state.get("l"),
+        }
+    except Exception:
+        raise ValueError("Invalid connections cursor")
+
+
+# One driver (and connection pool) for the whole process
+graph = AsyncNeo4jDriver(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
 rb = RecallBot()
+retrieval_cache = RetrievalCache()
 
 
 class GeminiTools():
     
     def __init__(self):
-        self.builder = Neo4jDriver(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
-        self.pc =  PineconeStore(api_key=os.getenv("PINECONE_API_KEY", ""), index_name="idx-pulse-dev")
-        self.pc.setup_indexes()
-    
-    def get_event_connections(self, event_names: List[str]):
+        self.builder = graph
+        # Index lookup/creation happens on the first search, not at import time
+        self.pc =  PineconeStore(api_key=os.getenv("PINECONE_API_KEY", ""), index_name=PINECONE_INDEX_NAME)
+        # Optional in-process replica of each org's main events; falls back to Pinecone when stale
+        self.replicas = VectorReplicas(self.pc)
     
+    async def fetch_neighbourhoods(
+        self,
+        event_names: List[str],
+        org_name: Optional[str] = None,
+        *,
+        relationship_types: Optional[List[str]] = None,
+        offsets: Optional[Dict[str, int]] = None,
+        per_event_limit: Optional[int] = None,
+        fresh: bool = False,
+    ) -> Dict[str, Dict]:
+        """One page of ranked neighbours per event: {name: {"rows": [...], "has_more": bool}}.
+
+        Neighbours are ranked by relevance (described relationships first, then
+        better-connected nodes) and sliced in the database, so a hub event never
+        ships more than `per_event_limit` rows. `fresh` skips the cached result
+        (the new one still replaces it).
+        """
+        event_names = list(dict.fromkeys(event_names or []))
+        per_event = _clamp(per_event_limit, CONNECTIONS_PER_EVENT_LIMIT)
+        offsets = offsets or {}
+        types = sorted(set(relationship_types)) if relationship_types else None
+        page_sig = ",".join(f"{normalize_text(n)}={offsets.get(n, 0)}" for n in sorted(event_names) if offsets.get(n))
+        cache_key = RetrievalCache.events_key(
+            f"connections:{per_event}:{','.join(types or [])}:{page_sig}", org_name, event_names
+        )
+        cached = None if fresh else await retrieval_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Each event's neighbours are cut to the deepest requested page inside the subquery
+        # (a top-k sort), so only that many rows are projected and collected per event;
+        # degree is a degree-store lookup per neighbour
         cypher = """
-        UNWIND $names AS event_name
-        MATCH (e:Event {name: event_name})-[r]-(n)
-        RETURN event_name AS event,
-            n.name AS related_node,
-            labels(n)[0] AS node_type,
-            type(r) AS relationship_type,
-            r.description AS relationship_description
-        ORDER BY event_name, related_node
-        """
-        return self.builder._run(cypher, names=[e for e in event_names])
+        UNWIND $requests AS req
+        CALL {
+            WITH req
+            MATCH (e:Event {name: req.name})-[r]-(n)
+            WHERE $types IS NULL OR type(r) IN $types
+            WITH r, n, COUNT { (n)--() } AS degree
+            ORDER BY (r.description IS NOT NULL) DESC, degree DESC, n.name
+            LIMIT $window
+            RETURN collect({
+                event: req.name,
+                related_node: n.name,
+                node_type: labels(n)[0],
+                relationship_type: type(r),
+                relationship_description: r.description
+            }) AS ranked
+        }
+        RETURN req.name AS event, ranked[req.offset..req.offset + $fetch] AS rows
+        """
+        requests = [{"name": name, "offset": int(offsets.get(name, 0))} for name in event_names]
+        window = max((req["offset"] for req in requests), default=0) + per_event + 1
+        records = await self.builder.read(
+            cypher, requests=requests, types=types, fetch=per_event + 1, window=window
+        )
+        pages: Dict[str, Dict] = {name: {"rows": [], "has_more": False} for name in event_names}
+        for record in records:
+            rows = record["rows"] or []
+            # One extra row was fetched only to learn whether another page exists
+            pages[record["event"]] = {"rows": rows[:per_event], "has_more": len(rows) > per_event}
+        retrieval_cache.set(cache_key, pages)
+        return pages
+
+    @staticmethod
+    def build_connections_page(
+        event_names: List[str],
+        pages: Dict[str, Dict],
+        *,
+        offsets: Optional[Dict[str, int]] = None,
+        relationship_types: Optional[List[str]] = None,
+        per_event_limit: Optional[int] = None,
+        limit: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ) -> Dict:
+        """Merge per-event pages under the total cap and attach a cursor for the rest.
+
+        Events are drained round-robin so one hub cannot crowd out the others.
+        With a token budget the total cap is lowered until the page fits, so rows
+        that do not fit stay reachable through the cursor instead of being cut
+        from the response afterwards.
+        """
+        event_names = list(dict.fromkeys(event_names or []))
+        per_event = _clamp(per_event_limit, CONNECTIONS_PER_EVENT_LIMIT)
+        total = _clamp(limit, CONNECTIONS_TOTAL_LIMIT)
+        offsets = offsets or {}
+        queues = {name: list((pages.get(name) or {}).get("rows") or [])[:per_event] for name in event_names}
+        taken = {name: 0 for name in event_names}
+        connections: List[Dict] = []
+        while len(connections) < total and any(taken[n] < len(queues[n]) for n in event_names):
+            for name in event_names:
+                if len(connections) >= total:
+                    break
+                if taken[name] < len(queues[name]):
+                    connections.append(queues[name][taken[name]])
+                    taken[name] += 1
+
+        next_offsets = {}
+        for name in event_names:
+            more_here = taken[name] < len(queues[name]) or (pages.get(name) or {}).get("has_more", False)
+            if more_here:
+                next_offsets[name] = int(offsets.get(name, 0)) + taken[name]
+        page = {
+            "connections": connections,
+            "truncated": bool(next_offsets),
+            "next_cursor": _encode_cursor(next_offsets, relationship_types, per_event, total) if next_offsets else None,
+        }
+        if token_budget and len(connections) > 1:
+            tokens = estimate_tokens(page)
+            if tokens > token_budget:
+                smaller = min(len(connections) - 1, max(1, len(connections) * token_budget // tokens))
+                return GeminiTools.build_connections_page(
+                    event_names,
+                    pages,
+                    offsets=offsets,
+                    relationship_types=relationship_types,
+                    per_event_limit=per_event,
+                    limit=smaller,
+                    token_budget=token_budget,
+                )
+        return page
+
+    async def get_event_connections(
+        self,
+        event_names: List[str],
+        org_name: Optional[str] = None,
+        *,
+        relationship_types: Optional[List[str]] = None,
+        per_event_limit: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        token_budget: Optional[int] = None,
+    ) -> Dict:
+        """Bounded neighbourhoods of the named events, with a cursor when more are available.
+
+        A cursor from a previous call carries the event names, filters and
+        limits, so passing it alone fetches the next page.
+        """
+        offsets: Dict[str, int] = {}
+        if cursor:
+            state = _decode_cursor(cursor)
+            offsets = state["offsets"]
+            event_names = list(offsets)
+            relationship_types = state["types"]
+            per_event_limit = state["per_event"]
+            limit = state["limit"]
+        pages = await self.fetch_neighbourhoods(
+            event_names,
+            org_name,
+            relationship_types=relationship_types,
+            offsets=offsets,
+            per_event_limit=per_event_limit,
+        )
+        return self.build_connections_page(
+            event_names,
+            pages,
+            offsets=offsets,
+            relationship_types=relationship_types,
+            per_event_limit=per_event_limit,
+            limit=limit,
+            token_budget=token_budget,
+        )
     
-    def pc_retrieval_tool(self, query):
+    async def pc_retrieval_tool(
+        self,
+        query,
+        org_name: Optional[str] = None,
+        *,
+        meeting_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        fresh: bool = False,
+    ):
+        """Top main events for the query, scoped to the org and optionally to a meeting or ISO date range.
+
+        `fresh` skips the cached result (the new one still replaces it).
+        """
+        since_ts, until_ts = _to_epoch(since), _to_epoch(until)
+        kind = "pinecone"
+        if meeting_id or since_ts is not None or until_ts is not None:
+            kind = f"pinecone:{meeting_id or ''}:{since_ts or ''}:{until_ts or ''}"
+        cache_key = RetrievalCache.query_key(kind, org_name, query)
+        cached = None if fresh else await retrieval_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if kind == "pinecone":
+            local = await self.replicas.search(query, org_name)
+            if local is not None:
+                retrieval_cache.set(cache_key, local)
+                return local
+
         logger.info("fetching from Pinecone")
-        results = self.pc.search_main_events(query_text=query)
+        results = await self.pc.search_main_events(
+            query_text=query, org_name=org_name, meeting_id=meeting_id, since=since_ts, until=until_ts
+        )
+        if results.get("status") == "success":
+            retrieval_cache.set(cache_key, results["results"])
         return results["results"]
 
+    def keyword_scope_supported(self, org_name: Optional[str], since: Optional[str], until: Optional[str]) -> bool:
+        """Whether keyword_search can apply the same org/date scoping as the vector search."""
+        if org_name and self.pc.org_scope != "none" and not GRAPH_EVENT_ORG_PROPERTY:
+            return False
+        if (since or until) and not GRAPH_EVENT_TIME_PROPERTY:
+            return False
+        return True
+
+    async def keyword_search(
+        self,
+        query: str,
+        org_name: Optional[str] = None,
+        top_k: int = 5,
+        *,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict]:
+        """Event names matching the query's words, via the Event.name fulltext index.
+
+        Hits are restricted to the org and date window through the Event properties
+        named by SCOOBY_GRAPH_EVENT_ORG_PROPERTY / SCOOBY_GRAPH_EVENT_TIME_PROPERTY
+        (epoch seconds). When a scope is requested that those cannot express, no
+        hits are returned rather than unscoped ones.
+        """
+        terms = _LUCENE_SPECIAL.sub(r"\\\1", query or "").strip()
+        if not terms:
+            return []
+        if not self.keyword_scope_supported(org_name, since, until):
+            return []
+        since_ts, until_ts = _to_epoch(since), _to_epoch(until)
+        kind = "keyword"
+        if since_ts is not None or until_ts is not None:
+            kind = f"keyword:{since_ts or ''}:{until_ts or ''}"
+        cache_key = RetrievalCache.query_key(kind, org_name, query)
+        cached = await retrieval_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        clauses = []
+        params = {"terms": terms, "top_k": top_k}
+        if org_name and self.pc.org_scope != "none":
+            clauses.append("node[$org_property] = $org_name")
+            params.update(org_property=GRAPH_EVENT_ORG_PROPERTY, org_name=org_name)
+        if since_ts is not None:
+            clauses.append("node[$time_property] >= $since")
+            params.update(time_property=GRAPH_EVENT_TIME_PROPERTY, since=since_ts)
+        if until_ts is not None:
+            clauses.append("node[$time_property] <= $until")
+            params.update(time_property=GRAPH_EVENT_TIME_PROPERTY, until=until_ts)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cypher = f"""
+        CALL db.index.fulltext.queryNodes("event_name_fulltext", $terms) YIELD node, score
+        {where}
+        RETURN node.name AS title, score
+        LIMIT $top_k
+        """
+        records = await self.builder.read(cypher, **params)
+        retrieval_cache.set(cache_key, records)
+        return records
+
+    async def retrieve_with_context(
+        self,
+        query: str,
+        org_name: Optional[str] = None,
+        *,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        keyword: Optional[bool] = None,
+        snapshot=None,
+    ) -> Dict:
+        """Vector (+ optional keyword) search fused by RRF, with graph context for the top events, in one call.
+
+        `snapshot` is the org's knowledge snapshot, consulted before Pinecone and Neo4j
+        when the search is not date-bounded.
+        """
+        use_snapshot = snapshot is not None and not (since or until)
+        keyword = FUSED_KEYWORD_SEARCH if keyword is None else keyword
+        if keyword and not self.keyword_scope_supported(org_name, since, until):
+            # The fulltext hits could come from other orgs or dates; rank on vector hits alone
+            keyword = False
+
+        async def vector():
+            if use_snapshot:
+                cached = snapshot.lookup_query(query)
+                if cached is not None:
+                    return cached
+            hits = await self.pc_retrieval_tool(query, org_name, since=since, until=until)
+            if use_snapshot and hits:
+                snapshot.add_query(query, hits)
+            return hits
+
+        async def keywords():
+            if not keyword:
+                return []
+            try:
+                return await self.keyword_search(query, org_name, since=since, until=until)
+            except Exception as e:
+                # Missing fulltext index or graph hiccup: fall back to vector-only ranking
+                logger.warning(f"Keyword search failed, using vector results only: {e}")
+                return []
+
+        vector_hits, keyword_hits = await asyncio.gather(vector(), keywords())
+        by_title = {hit.get("title"): hit for hit in vector_hits or [] if hit.get("title")}
+        fused = reciprocal_rank_fusion({
+            "vector": list(by_title),
+            "keyword": [row["title"] for row in keyword_hits or [] if row.get("title")],
+        })
+
+        top_titles = [title for title, _, _ in fused[:FUSED_CONTEXT_EVENTS]]
+        pages: Dict[str, Dict] = {}
+        missing = top_titles
+        if use_snapshot and top_titles:
+            pages, missing = snapshot.lookup_connections(top_titles)
+        if missing:
+            fetched = await self.fetch_neighbourhoods(
+                missing, org_name, per_event_limit=FUSED_CONNECTIONS_PER_EVENT
+            )
+            if use_snapshot:
+                snapshot.add_connections(fetched)
+            pages.update(fetched)
+
+        events = []
+        for title, score, sources in fused:
+            hit = by_title.get(title, {})
+            event = {
+                "title": title,
+                "score": round(score, 5),
+                "sources": sources,
+                "summary": hit.get("summary", ""),
+                "main_event": hit.get("main_event", ""),
+            }
+            if title in pages:
+                page = pages[title]
+                rows = page.get("rows") or []
+                event["connections"] = [
+                    {key: value for key, value in row.items() if key != "event"}
+                    for row in rows[:FUSED_CONNECTIONS_PER_EVENT]
+                ]
+                event["more_connections"] = page.get("has_more", False) or len(rows) > FUSED_CONNECTIONS_PER_EVENT
+            events.append(event)
+        return {"query": query, "events": events}
+
     async def send_chat_message_tool(self, bot_id: str, message: str, to: str = "everyone", pin: bool = False):
         return await rb.send_chat_message(bot_id=bot_id, message=message, to=to, pin=pin)
\ No newline at end of file
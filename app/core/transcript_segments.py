@@ -0,0 +1,162 @@
+import os
+import gzip
+import json
+import re
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PART_RE = re.compile(r"^(.*)\.\d{4}\.jsonl(?:\.gz)?$")
+
+# Structured transcripts: one compact JSON record per segment,
+#   {"speaker_id": ..., "speaker": ..., "start": 12.3, "end": 15.9, "text": "..."}
+# appended to <base>.<n>.jsonl. When a part reaches the size limit it is gzipped to
+# <base>.<n>.jsonl.gz and writing moves to the next part. <base>.index.json lists the
+# parts with their time range so readers can skip parts outside a query window.
+
+
+def encode_record(speaker: str, text: str, *, speaker_id=None, start=None, end=None) -> str:
+    record = {"speaker_id": speaker_id, "speaker": speaker, "start": start, "end": end, "text": text}
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class SegmentedJsonlSink:
+    """Appends JSONL transcript records to size-bounded parts, compressing each full part.
+
+    All methods block on file I/O; TranscriptWriter calls them from a worker thread.
+    """
+
+    def __init__(self, directory: str, base_name: str, segment_bytes: int) -> None:
+        self.directory = directory
+        self.base_name = base_name
+        self.segment_bytes = segment_bytes
+        self.index_path = os.path.join(directory, f"{base_name}.index.json")
+        self.parts: List[Dict] = []
+        self._load_index()
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.parts = json.load(f)["parts"]
+        except (OSError, ValueError, KeyError):
+            self.parts = []
+
+    def _save_index(self) -> None:
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"parts": self.parts}, f)
+        os.replace(tmp, self.index_path)
+
+    def _part_path(self, part: Dict) -> str:
+        return os.path.join(self.directory, part["file"])
+
+    def _open_part(self) -> Dict:
+        if self.parts and not self.parts[-1]["file"].endswith(".gz"):
+            return self.parts[-1]
+        part = {"file": f"{self.base_name}.{len(self.parts):04d}.jsonl", "start": None, "end": None, "records": 0}
+        self.parts.append(part)
+        return part
+
+    def append(self, lines: List[str], spans: List[Tuple[Optional[float], Optional[float]]], fsync: bool = False) -> None:
+        """Append records (with their (start, end) times), rolling to a new part whenever one fills up."""
+        if not lines:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        pos = 0
+        while pos < len(lines):
+            part = self._open_part()
+            path = self._part_path(part)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            end_pos = pos
+            with open(path, "a", encoding="utf-8") as f:
+                while end_pos < len(lines) and (size < self.segment_bytes or end_pos == pos):
+                    f.write(lines[end_pos])
+                    size += len(lines[end_pos].encode("utf-8"))
+                    end_pos += 1
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            part["records"] += end_pos - pos
+            for start, end in spans[pos:end_pos]:
+                if start is not None:
+                    part["start"] = start if part["start"] is None else min(part["start"], start)
+                if end is not None:
+                    part["end"] = end if part["end"] is None else max(part["end"], end)
+            if size >= self.segment_bytes:
+                self._compress(part)
+            pos = end_pos
+        self._save_index()
+
+    def _compress(self, part: Dict) -> None:
+        src = self._part_path(part)
+        dst = src + ".gz"
+        with open(src, "rb") as fin, gzip.open(dst, "wb", compresslevel=6) as fout:
+            fout.write(fin.read())
+        os.remove(src)
+        part["file"] = part["file"] + ".gz"
+
+    def seal(self, min_bytes: int = 0) -> bool:
+        """Compress the open part, e.g. before upload, if it holds at least min_bytes. True if one was sealed."""
+        if not self.parts or self.parts[-1]["file"].endswith(".gz"):
+            return False
+        path = self._part_path(self.parts[-1])
+        if not os.path.exists(path) or os.path.getsize(path) < min_bytes:
+            return False
+        self._compress(self.parts[-1])
+        self._save_index()
+        return True
+
+    def files(self) -> List[str]:
+        return [self._part_path(part) for part in self.parts]
+
+    def remove(self) -> None:
+        for path in self.files() + [self.index_path]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def remove_transcript_files(paths: List[str]) -> None:
+    """Delete transcript files by path, plus the segment index of any jsonl parts among them."""
+    extra = set()
+    for path in paths:
+        match = _PART_RE.match(os.path.basename(path))
+        if match:
+            extra.add(os.path.join(os.path.dirname(path), f"{match.group(1)}.index.json"))
+    for path in list(paths) + sorted(extra):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def iter_transcript_records(
+    index_path: str, *, start: Optional[float] = None, end: Optional[float] = None
+) -> Iterator[Dict]:
+    """Stream records from a segmented transcript, one part at a time.
+
+    With a time window, parts whose recorded range falls outside it are not
+    opened at all, and records outside it are skipped.
+    """
+    directory = os.path.dirname(index_path)
+    with open(index_path, "r", encoding="utf-8") as f:
+        parts = json.load(f)["parts"]
+    for part in parts:
+        if start is not None and part.get("end") is not None and part["end"] < start:
+            continue
+        if end is not None and part.get("start") is not None and part["start"] > end:
+            continue
+        path = os.path.join(directory, part["file"])
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if start is not None and record.get("end") is not None and record["end"] < start:
+                    continue
+                if end is not None and record.get("start") is not None and record["start"] > end:
+                    continue
+                yield record
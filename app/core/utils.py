@@ -2,20 +2,40 @@ import os
 from typing import Callable, Optional, Awaitable
 import logging
 import asyncio
+import time
 from datetime import datetime, timezone
 import uuid
 
+from app.core.transcript_segments import SegmentedJsonlSink, encode_record, remove_transcript_files
+
 logger = logging.getLogger(__name__)
 
 
 class TranscriptWriter:
     """
-    Handles writing transcript lines to disk, controlled by an enable flag.
+    Buffers transcript lines in memory and appends them to disk in batches, controlled by an enable flag.
+
+    `save_line` never touches the disk: lines are flushed by a background task
+    when the buffer passes the size threshold or the flush interval elapses,
+    with the file write itself running in a worker thread. `drain()` flushes
+    whatever is left and must be awaited before the file is read (ingestion).
+
+    In "jsonl" format each line is a compact record with speaker id, name,
+    start/end time and text, written to size-bounded parts that are gzipped
+    as they fill (see app.core.transcript_segments); `files()` lists what
+    to upload, in order.
 
     Parameters:
     - enabled_getter: Callable[[], bool] that returns whether writing is enabled
     - transcripts_dir: directory path where transcripts are stored
     - meeting_url_getter: Callable[[], str | None] to fetch current meeting url for naming
+
+    Configuration (env with defaults):
+    - SCOOBY_TRANSCRIPT_FLUSH_BYTES (default 65536)
+    - SCOOBY_TRANSCRIPT_FLUSH_SECONDS (default 2)
+    - SCOOBY_TRANSCRIPT_FSYNC (default false): fsync after every flush
+    - SCOOBY_TRANSCRIPT_FORMAT (default "text"): text | jsonl
+    - SCOOBY_TRANSCRIPT_SEGMENT_BYTES (default 1048576): jsonl part size before compression
     """
 
     def __init__(
@@ -30,23 +50,178 @@ class TranscriptWriter:
         self._meeting_url_getter = meeting_url_getter
         self.org_name = org_name
         self.id = str(uuid.uuid4())[:4]
+        self.FLUSH_BYTES = int(os.getenv("SCOOBY_TRANSCRIPT_FLUSH_BYTES", "65536"))
+        self.FLUSH_SECONDS = float(os.getenv("SCOOBY_TRANSCRIPT_FLUSH_SECONDS", "2"))
+        self.FSYNC = os.getenv("SCOOBY_TRANSCRIPT_FSYNC", "false").lower() in ("1", "true", "yes")
+        self.FORMAT = os.getenv("SCOOBY_TRANSCRIPT_FORMAT", "text").lower()
+        self.SEGMENT_BYTES = int(os.getenv("SCOOBY_TRANSCRIPT_SEGMENT_BYTES", "1048576"))
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        # (start, end) of each buffered record (jsonl), recorded in the segment index
+        self._spans: list[tuple] = []
+        self._sink: Optional[SegmentedJsonlSink] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.lines = 0
+        self.flushes = 0
+        self.bytes_written = 0
+        self.max_flush_ms = 0.0
         try:
             os.makedirs(self._dir, exist_ok=True)
         except Exception:
             pass
 
-    def save_line(self, speaker: str, text: str) -> None:
+    @property
+    def base_name(self) -> str:
+        return f"Scooby_{self.org_name}_{self.id}"
+
+    @property
+    def path(self) -> str:
+        if self.FORMAT == "jsonl":
+            return self.sink.index_path
+        return os.path.join(self._dir, f"{self.base_name}.txt")
+
+    @property
+    def sink(self) -> SegmentedJsonlSink:
+        if self._sink is None:
+            self._sink = SegmentedJsonlSink(self._dir, self.base_name, self.SEGMENT_BYTES)
+        return self._sink
+
+    def files(self) -> list[str]:
+        """Transcript files on disk, in upload order."""
+        if self.FORMAT == "jsonl":
+            return [path for path in self.sink.files() if os.path.exists(path)]
+        return [self.path] if os.path.exists(self.path) else []
+
+    def remove_files(self) -> None:
+        if self.FORMAT == "jsonl":
+            self.sink.remove()
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+    def save_line(
+        self,
+        speaker: str,
+        text: str,
+        *,
+        speaker_id=None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> None:
         try:
             if not self._enabled_getter():
                 return
-            if not os.path.exists(self._dir):
-                os.makedirs(self._dir, exist_ok=True)
-            file_path = os.path.join(self._dir, f"Scooby_{self.org_name}_{self.id}.txt")
-            with open(file_path, "a", encoding="utf-8") as f:
-                f.write(f"{speaker}: {text}\n")
+            if self.FORMAT == "jsonl":
+                line = encode_record(speaker, text, speaker_id=speaker_id, start=start, end=end)
+                self._spans.append((start, end))
+            else:
+                line = f"{speaker}: {text}\n"
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+            self.lines += 1
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop (scripts): write through
+                self._write(self._take())
+                return
+            self._ensure_flusher()
+            if self._buffered_bytes >= self.FLUSH_BYTES:
+                self._flush_requested.set()
         except Exception as e:
             logger.exception(f"Error saving transcript: {e}")
 
+    def _ensure_flusher(self) -> None:
+        if self._task is None or self._task.done():
+            self._flush_requested = asyncio.Event()
+            self._flush_lock = self._flush_lock or asyncio.Lock()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    def _take(self) -> tuple:
+        batch = (self._buffer, self._spans)
+        self._buffer = []
+        self._spans = []
+        self._buffered_bytes = 0
+        return batch
+
+    def _write(self, batch: tuple) -> None:
+        lines, spans = batch
+        if not lines:
+            return
+        if self.FORMAT == "jsonl":
+            self.sink.append(lines, spans, fsync=self.FSYNC)
+            return
+        os.makedirs(self._dir, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            if self.FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def flush(self) -> None:
+        """Write out everything buffered so far; the file write runs in a worker thread."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            batch = self._take()
+            if not batch[0]:
+                return
+            started = time.perf_counter()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+            except Exception as e:
+                logger.exception(f"Error flushing transcript {self.path}: {e}")
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.bytes_written += sum(len(line) for line in batch[0])
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def drain(self) -> None:
+        """Stop the background flusher, write out the remaining buffer and compress the open jsonl part."""
+        task = self._task
+        if task is not None:
+            # Let an in-flight write finish rather than cancelling it mid-append
+            self._closing = True
+            self._flush_requested.set()
+            await task
+            self._task = None
+            self._closing = False
+        await self.seal()
+
+    async def seal(self, min_bytes: int = 0) -> bool:
+        """Write out the buffer, then compress the open jsonl part if it holds at least min_bytes.
+
+        Later lines go to a new part. True if a part was sealed.
+        """
+        await self.flush()
+        if self.FORMAT != "jsonl" or self._sink is None:
+            return False
+        async with self._flush_lock:
+            return await asyncio.get_running_loop().run_in_executor(None, self._sink.seal, min_bytes)
+
+    def metrics(self) -> dict:
+        return {
+            "lines": self.lines,
+            "buffered_bytes": self._buffered_bytes,
+            "flushes": self.flushes,
+            "bytes_written": self.bytes_written,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "format": self.FORMAT,
+            "segments": len(self._sink.parts) if self._sink is not None else None,
+        }
+
 
 class BotContext:
     """Holds current bot state and transcript toggle.
@@ -82,6 +257,8 @@ class BotContext:
         """Reset bot-related context on the Gemini model safely."""
         try:
             model.bot_id = None
+            model.org_name = None
+            model.knowledge_snapshot = None
             model.chat_history = []
             model.conversation_history = []
             try:
@@ -97,10 +274,6 @@ class BotContext:
         except Exception as e:
             logger.exception(f"Error printing active bots: {e}")
 
-    # Shared guard to avoid duplicate ingestions per bot
-    _transcript_ingestion_lock = asyncio.Lock()
-    _transcript_ingested_bots = set()
-
     @staticmethod
     async def ingest_and_cleanup_transcript(
         bot_id: str,
@@ -110,42 +283,70 @@ class BotContext:
         meeting_url: str | None,
         ti,  # TranscriptIngestion instance
         x_org_name: str,
-        transcript_writer,  # TranscriptWriter instance
+        transcript_writer,  # TranscriptWriter instance, or None when retrying from the outbox
         logger: logging.Logger,
-    ) -> None:
+        on_ingested: Optional[Callable[[str], None]] = None,
+        on_step: Optional[Callable[[str], None]] = None,
+        outbox=None,  # IngestionOutbox
+        transcript_paths: Optional[list] = None,
+    ) -> Optional[dict]:
+        """Ingest the bot's transcript files once and delete them on success. Returns the ingestion result, if any.
+
+        With an outbox, the attempt is recorded before it starts (and skipped if the
+        bot is already done or in progress); failures are left there to be retried.
+        """
+        attempt_started = False
         try:
             if not transcripts_enabled:
-                return
-            # Build transcript file path to match TranscriptWriter.save_line naming
-            # => "Scooby_{org_name}_{writer.id}.txt"
-            transcript_path = os.path.join(
-                transcripts_dir,
-                f"Scooby_{x_org_name}_{getattr(transcript_writer, 'id', 'unknown')}.txt",
-            )
+                return None
+            # Buffered lines must be on disk before the files are read
+            if transcript_writer is not None:
+                await transcript_writer.drain()
+                transcript_paths = transcript_writer.files()
+            transcript_paths = [path for path in (transcript_paths or []) if os.path.exists(path)]
+
+            if not transcript_paths:
+                logger.warning("No transcript files found for bot %s in %s", bot_id, transcripts_dir)
+                if outbox is not None and await outbox.get(bot_id) is not None:
+                    await outbox.abandon(bot_id, "Transcript files missing")
+                return None
 
             # Ensure only one ingestion per bot
-            async with BotContext._transcript_ingestion_lock:
-                if bot_id in BotContext._transcript_ingested_bots:
-                    logger.info("Transcript ingestion already performed for bot %s; skipping", bot_id)
-                    return
-                BotContext._transcript_ingested_bots.add(bot_id)
-
-            if not os.path.exists(transcript_path):
-                logger.warning("Transcript file not found at %s", transcript_path)
-                return
-
-            logger.info("Starting transcript ingestion for %s", transcript_path)
-            res = await ti.ingest_transcript(x_org_name, transcript_path)
+            if outbox is not None:
+                if not await outbox.begin(bot_id, x_org_name, transcript_paths):
+                    logger.info("Transcript ingestion already done or in progress for bot %s; skipping", bot_id)
+                    return None
+                attempt_started = True
+
+            logger.info("Starting transcript ingestion for %s", transcript_paths)
+            res = await ti.ingest_transcript(x_org_name, transcript_paths, on_step=on_step)
             logger.info("Transcript ingestion result: %s", res)
 
             if res and res.get("success"):
+                if outbox is not None:
+                    await outbox.complete(bot_id)
+                if on_ingested is not None:
+                    try:
+                        on_ingested(x_org_name)
+                    except Exception as ce:
+                        logger.error("on_ingested callback failed for %s: %s", bot_id, ce)
                 try:
-                    os.remove(transcript_path)
-                    logger.info("Deleted transcript file %s", transcript_path)
+                    if transcript_writer is not None:
+                        transcript_writer.remove_files()
+                    else:
+                        remove_transcript_files(transcript_paths)
+                    logger.info("Deleted transcript files %s", transcript_paths)
                 except Exception as de:
-                    logger.error("Failed to delete transcript file %s: %s", transcript_path, de)
+                    logger.error("Failed to delete transcript files %s: %s", transcript_paths, de)
+            elif outbox is not None:
+                state = await outbox.fail(bot_id, (res or {}).get("message"))
+                logger.warning("Transcript ingestion for bot %s failed; outbox state %s", bot_id, state)
+            return res
         except Exception as e:
             logger.exception("Error during transcript ingestion: %s", e)
+            if attempt_started:
+                await outbox.fail(bot_id, str(e))
+            return {"success": False, "message": str(e)}
 
 
 class InactivityMonitor:
@@ -243,7 +444,7 @@ class InactivityMonitor:
         try:
             await self._remove_bot(bot_id)
             try:
-                self._tw.save_line(bot_id, "BOT_STATUS", reason)
+                self._tw.save_line("BOT_STATUS", reason)
             except Exception:
                 pass
             try:
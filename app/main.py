@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 import os
 import logging
 from dotenv import load_dotenv
@@ -8,11 +9,30 @@ logger = logging.getLogger(__name__)
 
 # routers
 from app.api.public import router as public_router
-from app.api.recall import router as recall_router
+from app.api.recall import router as recall_router, tool_executor, outbox_worker
+from app.core.tools import graph
+from app.service.transcript_ingestion import close_shared_client
 
 load_dotenv()  # Load environment variables from .env if present
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Idempotent index bootstrap; a graph that is down at boot should not keep the API from starting
+    try:
+        await graph.ensure_schema()
+    except Exception as e:
+        logger.error(f"Neo4j schema bootstrap failed: {e}")
+    # Re-queue ingestions interrupted by the last shutdown and transcripts nobody picked up
+    await outbox_worker.start()
+    yield
+    await outbox_worker.stop()
+    await graph.close()
+    await tool_executor.pc.close()
+    await close_shared_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -1,12 +1,15 @@
 from google import genai
 from app.core.manage_connections import ConnectionManager
-import base64
 from app.core.tools import GeminiTools
+from app.core.tool_runner import ToolRunner
+from app.core.response_shaper import ResponseShaper
 from google.genai.types import FunctionDeclaration
 from google.genai import types 
 from app.core.scooby_prompt import prompt
+import asyncio
 import logging
 import os
+import time
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -16,12 +19,24 @@ load_dotenv()
 
 class GeminiLive():
     
-    def __init__(self, api_key = None, connection_manager: ConnectionManager = None):
-        if api_key is None:
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY environment variable is required")
-        self.client = genai.Client(api_key=api_key)
+    def __init__(
+        self,
+        api_key = None,
+        connection_manager: ConnectionManager = None,
+        *,
+        client: genai.Client = None,
+        tool_executor: GeminiTools = None,
+        tool_runner: ToolRunner = None,
+        response_shaper: ResponseShaper = None,
+    ):
+        # client/tool_executor/tool_runner/response_shaper can be shared so per-bot instances stay cheap
+        if client is None:
+            if api_key is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable is required")
+            client = genai.Client(api_key=api_key)
+        self.client = client
         self.model = "gemini-live-2.5-flash-preview"
         self.tools = []
         self.define_tools()
@@ -33,12 +48,18 @@ class GeminiLive():
             "system_instruction": prompt(),
         }
         self.connection_manager = connection_manager
-        self.tool_executor = GeminiTools()
+        self.tool_executor = tool_executor or GeminiTools()
+        self.tool_runner = tool_runner or ToolRunner()
+        self.response_shaper = response_shaper or ResponseShaper()
         self.conversation_history = []
         self.chat_history = []
         self.current_transcription = ""
         self.bot_id = None
+        self.org_name = None
+        self.knowledge_snapshot = None
         self.participants = []
+        self.audio_stream_id = 0
+        self.audio_channel = None
     
     async def _async_enumerate(self, aiterable):
         n = 0
@@ -47,9 +68,27 @@ class GeminiLive():
             n += 1
     
     def define_tools(self):
+        # Date bounds are only offered when the records carry a configured time field to filter on
+        date_range = {}
+        if os.getenv("SCOOBY_PINECONE_TIME_FIELD"):
+            date_range = {
+                "since": {
+                    "type": "string",
+                    "description": "Optional: only events on or after this ISO date, e.g. 2025-01-31"
+                },
+                "until": {
+                    "type": "string",
+                    "description": "Optional: only events on or before this ISO date"
+                },
+            }
+
         connections_retrieval_tool = FunctionDeclaration(
             name="connections_retrieval_tool",
-            description="Fetch all the related information of one or many events",
+            description=(
+                "Fetch the most relevant related nodes (actors, times, sub-events, related events) of one or many "
+                "events. Results are capped; when 'truncated' is true, call again with 'cursor' set to the returned "
+                "'next_cursor' to get more."
+            ),
             parameters={
                 "type": "object",
                 "properties": {
@@ -57,6 +96,23 @@ class GeminiLive():
                         "type": "array",
                         "items": {"type": "string"},
                         "description": "List of event names of which connections should be fetched"
+                    },
+                    "relationship_types": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional: only return relationships of these types"
+                    },
+                    "per_event_limit": {
+                        "type": "integer",
+                        "description": "Optional: maximum connections per event"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Optional: maximum connections in total"
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Optional: 'next_cursor' from a previous call, to fetch the next page"
                     }
                 },
                 "required": ["event_names"],
@@ -72,7 +128,28 @@ class GeminiLive():
                     "query": {
                         "type": "string",
                         "description": "The natural language query to search relevant main events"
-                    }
+                    },
+                    **date_range,
+                },
+                "required": ["query"],
+            }
+        )
+
+        retrieve_with_context_tool = FunctionDeclaration(
+            name="retrieve_with_context_tool",
+            description=(
+                "Search relevant main events and return them ranked, each top event already including its "
+                "related actors, times and sub-events from the knowledge graph. Prefer this over calling "
+                "pc_retrieval_tool and connections_retrieval_tool one after the other."
+            ),
+            parameters={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "The natural language query to search relevant main events"
+                    },
+                    **date_range,
                 },
                 "required": ["query"],
             }
@@ -124,6 +201,7 @@ class GeminiLive():
         )
         
         self.tools = [{"function_declarations": [
+            retrieve_with_context_tool,
             pc_retrieval_tool,
             connections_retrieval_tool,
             send_chat_message_tool,
@@ -131,6 +209,111 @@ class GeminiLive():
             get_all_joined_participants_tool,
         ]}]
     
+    async def _call_tool(self, function_name, function_args):
+        snapshot = self.knowledge_snapshot
+        if function_name == "connections_retrieval_tool":
+            event = function_args.get("event_names") or []
+            types = function_args.get("relationship_types") or None
+            per_event_limit = function_args.get("per_event_limit")
+            limit = function_args.get("limit")
+            cursor = function_args.get("cursor")
+            # Fit the page to the budget here so the cursor points past the last row kept
+            budget = self.response_shaper.budget_for(function_name)
+            # The snapshot only holds unfiltered first pages
+            if snapshot is None or types or cursor:
+                return await self.tool_executor.get_event_connections(
+                    event,
+                    self.org_name,
+                    relationship_types=types,
+                    per_event_limit=per_event_limit,
+                    limit=limit,
+                    cursor=cursor,
+                    token_budget=budget,
+                )
+            pages, missing = snapshot.lookup_connections(event)
+            if missing:
+                fetched = await self.tool_executor.fetch_neighbourhoods(missing, self.org_name)
+                snapshot.add_connections(fetched)
+                pages.update(fetched)
+            return self.tool_executor.build_connections_page(
+                event, pages, per_event_limit=per_event_limit, limit=limit, token_budget=budget
+            )
+            
+        elif function_name == "pc_retrieval_tool":
+            query = function_args.get("query")
+            since = function_args.get("since")
+            until = function_args.get("until")
+            if since or until:
+                # Date-bounded searches bypass the snapshot, which only holds unfiltered results
+                return await self.tool_executor.pc_retrieval_tool(query, self.org_name, since=since, until=until)
+            if snapshot is not None:
+                cached = snapshot.lookup_query(query)
+                if cached is not None:
+                    return cached
+            results = await self.tool_executor.pc_retrieval_tool(query, self.org_name)
+            if snapshot is not None and results:
+                # Warm the neighbourhoods of new hits; Gemini usually asks for them next
+                new_titles = snapshot.add_query(query, results)
+                if new_titles:
+                    snapshot.prefetch_in_background(new_titles)
+            return results
+            
+        elif function_name == "retrieve_with_context_tool":
+            return await self.tool_executor.retrieve_with_context(
+                function_args.get("query"),
+                self.org_name,
+                since=function_args.get("since"),
+                until=function_args.get("until"),
+                snapshot=snapshot,
+            )
+
+        elif function_name == "send_chat_message_tool":
+            if not self.bot_id:
+                raise RuntimeError("No active bot_id set on model; cannot send chat message")
+            message = function_args.get("message")
+            to = function_args.get("to", "everyone")
+            pin = function_args.get("pin", False)
+            return await self.tool_executor.send_chat_message_tool(self.bot_id, message, to, pin)
+        
+        elif function_name == "get_current_participants":
+            return [p for p in (self.participants or []) if p.get("status") == "joined"]
+        
+        elif function_name == "get_all_joined_participants":
+            return self.participants or []
+        
+        return {"error": f"Unknown function: {function_name}"}
+
+    async def _execute_function_call(self, fc) -> types.FunctionResponse:
+        function_name = fc.name
+        function_args = fc.args or {}
+        logger.info(f"function called by gemini: {function_name}")
+        try:
+            data = await self.tool_runner.timed(function_name, self._call_tool(function_name, function_args))
+            data = self.response_shaper.shape(function_name, data)
+            logger.debug(f"Function result for {function_name}: {data}")
+            return types.FunctionResponse(
+                id=fc.id,
+                name=fc.name,
+                response={"result": data}
+            )
+        except Exception as tool_error:
+            logger.exception(f"Error executing tool {function_name}: {tool_error}")
+            return types.FunctionResponse(
+                id=fc.id,
+                name=fc.name,
+                response={"error": str(tool_error)}
+            )
+    
+    def connect_config(self, resumption_handle: str | None = None, persistent: bool = False) -> dict:
+        """Live connect config; persistent sessions also enable resumption and context compression."""
+        if not persistent:
+            return self.config
+        return {
+            **self.config,
+            "session_resumption": {"handle": resumption_handle},
+            "context_window_compression": {"sliding_window": {}},
+        }
+    
     async def connect_to_gemini(self, text):
         async with self.client.aio.live.connect(
             model = self.model,
@@ -153,152 +336,117 @@ class GeminiLive():
             composed += f"Question: {text}"
             
 
-            await connection.send_client_content(
-                turns={"role": "user", "parts": [{"text": composed}]}, turn_complete=True
-            )
+            await self.run_turn(connection, text, composed)
 
-            current_turn = {"role": "user", "parts": [{"text": text}]}
-            self.chat_history.append(current_turn)
-            if len(self.chat_history) > 5:
-                self.chat_history = self.chat_history[-5:]
+    async def run_turn(self, connection, text, composed=None, on_message=None):
+        """Send one question on an open live connection and stream the answer until turn completion.
+
+        `on_message` is called with every server message, letting a session owner
+        observe resumption handles and go-away notices.
+        """
+        started = time.perf_counter()
+        first_audio_logged = False
+        # Each answer is its own audio stream; frames carry (stream_id, seq) so the page can order them
+        self.audio_stream_id += 1
+        stream_id = self.audio_stream_id
+        seq = 0
+
+        await connection.send_client_content(
+            turns={"role": "user", "parts": [{"text": composed or f"Question: {text}"}]}, turn_complete=True
+        )
+
+        current_turn = {"role": "user", "parts": [{"text": text}]}
+        self.chat_history.append(current_turn)
+        if len(self.chat_history) > 5:
+            self.chat_history = self.chat_history[-5:]
+        
+        turn = connection.receive()
+        async for n, response in self._async_enumerate(turn):
             
-            turn = connection.receive()
-            async for n, response in self._async_enumerate(turn):
+            if on_message is not None:
+                on_message(response)
+
+            if response.server_content:
+                transcription = getattr(response.server_content, "output_transcription", None)
                 
-                if response.server_content:
-                    transcription = getattr(response.server_content, "output_transcription", None)
-                    
-                    if transcription:
-                        transcribed_text = getattr(transcription, "text", None)
-                        if transcribed_text:
-                            self.current_transcription += transcribed_text
+                if transcription:
+                    transcribed_text = getattr(transcription, "text", None)
+                    if transcribed_text:
+                        self.current_transcription += transcribed_text
+                
+                if response.data is not None and self.connection_manager is not None:
+                    if not first_audio_logged:
+                        first_audio_logged = True
+                        logger.info(f"Time to first audio chunk: {(time.perf_counter() - started) * 1000:.0f}ms")
+                    logger.debug("sending audio")
+                    self.connection_manager.send_audio(
+                        response.data, stream_id=stream_id, seq=seq, channel=self.audio_channel
+                    )
+                    seq += 1
+            elif response.tool_call:
+                try:
+                    # All calls of one tool_call message run concurrently; results keep call order
+                    function_responses = await asyncio.gather(
+                        *(self._execute_function_call(fc) for fc in response.tool_call.function_calls)
+                    )
+                    if function_responses:
+                        logger.debug("sending gemini function response...")
+                        await connection.send_tool_response(function_responses=list(function_responses))
+                except Exception as e:
+                    logger.exception(f"Error processing tool calls: {e}")
                     
-                    if response.data is not None and self.connection_manager is not None:
-                        try:
-                            encoded = base64.b64encode(response.data).decode("ascii")
-                        except Exception as encode_err:
-                            logger.exception(f"Error base64-encoding audio chunk: {encode_err}")
-                            encoded = None
-                            
-                        if encoded:
-                            logger.debug("sending audio")
-                            await self.connection_manager.send_to_all({
-                                "type": "audio",
-                                "data": encoded,
-                                "bot_type": "scooby"
-                            })
-                elif response.tool_call:
-                    try:
-                        function_responses = []
-                        for fc in response.tool_call.function_calls:
-                            
-                            function_name = fc.name
-                            function_args = fc.args
-                            logger.info(f"function called by gemini: {function_name}")
-                            
-                            try:
-                                if function_name == "connections_retrieval_tool":
-                                    event = function_args.get("event_names")
-                                    data = self.tool_executor.get_event_connections(event)
-                                    
-                                elif function_name == "pc_retrieval_tool":
-                                    query = function_args.get("query")
-                                    data = self.tool_executor.pc_retrieval_tool(query)
-                                    
-                                elif function_name == "send_chat_message_tool":
-                                    if not self.bot_id:
-                                        raise RuntimeError("No active bot_id set on model; cannot send chat message")
-                                    message = function_args.get("message")
-                                    to = function_args.get("to", "everyone")
-                                    pin = function_args.get("pin", False)
-                                    data = await self.tool_executor.send_chat_message_tool(self.bot_id, message, to, pin)
-                                
-                                elif function_name == "get_current_participants":
-                                    data = [p for p in (self.participants or []) if p.get("status") == "joined"]
-                                
-                                elif function_name == "get_all_joined_participants":
-                                    data = self.participants or []
-                                
-                                else:
-                                    data = {"error": f"Unknown function: {function_name}"}
-                                
-                                logger.debug(f"Function result for {function_name}: {data}")
-                                    
-                                function_response = types.FunctionResponse(
-                                    id=fc.id,
-                                    name=fc.name,
-                                    response={"result": data}
-                                )
-                                
-                                function_responses.append(function_response)
-                            
-                            except Exception as tool_error:
-                                logger.exception(f"Error executing tool {function_name}: {tool_error}")
-                                error_response = types.FunctionResponse(
-                                    id=fc.id,
-                                    name=fc.name,
-                                    response={"error": str(tool_error)}
-                                )
-                                function_responses.append(error_response)
-                        
-                        if function_responses:
-                            logger.debug("sending gemini function response...")
-                            await connection.send_tool_response(function_responses=function_responses)
-                    except Exception as e:
-                        logger.exception(f"Error processing tool calls: {e}")
-                        
-                if n == 0:
-                    try:
-                        if (response.server_content and 
-                            response.server_content.model_turn and 
-                            response.server_content.model_turn.parts and 
-                            len(response.server_content.model_turn.parts) > 0 and
-                            response.server_content.model_turn.parts[0].inline_data):
-                            logger.debug(response.server_content.model_turn.parts[0].inline_data.mime_type)
-                        else:
-                            logger.debug("No inline data available in response")
-                    except AttributeError as e:
-                        logger.exception(f"Error accessing response data: {e}")
-            
+            if n == 0:
+                try:
+                    if (response.server_content and 
+                        response.server_content.model_turn and 
+                        response.server_content.model_turn.parts and 
+                        len(response.server_content.model_turn.parts) > 0 and
+                        response.server_content.model_turn.parts[0].inline_data):
+                        logger.debug(response.server_content.model_turn.parts[0].inline_data.mime_type)
+                    else:
+                        logger.debug("No inline data available in response")
+                except AttributeError as e:
+                    logger.exception(f"Error accessing response data: {e}")
+        
+        
+            turn_complete = bool(getattr(getattr(response, 'server_content', None), 'turn_complete', False))
             
-                turn_complete = bool(getattr(getattr(response, 'server_content', None), 'turn_complete', False))
+            if turn_complete:
                 
-                if turn_complete:
+                if self.current_transcription and self.current_transcription.strip():
+                    final_text = self.current_transcription.strip()
+                    logger.info(f"[Scooby]: {final_text}")
+                    self.conversation_history.append({
+                        "role": "model",
+                        "content": final_text,
+                        "type": "audio_response"
+                    })
                     
-                    if self.current_transcription and self.current_transcription.strip():
-                        final_text = self.current_transcription.strip()
-                        logger.info(f"[Scooby]: {final_text}")
-                        self.conversation_history.append({
-                            "role": "model",
-                            "content": final_text,
-                            "type": "audio_response"
-                        })
-                        
-                        self.chat_history.append({
-                            "role": "model",
-                            "parts": [{"text": final_text}]
-                        })
-                        
-                        if len(self.chat_history) > 5:
-                            self.chat_history = self.chat_history[-5:]
-                    self.current_transcription = ""
+                    self.chat_history.append({
+                        "role": "model",
+                        "parts": [{"text": final_text}]
+                    })
                     
-            if self.current_transcription and self.current_transcription.strip():
-                final_text = self.current_transcription.strip()
-                logger.info(f"[Scooby]: {final_text}")
-                self.conversation_history.append({
-                    "role": "model",
-                    "content": final_text,
-                    "type": "audio_response"
-                })
+                    if len(self.chat_history) > 5:
+                        self.chat_history = self.chat_history[-5:]
+                self.current_transcription = ""
                 
-                self.chat_history.append({
-                    "role": "model",
-                    "parts": [{"text": final_text}]
-                })
+        if self.current_transcription and self.current_transcription.strip():
+            final_text = self.current_transcription.strip()
+            logger.info(f"[Scooby]: {final_text}")
+            self.conversation_history.append({
+                "role": "model",
+                "content": final_text,
+                "type": "audio_response"
+            })
+            
+            self.chat_history.append({
+                "role": "model",
+                "parts": [{"text": final_text}]
+            })
+            
+            if len(self.chat_history) > 5:
+                self.chat_history = self.chat_history[-5:]
                 
-                if len(self.chat_history) > 5:
-                    self.chat_history = self.chat_history[-5:]
-                    
-                self.current_transcription = ""
+            self.current_transcription = ""
     
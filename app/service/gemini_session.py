@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiLiveSession:
+    """One long-lived Gemini Live connection per bot.
+
+    The connection is opened when the bot joins and every wake-word question
+    is sent as a new turn on it, so answers skip the handshake and the
+    system-instruction/tool setup. A heartbeat pings the socket, and the
+    session resumption handle reported by the server is used to reconnect
+    transparently when the socket drops, the server sends go-away, or the
+    connection reaches its maximum age.
+
+    Configuration (env with defaults):
+    - SCOOBY_GEMINI_HEARTBEAT_SECONDS (default 20)
+    - SCOOBY_GEMINI_SESSION_MAX_AGE_SECONDS (default 540)
+    """
+
+    def __init__(self, model, bot_id: str) -> None:
+        self._model = model
+        self.bot_id = bot_id
+        self._stack: Optional[AsyncExitStack] = None
+        self._connection = None
+        self._resumption_handle: Optional[str] = None
+        self._reconnect_needed = False
+        self._opened_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.reconnects = 0
+
+        self.HEARTBEAT_SECONDS = int(os.getenv("SCOOBY_GEMINI_HEARTBEAT_SECONDS", "20"))
+        self.MAX_AGE_SECONDS = int(os.getenv("SCOOBY_GEMINI_SESSION_MAX_AGE_SECONDS", "540"))
+
+    def start(self) -> None:
+        """Open the connection in the background and start the heartbeat."""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _connect(self) -> None:
+        stack = AsyncExitStack()
+        config = self._model.connect_config(self._resumption_handle, persistent=True)
+        started = time.perf_counter()
+        self._connection = await stack.enter_async_context(
+            self._model.client.aio.live.connect(model=self._model.model, config=config)
+        )
+        self._stack = stack
+        self._opened_at = time.monotonic()
+        self._reconnect_needed = False
+        logger.info(
+            f"Gemini live session for bot {self.bot_id} {'resumed' if self._resumption_handle else 'opened'} "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    async def _disconnect(self) -> None:
+        stack, self._stack, self._connection = self._stack, None, None
+        if stack is not None:
+            try:
+                await stack.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing Gemini live session for bot {self.bot_id}: {e}")
+
+    async def _ensure_connected(self) -> None:
+        expired = self._opened_at is not None and time.monotonic() - self._opened_at >= self.MAX_AGE_SECONDS
+        if self._connection is not None and not self._reconnect_needed and not expired:
+            return
+        if self._connection is not None:
+            self.reconnects += 1
+            await self._disconnect()
+        await self._connect()
+
+    def _on_message(self, message) -> None:
+        update = getattr(message, "session_resumption_update", None)
+        if update is not None and update.resumable and update.new_handle:
+            self._resumption_handle = update.new_handle
+        if getattr(message, "go_away", None) is not None:
+            logger.info(f"Gemini sent go-away for bot {self.bot_id}; will resume on a new connection")
+            self._reconnect_needed = True
+
+    async def ask(self, text: str) -> None:
+        """Run a question as one turn on the live session, reconnecting once if the socket is gone."""
+        if self._closed:
+            raise RuntimeError(f"Gemini live session for bot {self.bot_id} is closed")
+        async with self._lock:
+            for attempt in (1, 2):
+                await self._ensure_connected()
+                try:
+                    await self._model.run_turn(self._connection, text, on_message=self._on_message)
+                    return
+                except asyncio.CancelledError:
+                    # A half-read turn would leak into the next one; start fresh next time
+                    self._reconnect_needed = True
+                    raise
+                except Exception as e:
+                    self._reconnect_needed = True
+                    if attempt == 2:
+                        raise
+                    logger.warning(f"Gemini live turn failed for bot {self.bot_id} ({e}); reconnecting")
+
+    async def _ping(self) -> bool:
+        ws = getattr(self._connection, "_ws", None)
+        if ws is None:
+            return self._connection is not None
+        try:
+            waiter = await ws.ping()
+            await asyncio.wait_for(waiter, timeout=self.HEARTBEAT_SECONDS)
+            return True
+        except Exception:
+            return False
+
+    async def _heartbeat(self) -> None:
+        try:
+            while not self._closed:
+                if not self._lock.locked():
+                    async with self._lock:
+                        try:
+                            if self._connection is not None and not await self._ping():
+                                logger.info(f"Gemini live heartbeat failed for bot {self.bot_id}; reconnecting")
+                                self._reconnect_needed = True
+                            await self._ensure_connected()
+                        except Exception as e:
+                            logger.warning(f"Gemini live session for bot {self.bot_id} unavailable: {e}")
+                            self._reconnect_needed = True
+                await asyncio.sleep(self.HEARTBEAT_SECONDS)
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        await self._disconnect()
+        logger.info(f"Gemini live session for bot {self.bot_id} closed (reconnects={self.reconnects})")
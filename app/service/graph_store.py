@@ -1,16 +1,70 @@
-from neo4j import GraphDatabase
-from typing import Optional
-  
-class Neo4jDriver():     
-    
+from neo4j import AsyncGraphDatabase
+from typing import Dict, List, Optional
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Indexes the tool queries rely on; every statement is idempotent.
+# Event names are not unique across orgs, so this is a lookup index rather than a constraint.
+SCHEMA_STATEMENTS = [
+    "CREATE INDEX event_name IF NOT EXISTS FOR (e:Event) ON (e.name)",
+    "CREATE FULLTEXT INDEX event_name_fulltext IF NOT EXISTS FOR (e:Event) ON EACH [e.name]",
+]
+
+
+class AsyncNeo4jDriver:
+    """Async Neo4j access over one shared, tuned connection pool.
+
+    Reads run as explicit read transactions, which the driver retries on
+    transient errors (leader switch, dropped connection) up to the retry
+    budget. Records are converted to dicts as they stream in rather than
+    after buffering the whole result.
+
+    Configuration (env with defaults):
+    - SCOOBY_NEO4J_POOL_SIZE (default 50)
+    - SCOOBY_NEO4J_ACQUIRE_TIMEOUT_SECONDS (default 10)
+    - SCOOBY_NEO4J_CONNECT_TIMEOUT_SECONDS (default 5)
+    - SCOOBY_NEO4J_MAX_RETRY_SECONDS (default 10)
+    - SCOOBY_NEO4J_FETCH_SIZE (default 500)
+    """
+
     def __init__(self, uri: str, user: str, password: str, database: Optional[str] = "neo4j"):
-        
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
         self.database = database
-        self.entity_index = {}
+        self.fetch_size = int(os.getenv("SCOOBY_NEO4J_FETCH_SIZE", "500"))
+        self.driver = AsyncGraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=int(os.getenv("SCOOBY_NEO4J_POOL_SIZE", "50")),
+            connection_acquisition_timeout=float(os.getenv("SCOOBY_NEO4J_ACQUIRE_TIMEOUT_SECONDS", "10")),
+            connection_timeout=float(os.getenv("SCOOBY_NEO4J_CONNECT_TIMEOUT_SECONDS", "5")),
+            max_transaction_retry_time=float(os.getenv("SCOOBY_NEO4J_MAX_RETRY_SECONDS", "10")),
+        )
+
+    @staticmethod
+    async def _collect(tx, cypher: str, params: Dict) -> List[Dict]:
+        result = await tx.run(cypher, **params)
+        return [record.data() async for record in result]
+
+    async def read(self, cypher: str, **params) -> List[Dict]:
+        async with self.driver.session(database=self.database, fetch_size=self.fetch_size) as session:
+            return await session.execute_read(self._collect, cypher, params)
+
+    async def write(self, cypher: str, **params) -> List[Dict]:
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_write(self._collect, cypher, params)
+
+    async def ensure_schema(self) -> None:
+        """Create the indexes the tool queries need. Safe to run on every startup."""
+        started = time.perf_counter()
+        async with self.driver.session(database=self.database) as session:
+            for statement in SCHEMA_STATEMENTS:
+                result = await session.run(statement)
+                await result.consume()
+        logger.info(
+            f"Neo4j schema ensured ({len(SCHEMA_STATEMENTS)} statements) in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
 
-    def _run(self, cypher: str, **params):
-        
-        with self.driver.session(database=self.database) as session:
-            result = session.run(cypher, **params)
-            return [dict(record) for record in result]
\ No newline at end of file
+    async def close(self) -> None:
+        await self.driver.close()
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+def _approx_size(value) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except Exception:
+        return 0
+
+
+class OrgKnowledgeSnapshot:
+    """Warm, in-memory copy of an org's main events and their graph neighbourhoods.
+
+    Built in the background when a bot for the org joins: a few seed queries
+    pull the org's top main events from Pinecone, then their Neo4j
+    neighbourhoods are fetched in one query. Tool calls consult the snapshot
+    first; results fetched live during the meeting are folded back in, and a
+    periodic refresh re-runs the seed queries and the most recently used
+    ones, then re-reads the neighbourhoods of their events and of the most
+    recently used events, going past the retrieval cache so the refresh sees
+    what Pinecone and Neo4j hold now. Neighbourhoods are read in bounded
+    batches. Entries left out of a refresh are dropped, so nothing served is
+    older than one refresh period.
+
+    Configuration (env with defaults):
+    - SCOOBY_SNAPSHOT_SEED_QUERIES (default "recent decisions;action items;project updates;open issues")
+    - SCOOBY_SNAPSHOT_MAX_BYTES (default 2000000)
+    - SCOOBY_SNAPSHOT_REFRESH_SECONDS (default 300)
+    - SCOOBY_SNAPSHOT_REFRESH_QUERIES (default 20): most recently used queries refreshed, besides the seeds
+    - SCOOBY_SNAPSHOT_REFRESH_EVENTS (default 100): most recently used neighbourhoods refreshed
+    - SCOOBY_SNAPSHOT_REFRESH_BATCH (default 25): events per neighbourhood query
+    """
+
+    def __init__(self, org_name: str, tools) -> None:
+        self.org_name = org_name
+        self._tools = tools
+        self.seed_queries = [
+            q.strip()
+            for q in os.getenv(
+                "SCOOBY_SNAPSHOT_SEED_QUERIES", "recent decisions;action items;project updates;open issues"
+            ).split(";")
+            if q.strip()
+        ]
+        self.max_bytes = int(os.getenv("SCOOBY_SNAPSHOT_MAX_BYTES", "2000000"))
+        self.refresh_seconds = int(os.getenv("SCOOBY_SNAPSHOT_REFRESH_SECONDS", "300"))
+        self.refresh_queries = int(os.getenv("SCOOBY_SNAPSHOT_REFRESH_QUERIES", "20"))
+        self.refresh_events = int(os.getenv("SCOOBY_SNAPSHOT_REFRESH_EVENTS", "100"))
+        self.refresh_batch = max(1, int(os.getenv("SCOOBY_SNAPSHOT_REFRESH_BATCH", "25")))
+
+        # normalized query -> (original query, results); normalized event name -> (event name, first page);
+        # both in least- to most-recently used order
+        self._queries: "OrderedDict[str, Tuple[str, List[Dict]]]" = OrderedDict()
+        self._connections: "OrderedDict[str, Tuple[str, Dict]]" = OrderedDict()
+        self._sizes: Dict[Tuple[str, str], int] = {}
+        self.size_bytes = 0
+        self.build_ms: Optional[float] = None
+        self.built_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.refs = 0
+        self._task: Optional[asyncio.Task] = None
+        self._prefetches: set = set()
+        self.prefetch_failures = 0
+
+    # ---- storage ----
+
+    def _put(self, kind: str, key: str, value) -> None:
+        table = self._queries if kind == "query" else self._connections
+        size = _approx_size(value)
+        self.size_bytes += size - self._sizes.get((kind, key), 0)
+        self._sizes[(kind, key)] = size
+        table[key] = value
+        table.move_to_end(key)
+        # Over the cap: drop the oldest query results first, then the oldest neighbourhoods
+        while self.size_bytes > self.max_bytes and (self._queries or self._connections):
+            victim_kind, victim_table = ("query", self._queries) if self._queries else ("conn", self._connections)
+            victim_key, _ = victim_table.popitem(last=False)
+            self.size_bytes -= self._sizes.pop((victim_kind, victim_key), 0)
+
+    def _drop(self, kind: str, key: str) -> None:
+        table = self._queries if kind == "query" else self._connections
+        if table.pop(key, None) is not None:
+            self.size_bytes -= self._sizes.pop((kind, key), 0)
+
+    def add_query(self, query: str, results: List[Dict]) -> List[str]:
+        """Store search results; returns event titles whose neighbourhoods are not cached yet."""
+        self._put("query", normalize_text(query), (query, results))
+        titles = [r.get("title") for r in results or [] if r.get("title")]
+        return [t for t in titles if normalize_text(t) not in self._connections]
+
+    def add_connections(self, pages: Dict[str, Dict]) -> None:
+        """Store first-page neighbourhoods as returned by GeminiTools.fetch_neighbourhoods."""
+        for name, page in (pages or {}).items():
+            self._put("conn", normalize_text(name), (name, page))
+
+    # ---- lookups ----
+
+    def lookup_query(self, query: str) -> Optional[List[Dict]]:
+        key = normalize_text(query)
+        entry = self._queries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._queries.move_to_end(key)
+        return entry[1]
+
+    def lookup_connections(self, event_names: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """Return cached first pages by event name and the event names that still need a graph query."""
+        pages: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for name in event_names or []:
+            key = normalize_text(name)
+            cached = self._connections.get(key)
+            if cached is None:
+                missing.append(name)
+            else:
+                pages[name] = cached[1]
+                self._connections.move_to_end(key)
+        if missing:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return pages, missing
+
+    # ---- building ----
+
+    async def _search(self, query: str, fresh: bool = False) -> List[Dict]:
+        return await self._tools.pc_retrieval_tool(query, self.org_name, fresh=fresh)
+
+    async def prefetch_connections(self, titles: List[str], fresh: bool = False) -> None:
+        """Read neighbourhoods in batches of refresh_batch events, one graph query per batch."""
+        for start in range(0, len(titles or []), self.refresh_batch):
+            batch = titles[start:start + self.refresh_batch]
+            self.add_connections(await self._tools.fetch_neighbourhoods(batch, self.org_name, fresh=fresh))
+
+    def prefetch_in_background(self, titles: List[str]) -> None:
+        """Warm neighbourhoods without waiting; the task is tracked, cancelled by stop() and its failure logged."""
+        task = asyncio.create_task(self.prefetch_connections(titles))
+        self._prefetches.add(task)
+        task.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, task: asyncio.Task) -> None:
+        self._prefetches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.prefetch_failures += 1
+            logger.warning(f"Neighbourhood prefetch for org {self.org_name} failed: {task.exception()}")
+
+    async def _warm(self, queries: List[str], fresh: bool = False) -> List[str]:
+        """Run the queries and read the neighbourhoods of events new to the snapshot; returns those events."""
+        results = await asyncio.gather(*(self._search(q, fresh) for q in queries), return_exceptions=True)
+        new_titles: List[str] = []
+        for query, res in zip(queries, results):
+            if isinstance(res, Exception):
+                logger.warning(f"Snapshot query {query!r} failed for org {self.org_name}: {res}")
+                continue
+            if not res:
+                continue
+            for title in self.add_query(query, res):
+                if title not in new_titles:
+                    new_titles.append(title)
+        await self.prefetch_connections(new_titles, fresh)
+        return new_titles
+
+    async def build(self) -> None:
+        started = time.perf_counter()
+        await self._warm(self.seed_queries)
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self.built_at = time.time()
+        logger.info(
+            f"Knowledge snapshot for org {self.org_name} built in {self.build_ms:.0f}ms: "
+            f"{len(self._queries)} queries, {len(self._connections)} events, {self.size_bytes} bytes"
+        )
+
+    async def _refresh_loop(self) -> None:
+        try:
+            await self.build()
+            while True:
+                await asyncio.sleep(self.refresh_seconds)
+                await self.refresh()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.exception(f"Knowledge snapshot for org {self.org_name} stopped: {e}")
+
+    async def refresh(self) -> None:
+        """Re-run the seed and most recently used queries and re-read a bounded set of neighbourhoods."""
+        asked = [original for original, _ in list(self._queries.values())]
+        recent = asked[-self.refresh_queries:] if self.refresh_queries > 0 else []
+        queries = list(dict.fromkeys(self.seed_queries + recent))
+        recent_events = [name for name, _ in list(self._connections.values())]
+        recent_events = recent_events[-self.refresh_events:] if self.refresh_events > 0 else []
+        # _warm reads the neighbourhoods of events new to the snapshot; the rest are re-read here
+        fetched = await self._warm(queries, fresh=True)
+        titles = [
+            r.get("title")
+            for q in queries
+            for r in (self._queries.get(normalize_text(q), (None, []))[1] or [])
+            if r.get("title")
+        ]
+        keep = list(dict.fromkeys(titles + recent_events + fetched))
+        await self.prefetch_connections([t for t in keep if t not in fetched], fresh=True)
+
+        kept_queries = {normalize_text(q) for q in queries}
+        for key in [k for k in self._queries if k not in kept_queries]:
+            self._drop("query", key)
+        kept_events = {normalize_text(t) for t in keep}
+        for key in [k for k in self._connections if k not in kept_events]:
+            self._drop("conn", key)
+        logger.debug(
+            f"Knowledge snapshot for org {self.org_name} refreshed: {len(queries)} queries, "
+            f"{len(keep)} events ({self.size_bytes} bytes)"
+        )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._prefetches):
+            task.cancel()
+
+    def invalidate(self) -> None:
+        """Forget everything (new knowledge was ingested) and rebuild if still in use."""
+        self._queries.clear()
+        self._connections.clear()
+        self._sizes.clear()
+        self.size_bytes = 0
+        if self._task is not None:
+            self.stop()
+            self.start()
+
+    def metrics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "org_name": self.org_name,
+            "queries": len(self._queries),
+            "events": len(self._connections),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "build_ms": round(self.build_ms, 1) if self.build_ms is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "prefetch_failures": self.prefetch_failures,
+            "sessions": self.refs,
+        }
+
+
+class KnowledgeSnapshots:
+    """One snapshot per org, shared by every live meeting of that org and dropped when the last one ends."""
+
+    def __init__(self, tools) -> None:
+        self._tools = tools
+        self._snapshots: Dict[str, OrgKnowledgeSnapshot] = {}
+
+    def acquire(self, org_name: str) -> OrgKnowledgeSnapshot:
+        snapshot = self._snapshots.get(org_name)
+        if snapshot is None:
+            snapshot = self._snapshots[org_name] = OrgKnowledgeSnapshot(org_name, self._tools)
+        snapshot.refs += 1
+        snapshot.start()
+        return snapshot
+
+    def release(self, org_name: str) -> None:
+        snapshot = self._snapshots.get(org_name)
+        if snapshot is None:
+            return
+        snapshot.refs -= 1
+        if snapshot.refs <= 0:
+            snapshot.stop()
+            del self._snapshots[org_name]
+            logger.info(f"Knowledge snapshot for org {org_name} released: {snapshot.metrics()}")
+
+    def invalidate(self, org_name: str) -> None:
+        snapshot = self._snapshots.get(org_name)
+        if snapshot is not None:
+            snapshot.invalidate()
+
+    def metrics(self) -> List[Dict]:
+        return [s.metrics() for s in self._snapshots.values()]
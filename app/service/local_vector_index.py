@@ -0,0 +1,263 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class HashingEmbedder:
+    """Deterministic, dependency-free text embedder (signed feature hashing of words and word bigrams).
+
+    Lexical rather than semantic, but stable across processes and machines,
+    so tests can write its vectors into a Pinecone Local index and get exact
+    results back. Its rankings do not match Pinecone's hosted models, so it
+    is for tests, not for serving answers.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: Optional[int] = None) -> None:
+        self.dim = dim or int(os.getenv("SCOOBY_VECTOR_REPLICA_DIM", "384"))
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = normalize_text(text).split()
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                out[row, h % self.dim] += 1.0 if h >> 63 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+def load_embedder(spec: Optional[str] = None):
+    """A "package.module:ClassName" exposing `.name`, `.dim` and `.embed(texts) -> ndarray`, or "hashing"."""
+    spec = spec or os.getenv("SCOOBY_VECTOR_REPLICA_EMBEDDER")
+    if not spec:
+        raise ValueError(
+            "SCOOBY_VECTOR_REPLICA_EMBEDDER is required with SCOOBY_VECTOR_REPLICA_DIR: "
+            "name the embedder that produced the Pinecone vectors"
+        )
+    if spec == "hashing":
+        logger.warning("Vector replicas use the hashing embedder; its rankings are lexical and meant for tests")
+        return HashingEmbedder()
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class OrgVectorReplica:
+    """One org's main-event records as an on-disk float32 matrix, memory-mapped for search.
+
+    The matrix holds the vectors exported from Pinecone, so local scores are
+    the ones Pinecone computes; the embedder only embeds queries. Files live
+    under the replica directory as <org>.f32 (row-major matrix) and
+    <org>.json (records plus build metadata); both are replaced atomically on
+    rebuild. load, build and search block, so callers run them off the event
+    loop.
+    """
+
+    def __init__(self, org_name: str, directory: str, embedder, max_age_seconds: float) -> None:
+        self.org_name = org_name
+        self.embedder = embedder
+        self.max_age_seconds = max_age_seconds
+        slug = re.sub(r"[^a-z0-9_-]+", "-", (org_name or "default").lower()).strip("-") or "default"
+        self.matrix_path = os.path.join(directory, f"{slug}.f32")
+        self.meta_path = os.path.join(directory, f"{slug}.json")
+        # (records, matrix), replaced as one object so a search never pairs a new matrix with old records
+        self._index: Tuple[List[Dict], Optional[np.ndarray]] = ([], None)
+        self.built_at: Optional[float] = None
+        self.stale = False
+        self.searches = 0
+
+    @property
+    def records(self) -> List[Dict]:
+        return self._index[0]
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        return self._index[1]
+
+    def load(self) -> bool:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("embedder") != self.embedder.name or meta.get("dim") != self.embedder.dim:
+            logger.info(f"Ignoring vector replica for org {self.org_name}: built with another embedder")
+            return False
+        records = meta["records"]
+        matrix = (
+            np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(len(records), meta["dim"]))
+            if records
+            else np.zeros((0, self.embedder.dim), dtype=np.float32)
+        )
+        self._index = (records, matrix)
+        self.built_at = meta["built_at"]
+        self.stale = False
+        return True
+
+    def build(self, records: List[Dict]) -> None:
+        """Persist exported records and their Pinecone vectors ("values"), then map the new files."""
+        records = [dict(r) for r in records]
+        vectors = [r.pop("values", None) for r in records]
+        if any(len(v or ()) != self.embedder.dim for v in vectors):
+            raise ValueError(
+                f"Exported vectors for org {self.org_name} are missing or not {self.embedder.dim}-dimensional; "
+                "SCOOBY_VECTOR_REPLICA_EMBEDDER must name the model that produced them"
+            )
+        matrix = None
+        if records:
+            # The index uses the cosine metric; unit rows make it a plain dot product at search time
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+        if matrix is not None:
+            tmp_matrix = self.matrix_path + ".tmp"
+            mm = np.memmap(tmp_matrix, dtype=np.float32, mode="w+", shape=matrix.shape)
+            mm[:] = matrix
+            mm.flush()
+            del mm
+            os.replace(tmp_matrix, self.matrix_path)
+        tmp_meta = self.meta_path + ".tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(
+                {"embedder": self.embedder.name, "dim": self.embedder.dim, "built_at": time.time(), "records": records},
+                f,
+            )
+        os.replace(tmp_meta, self.meta_path)
+        self.load()
+
+    def is_fresh(self) -> bool:
+        return (
+            self.matrix is not None
+            and not self.stale
+            and self.built_at is not None
+            and time.time() - self.built_at < self.max_age_seconds
+        )
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        records, matrix = self._index
+        if matrix is None or not records:
+            return []
+        self.searches += 1
+        vector = np.asarray(self.embedder.embed([query])[0], dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        scores = matrix @ (vector / norm if norm else vector)
+        k = min(top_k, len(records))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{**records[i], "score": float(scores[i])} for i in top]
+
+
+class VectorReplicas:
+    """Local replicas of each org's Pinecone main events, searched in-process.
+
+    Disabled unless SCOOBY_VECTOR_REPLICA_DIR is set. A replica is exported
+    from Pinecone in the background the first time an org searches, and
+    again once it is older than the max age or the org ingested new
+    transcripts; until then (or when it is stale) searches fall back to
+    Pinecone.
+
+    Configuration (env with defaults):
+    - SCOOBY_VECTOR_REPLICA_DIR (default unset, disabled)
+    - SCOOBY_VECTOR_REPLICA_MAX_AGE_SECONDS (default 3600)
+    - SCOOBY_VECTOR_REPLICA_EMBEDDER (required when enabled): "package.module:ClassName" of the
+      embedder that produced the Pinecone vectors; "hashing" is the lexical test embedder
+    - SCOOBY_VECTOR_REPLICA_DIM (default 384, hashing embedder only)
+    """
+
+    def __init__(self, store, directory: Optional[str] = None, embedder=None) -> None:
+        self._store = store
+        self.directory = directory or os.getenv("SCOOBY_VECTOR_REPLICA_DIR") or None
+        self.max_age_seconds = float(os.getenv("SCOOBY_VECTOR_REPLICA_MAX_AGE_SECONDS", "3600"))
+        self._embedder = embedder
+        if self.enabled and embedder is None:
+            # Fail at startup rather than on the first search
+            self._embedder = load_embedder()
+        self._replicas: Dict[str, OrgVectorReplica] = {}
+        # org -> first load of its replica files, shared by concurrent first searches
+        self._loads: Dict[str, asyncio.Future] = {}
+        self._syncs: Dict[str, asyncio.Task] = {}
+        self.local_hits = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _open(self, replica: OrgVectorReplica) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        replica.load()
+
+    async def _replica(self, org_name: str) -> OrgVectorReplica:
+        replica = self._replicas.get(org_name)
+        if replica is None:
+            replica = self._replicas[org_name] = OrgVectorReplica(
+                org_name, self.directory, self._embedder, self.max_age_seconds
+            )
+            self._loads[org_name] = asyncio.ensure_future(asyncio.to_thread(self._open, replica))
+        load = self._loads.get(org_name)
+        if load is not None:
+            await asyncio.shield(load)
+            self._loads.pop(org_name, None)
+        return replica
+
+    async def search(self, query: str, org_name: Optional[str], top_k: int = 5) -> Optional[List[Dict]]:
+        """Local top-k, or None when the replica is missing or stale (a resync is then started)."""
+        if not self.enabled:
+            return None
+        replica = await self._replica(org_name or "")
+        if not replica.is_fresh():
+            self.fallbacks += 1
+            self._schedule_sync(org_name or "")
+            return None
+        self.local_hits += 1
+        # Embedding the query and the matrix product are CPU-bound
+        return await asyncio.to_thread(replica.search, query, top_k)
+
+    def _schedule_sync(self, org_name: str) -> None:
+        task = self._syncs.get(org_name)
+        if task is None or task.done():
+            self._syncs[org_name] = asyncio.create_task(self.sync(org_name))
+
+    async def sync(self, org_name: str) -> None:
+        started = time.perf_counter()
+        try:
+            records = await self._store.export_records(org_name or None)
+            replica = await self._replica(org_name)
+            await asyncio.to_thread(replica.build, records)
+            logger.info(
+                f"Vector replica for org {org_name} synced: {len(records)} records "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.warning(f"Vector replica sync for org {org_name} failed: {e}")
+
+    def invalidate(self, org_name: Optional[str]) -> None:
+        replica = self._replicas.get(org_name or "")
+        if replica is not None:
+            replica.stale = True
+
+    def metrics(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "local_hits": self.local_hits,
+            "fallbacks": self.fallbacks,
+            "orgs": {
+                org: {"records": len(r.records), "fresh": r.is_fresh(), "built_at": r.built_at, "searches": r.searches}
+                for org, r in self._replicas.items()
+            },
+        }
@@ -1,5 +1,6 @@
 import httpx
 from fastapi import HTTPException
+from urllib.parse import urlencode
 import os
 
 
@@ -12,13 +13,18 @@ class RecallBot():
     def __init__(self) -> None:
         pass
     
-    async def add_bots(self, meeting_url : str, bot_name : str = "scooby"):
+    async def add_bots(self, meeting_url : str, bot_name : str = "scooby", channel : str | None = None):
     
         recall_api_url = "https://us-west-2.recall.ai/api/v1/bot/"
         recall_api_key = os.getenv("RECALL_API_KEY")
         if not recall_api_key:
             raise HTTPException(status_code=500, detail="Missing RECALL_API_KEY environment variable")
         
+        # The output-media page subscribes to this channel on /ws so it only plays this bot's audio
+        output_media_url = "https://pulse-dev.scooby.getpulseinsights.ai/"
+        if channel:
+            output_media_url += "?" + urlencode({"channel": channel})
+
         payload = {
             "meeting_url": meeting_url,
             "bot_name": bot_name,
@@ -44,7 +50,7 @@ class RecallBot():
                 "camera": { 
                     "kind": "webpage",
                     "config": {
-                        "url": "https://pulse-dev.scooby.getpulseinsights.ai/"
+                        "url": output_media_url
                     }
                 }
             },
@@ -0,0 +1,201 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from app.service.transcript_ingestion import TranscriptIngestion
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingTranscriptIngestion:
+    """Ingests a meeting's transcript while the meeting is still running.
+
+    The intake is opened with the first chunk and new transcript content is
+    uploaded in chunks as it accumulates, so when the call ends only the tail
+    is left to upload before the intake is finalized. A chunk is cut once
+    CHUNK_BYTES are pending or CHUNK_SECONDS have passed: text transcripts are
+    cut on line boundaries into <base>.partNNNN.txt chunks, and jsonl
+    transcripts have their open segment sealed early (the writer continues in
+    a new one) so each gzipped segment is a chunk. Chunks go up one at a time, in order, and
+    a chunk that still fails after TranscriptIngestion's retries stays at the
+    head of the queue for the next tick instead of being skipped (its
+    idempotency key is derived from its content, so a re-send is recognised).
+    If the intake cannot be completed this way, `ingest_transcript` falls back
+    to a one-shot upload of the full transcript.
+
+    `ingest_transcript` has the same signature as TranscriptIngestion's, so
+    BotContext.ingest_and_cleanup_transcript can use either.
+
+    Configuration (env with defaults):
+    - SCOOBY_INGEST_POLL_SECONDS (default 5): how often pending content is checked
+    - SCOOBY_INGEST_CHUNK_SECONDS (default 120)
+    - SCOOBY_INGEST_CHUNK_BYTES (default 32768)
+    """
+
+    def __init__(self, ingestion: TranscriptIngestion, transcript_writer) -> None:
+        self.ingestion = ingestion
+        self.writer = transcript_writer
+        self.POLL_SECONDS = float(os.getenv("SCOOBY_INGEST_POLL_SECONDS", "5"))
+        self.CHUNK_SECONDS = float(os.getenv("SCOOBY_INGEST_CHUNK_SECONDS", "120"))
+        self.CHUNK_BYTES = int(os.getenv("SCOOBY_INGEST_CHUNK_BYTES", "32768"))
+        self.intake_id: Optional[Union[str, int]] = None
+        # Reused if opening the intake has to be retried on a later tick
+        self._init_key = str(uuid.uuid4())
+        # Chunks cut from the transcript but not yet accepted by the intake API, in upload order
+        self._pending: List[Tuple[str, bytes]] = []
+        self._offset = 0  # text: bytes of the transcript file already cut into chunks
+        self._queued_files: set = set()  # jsonl: sealed segments already queued
+        self._seq = 0
+        self._last_cut = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.chunks_uploaded = 0
+        self.bytes_uploaded = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic uploads, letting an in-flight chunk finish."""
+        task = self._task
+        if task is not None:
+            self._closing = True
+            self._wake.set()
+            await task
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            while not self._closing:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                if self._closing:
+                    break
+                await self.upload_ready(final=False)
+        except Exception as e:
+            logger.exception(f"Streaming ingestion for {self.writer.base_name} stopped: {e}")
+
+    async def _open(self) -> bool:
+        if self.intake_id is None:
+            res = await self.ingestion.init_intake(idempotency_key=self._init_key)
+            self.intake_id = self.ingestion.intake_id_from(res) if res.get("success") else None
+            if self.intake_id is None:
+                logger.warning(f"Could not open a streaming intake for {self.writer.base_name}: {res}")
+            else:
+                logger.info(f"Opened streaming intake {self.intake_id} for {self.writer.base_name}")
+        return self.intake_id is not None
+
+    def _cut_chunks(self, final: bool) -> None:
+        """Queue transcript content that is ready to upload. Blocking file I/O; run off the event loop."""
+        if self.writer.FORMAT == "jsonl":
+            # Sealed (gzipped) segments never change again; the open one is sealed by _roll() or drain()
+            for path in self.writer.files():
+                if path.endswith(".gz") and path not in self._queued_files:
+                    with open(path, "rb") as f:
+                        self._pending.append((os.path.basename(path), f.read()))
+                    self._queued_files.add(path)
+                    self._last_cut = time.monotonic()
+            return
+        path = self.writer.path
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        waiting = size - self._offset
+        if waiting <= 0:
+            return
+        if not final and waiting < self.CHUNK_BYTES and time.monotonic() - self._last_cut < self.CHUNK_SECONDS:
+            return
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(waiting)
+        if not final:
+            # Only whole lines; the rest goes with the next chunk
+            data = data[: data.rfind(b"\n") + 1]
+        if not data:
+            return
+        self._offset += len(data)
+        self._pending.append((f"{self.writer.base_name}.part{self._seq:04d}.txt", data))
+        self._seq += 1
+        self._last_cut = time.monotonic()
+
+    async def _roll(self) -> None:
+        """jsonl: seal the open segment once it holds CHUNK_BYTES, or anything after CHUNK_SECONDS."""
+        due = time.monotonic() - self._last_cut >= self.CHUNK_SECONDS
+        if await self.writer.seal(min_bytes=1 if due else self.CHUNK_BYTES):
+            self._last_cut = time.monotonic()
+
+    async def upload_ready(self, final: bool = False) -> bool:
+        """Upload every chunk that is ready, in order. False if one could not be delivered."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.writer.FORMAT == "jsonl" and not final:
+                await self._roll()
+            await asyncio.get_running_loop().run_in_executor(None, self._cut_chunks, final)
+            if not self._pending:
+                return True
+            if not await self._open():
+                return False
+            while self._pending:
+                filename, content = self._pending[0]
+                res = await self.ingestion.upload_content(self.intake_id, filename, content)
+                if not res.get("success"):
+                    logger.warning(f"Chunk {filename} not accepted by intake {self.intake_id}; will retry: {res}")
+                    return False
+                self._pending.pop(0)
+                self.chunks_uploaded += 1
+                self.bytes_uploaded += len(content)
+            return True
+
+    async def ingest_transcript(
+        self,
+        x_org_name: str,
+        transcript_filepath: Union[str, List[str]],
+        on_step: Optional[Callable[[str], None]] = None,
+    ) -> Dict:
+        """Upload the tail and finalize the streaming intake; falls back to a full one-shot ingest."""
+        step = on_step or (lambda _name: None)
+        await self.stop()
+        started = time.perf_counter()
+        step("upload_file")
+        if await self.upload_ready(final=True) and self.chunks_uploaded:
+            step("get_intake_status")
+            status_res = await self.ingestion.wait_until_ready(self.intake_id)
+            if status_res.get("success"):
+                step("finalize_intake")
+                finalize_res = await self.ingestion.finalize_intake(self.intake_id)
+                if finalize_res.get("success"):
+                    logger.info(
+                        f"Streaming intake {self.intake_id} finalized: {self.chunks_uploaded} chunks, "
+                        f"{self.bytes_uploaded} bytes, {(time.perf_counter() - started) * 1000:.0f}ms after the call"
+                    )
+                    return {
+                        "success": True,
+                        "step": "finalize_intake",
+                        "intake_id": self.intake_id,
+                        "streaming": self.metrics(),
+                        "status": status_res,
+                        "finalize": finalize_res,
+                    }
+        logger.warning(
+            f"Streaming intake {self.intake_id} for {self.writer.base_name} could not be completed; "
+            f"falling back to a full upload"
+        )
+        return await self.ingestion.ingest_transcript(x_org_name, transcript_filepath, on_step=on_step)
+
+    def metrics(self) -> Dict:
+        return {
+            "intake_id": self.intake_id,
+            "chunks_uploaded": self.chunks_uploaded,
+            "chunks_pending": len(self._pending),
+            "bytes_uploaded": self.bytes_uploaded,
+            "retries": self.ingestion.retries,
+        }
@@ -1,129 +1,266 @@
 import uuid
-from typing import Dict, Optional, Union
+import random
+import asyncio
+import hashlib
+import importlib.util
+from typing import Callable, Dict, List, Optional, Union
 
 import os
+import time
 import httpx
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Intake statuses that mean the backend is still working on uploads
+_PENDING_STATUSES = {
+    s.strip().lower()
+    for s in os.getenv("SCOOBY_INGEST_PENDING_STATUSES", "pending,queued,processing,uploading,in_progress").split(",")
+    if s.strip()
+}
+# Intake statuses that mean it will never become ready; anything that is neither counts as ready
+_FAILED_STATUSES = {
+    s.strip().lower()
+    for s in os.getenv(
+        "SCOOBY_INGEST_FAILED_STATUSES", "failed,failure,error,errored,rejected,cancelled,canceled,expired"
+    ).split(",")
+    if s.strip()
+}
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def shared_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive client for the intake API, created on first use."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        http2 = os.getenv("SCOOBY_INGEST_HTTP2", "false").lower() in ("1", "true", "yes")
+        if http2 and not _http2_available():
+            logger.warning("SCOOBY_INGEST_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        _shared_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("SCOOBY_INGEST_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("SCOOBY_INGEST_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=float(os.getenv("SCOOBY_INGEST_KEEPALIVE_SECONDS", "30")),
+            ),
+        )
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 class TranscriptIngestion:
-    def __init__(self, org_name: str, base_url: str = "https://dev.pulse-api.getpulseinsights.ai", timeout: float = 30.0):
+    """Client for the Pulse intake API (init -> upload -> status -> finalize).
+
+    All instances share one keep-alive connection pool (see `shared_client`),
+    so consecutive steps and concurrent ingestions reuse connections instead
+    of handshaking per request. Timeouts, 408/429/5xx responses and transport
+    errors are retried with full-jitter exponential backoff (honouring
+    Retry-After); every request carries an x-idempotency-key that stays the
+    same across its retries, and upload/finalize keys are derived from the
+    intake and content so a chunk re-sent later is still recognised.
+    `wait_until_ready` polls the intake status until it leaves the pending
+    statuses, and reports failure if it lands in a failed one.
+
+    Configuration (env with defaults):
+    - SCOOBY_INGEST_HTTP2 (default false): needs the h2 package
+    - SCOOBY_INGEST_MAX_CONNECTIONS (default 20)
+    - SCOOBY_INGEST_MAX_KEEPALIVE (default 10)
+    - SCOOBY_INGEST_KEEPALIVE_SECONDS (default 30)
+    - SCOOBY_INGEST_RETRIES (default 3)
+    - SCOOBY_INGEST_RETRY_BACKOFF_SECONDS (default 1)
+    - SCOOBY_INGEST_RETRY_MAX_SECONDS (default 30)
+    - SCOOBY_INGEST_STATUS_POLL_SECONDS (default 1): first poll delay, grows 1.5x up to 10s
+    - SCOOBY_INGEST_STATUS_TIMEOUT_SECONDS (default 120)
+    - SCOOBY_INGEST_PENDING_STATUSES (default "pending,queued,processing,uploading,in_progress")
+    - SCOOBY_INGEST_FAILED_STATUSES (default "failed,failure,error,errored,rejected,cancelled,canceled,expired")
+    """
+
+    def __init__(
+        self,
+        org_name: str,
+        base_url: str = "https://dev.pulse-api.getpulseinsights.ai",
+        timeout: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
         self.org_name = org_name
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self._client = client
+        self.RETRIES = int(os.getenv("SCOOBY_INGEST_RETRIES", "3"))
+        self.RETRY_BACKOFF_SECONDS = float(os.getenv("SCOOBY_INGEST_RETRY_BACKOFF_SECONDS", "1"))
+        self.RETRY_MAX_SECONDS = float(os.getenv("SCOOBY_INGEST_RETRY_MAX_SECONDS", "30"))
+        self.STATUS_POLL_SECONDS = float(os.getenv("SCOOBY_INGEST_STATUS_POLL_SECONDS", "1"))
+        self.STATUS_TIMEOUT_SECONDS = float(os.getenv("SCOOBY_INGEST_STATUS_TIMEOUT_SECONDS", "120"))
+        self.requests = 0
+        self.retries = 0
         logger.debug("TranscriptIngestion initialized")
 
-    async def init_intake(self) -> Dict:
-        url = f"{self.base_url}/api/intakes/init"
-        headers = {"x-org-name": self.org_name, "x-idempotency-key": str(uuid.uuid4())}
-        try:
-            logger.info("[init_intake] POST %s", url)
-            logger.debug("[init_intake] headers=%s", headers)
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                r = await client.post(url, headers=headers)
-            logger.info("[init_intake] Response %s %s", r.status_code, r.text)
-            if r.status_code in (200, 201):
-                return {"success": True, "data": r.json()}
-            return {"success": False, "message": r.text, "status_code": r.status_code}
-        except httpx.TimeoutException:
-            logger.error("[init_intake] Timeout after %ss", self.timeout)
-            return {"success": False, "message": "Timeout", "status_code": 408}
-        except Exception as e:
-            logger.exception("[init_intake] Exception: %s", e)
-            return {"success": False, "message": str(e)}
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or shared_client()
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), self.RETRY_MAX_SECONDS)
+        return random.uniform(0, min(self.RETRY_MAX_SECONDS, self.RETRY_BACKOFF_SECONDS * (2 ** attempt)))
+
+    async def _request(self, step: str, method: str, path: str, *, idempotency_key: Optional[str] = None, **kwargs) -> Dict:
+        url = f"{self.base_url}{path}"
+        headers = {"x-org-name": self.org_name, "x-idempotency-key": idempotency_key or str(uuid.uuid4())}
+        attempt = 0
+        while True:
+            response = None
+            try:
+                logger.info("[%s] %s %s (attempt %s)", step, method, url, attempt + 1)
+                logger.debug("[%s] headers=%s", step, headers)
+                self.requests += 1
+                response = await self.client.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+                logger.info("[%s] Response %s %s", step, response.status_code, response.text)
+                if response.status_code in (200, 201):
+                    return {"success": True, "data": response.json()}
+                result = {"success": False, "message": response.text, "status_code": response.status_code}
+                retryable = response.status_code in (408, 429) or response.status_code >= 500
+            except httpx.TimeoutException:
+                logger.error("[%s] Timeout after %ss", step, self.timeout)
+                result = {"success": False, "message": "Timeout", "status_code": 408}
+                retryable = True
+            except httpx.TransportError as e:
+                logger.error("[%s] Transport error: %s", step, e)
+                result = {"success": False, "message": str(e)}
+                retryable = True
+            except Exception as e:
+                logger.exception("[%s] Exception: %s", step, e)
+                return {"success": False, "message": str(e)}
+            if not retryable or attempt >= self.RETRIES:
+                return result
+            delay = self._retry_delay(attempt, response)
+            attempt += 1
+            self.retries += 1
+            logger.warning("[%s] Retry %s/%s in %.2fs", step, attempt, self.RETRIES, delay)
+            await asyncio.sleep(delay)
+
+    async def init_intake(self, idempotency_key: Optional[str] = None) -> Dict:
+        return await self._request("init_intake", "POST", "/api/intakes/init", idempotency_key=idempotency_key)
 
     async def upload_file(self, intake_id: Union[str, int], file_path: str) -> Dict:
-        url = f"{self.base_url}/api/upload/file/{intake_id}"
-        headers = {"x-org-name": self.org_name}
         try:
-            filename = os.path.basename(file_path)
-            file_size = None
-            try:
-                file_size = os.path.getsize(file_path)
-            except Exception:
-                file_size = None
-            logger.info("[upload_file] POST %s", url)
-            logger.debug("[upload_file] headers=%s", headers)
-            logger.info("[upload_file] file name=%s size=%s bytes", filename, file_size)
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                with open(file_path, "rb") as f:
-                    files = {"file": (filename, f)}
-                    r = await client.post(url, headers=headers, files=files)
-            logger.info("[upload_file] Response %s %s", r.status_code, r.text)
-            if r.status_code in (200, 201):
-                return {"success": True, "data": r.json()}
-            return {"success": False, "message": r.text, "status_code": r.status_code}
-        except httpx.TimeoutException:
-            logger.error("[upload_file] Timeout after %ss", self.timeout)
-            return {"success": False, "message": "Timeout", "status_code": 408}
+            content = await asyncio.to_thread(_read_file, file_path)
         except Exception as e:
-            logger.exception("[upload_file] Exception: %s", e)
+            logger.exception("[upload_file] Could not read %s: %s", file_path, e)
             return {"success": False, "message": str(e)}
+        return await self.upload_content(intake_id, os.path.basename(file_path), content)
+
+    async def upload_content(self, intake_id: Union[str, int], filename: str, content: bytes) -> Dict:
+        logger.info("[upload_file] file name=%s size=%s bytes", filename, len(content))
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        return await self._request(
+            "upload_file",
+            "POST",
+            f"/api/upload/file/{intake_id}",
+            idempotency_key=f"{intake_id}:{filename}:{digest}",
+            files={"file": (filename, content)},
+        )
 
     async def get_intake_status(self, intake_id: Union[str, int]) -> Dict:
-        url = f"{self.base_url}/api/intakes/{intake_id}"
-        headers = {"x-org-name": self.org_name}
-        try:
-            logger.info("[get_intake_status] GET %s", url)
-            logger.debug("[get_intake_status] headers=%s", headers)
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                r = await client.get(url, headers=headers)
-            logger.info("[get_intake_status] Response %s %s", r.status_code, r.text)
-            if r.status_code in (200, 201):
-                return {"success": True, "data": r.json()}
-            return {"success": False, "message": r.text, "status_code": r.status_code}
-        except httpx.TimeoutException:
-            logger.error("[get_intake_status] Timeout after %ss", self.timeout)
-            return {"success": False, "message": "Timeout", "status_code": 408}
-        except Exception as e:
-            logger.exception("[get_intake_status] Exception: %s", e)
-            return {"success": False, "message": str(e)}
+        return await self._request("get_intake_status", "GET", f"/api/intakes/{intake_id}")
+
+    @staticmethod
+    def _intake_state(status_res: Dict) -> Optional[str]:
+        data = status_res.get("data")
+        if not isinstance(data, dict):
+            return None
+        state = data.get("status") or data.get("state")
+        return str(state).lower() if state is not None else None
+
+    async def wait_until_ready(self, intake_id: Union[str, int]) -> Dict:
+        """Poll the intake status until it is no longer pending (or the status timeout passes).
+
+        A failed intake comes back with success False, so it is never finalized.
+        """
+        deadline = time.monotonic() + self.STATUS_TIMEOUT_SECONDS
+        delay = self.STATUS_POLL_SECONDS
+        while True:
+            status_res = await self.get_intake_status(intake_id)
+            state = self._intake_state(status_res)
+            if not status_res.get("success"):
+                return status_res
+            if state in _FAILED_STATUSES:
+                logger.warning("[get_intake_status] Intake %s is %s", intake_id, state)
+                return {**status_res, "success": False, "message": f"Intake {state}"}
+            if state not in _PENDING_STATUSES:
+                return status_res
+            if time.monotonic() + delay > deadline:
+                logger.warning("[get_intake_status] Intake %s still %s after %ss", intake_id, state, self.STATUS_TIMEOUT_SECONDS)
+                return {**status_res, "success": False, "message": f"Intake still {state}", "status_code": 408}
+            logger.info("[get_intake_status] Intake %s is %s; polling again in %.1fs", intake_id, state, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 10.0)
 
     async def finalize_intake(self, intake_id: Union[str, int]) -> Dict:
-        url = f"{self.base_url}/api/intakes/{intake_id}/finalize"
-        headers = {"x-org-name": self.org_name}
-        try:
-            logger.info("[finalize_intake] POST %s", url)
-            logger.debug("[finalize_intake] headers=%s", headers)
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                r = await client.post(url, headers=headers)
-            logger.info("[finalize_intake] Response %s %s", r.status_code, r.text)
-            if r.status_code in (200, 201):
-                return {"success": True, "data": r.json()}
-            return {"success": False, "message": r.text, "status_code": r.status_code}
-        except httpx.TimeoutException:
-            logger.error("[finalize_intake] Timeout after %ss", self.timeout)
-            return {"success": False, "message": "Timeout", "status_code": 408}
-        except Exception as e:
-            logger.exception("[finalize_intake] Exception: %s", e)
-            return {"success": False, "message": str(e)}
+        return await self._request(
+            "finalize_intake", "POST", f"/api/intakes/{intake_id}/finalize", idempotency_key=f"{intake_id}:finalize"
+        )
+
+    @staticmethod
+    def intake_id_from(init_res: Dict) -> Optional[Union[str, int]]:
+        data = init_res.get("data") or {}
+        return data.get("intake_id") or data.get("id") or data.get("intakeId")
 
-    async def ingest_transcript(self, x_org_name: str, transcript_filepath: str) -> Dict:
+    async def ingest_transcript(
+        self,
+        x_org_name: str,
+        transcript_filepath: Union[str, List[str]],
+        on_step: Optional[Callable[[str], None]] = None,
+    ) -> Dict:
+        """Run one intake for a transcript; several files (segmented transcripts) are uploaded in order."""
         self.org_name = x_org_name
+        file_paths = [transcript_filepath] if isinstance(transcript_filepath, str) else list(transcript_filepath)
+        step = on_step or (lambda _name: None)
         logger.info("[ingest_transcript] Start ingest for org_name=%s file=%s", x_org_name, transcript_filepath)
+        step("init_intake")
         init_res = await self.init_intake()
         logger.info("[ingest_transcript] init_intake result=%s", init_res)
         
         if not init_res.get("success"):
             return {"step": "init_intake", **init_res}
 
-        data = init_res.get("data") or {}
-        intake_id = data.get("intake_id") or data.get("id") or data.get("intakeId")
+        intake_id = self.intake_id_from(init_res)
         if not intake_id:
-            logger.error("[ingest_transcript] Missing intake_id in init response: %s", data)
+            logger.error("[ingest_transcript] Missing intake_id in init response: %s", init_res.get("data"))
             return {"success": False, "step": "init_intake", "message": "Missing intake_id in response"}
 
-        upload_res = await self.upload_file(intake_id, transcript_filepath)
-        logger.info("[ingest_transcript] upload_file result=%s", upload_res)
-        if not upload_res.get("success"):
-            return {"step": "upload_file", **upload_res, "intake_id": intake_id}
+        step("upload_file")
+        for file_path in file_paths:
+            upload_res = await self.upload_file(intake_id, file_path)
+            logger.info("[ingest_transcript] upload_file %s result=%s", file_path, upload_res)
+            if not upload_res.get("success"):
+                return {"step": "upload_file", **upload_res, "intake_id": intake_id, "file": file_path}
 
-        status_res = await self.get_intake_status(intake_id)
+        step("get_intake_status")
+        status_res = await self.wait_until_ready(intake_id)
         logger.info("[ingest_transcript] get_intake_status result=%s", status_res)
         if not status_res.get("success"):
             return {"step": "get_intake_status", **status_res, "intake_id": intake_id}
 
+        step("finalize_intake")
         finalize_res = await self.finalize_intake(intake_id)
         logger.info("[ingest_transcript] finalize_intake result=%s", finalize_res)
         return {
@@ -1,17 +1,66 @@
-from pinecone import Pinecone
-from typing import Dict, Optional
+from pinecone import PineconeAsyncio
+from typing import Dict, List, Optional, Tuple
+import os
+import re
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 class PineconeStore():
-    def __init__(self, api_key, index_name="main-events-index"):
-        self.pc = Pinecone(api_key=api_key)
+    """Async Pinecone access with a warm connection pool and a lazily resolved index.
+
+    Nothing touches the network until the first search: the index host is
+    then looked up (and the index created if missing) once and the handle is
+    cached. Every search carries its own timeout, so a slow Pinecone only
+    fails that tool call. Setting PINECONE_HOST skips the lookup and talks to
+    that host directly, e.g. a Pinecone Local container for offline testing.
+
+    Searches can be scoped to an org, so each org's question is only ranked
+    against its own records: "namespace" routes to a per-org namespace,
+    "filter" adds an equality filter on the org metadata field, and "none"
+    keeps the single shared namespace. Meeting and time-range filters stack
+    on top of the org scope.
+
+    Configuration (env with defaults):
+    - PINECONE_HOST (default unset): index host override
+    - SCOOBY_PINECONE_TIMEOUT_SECONDS (default 5)
+    - SCOOBY_PINECONE_POOL_SIZE (default 20)
+    - SCOOBY_PINECONE_ORG_SCOPE (default "none"): none | namespace | filter
+    - SCOOBY_PINECONE_NAMESPACE_TEMPLATE (default "{org}"): per-org namespace in namespace mode
+    - SCOOBY_PINECONE_ORG_FIELD (default "org_name")
+    - SCOOBY_PINECONE_MEETING_FIELD (default "meeting_id")
+    - SCOOBY_PINECONE_TIME_FIELD (default unset): numeric, epoch seconds; date filters need it set
+    """
+
+    def __init__(self, api_key, index_name="main-events-index", host: Optional[str] = None):
+        self.api_key = api_key
         self.index_name = index_name
-    
-    def setup_indexes(self):
-        if not self.pc.has_index(self.index_name):
-            self.pc.create_index_for_model(
+        self.host = host or os.getenv("PINECONE_HOST") or None
+        self.timeout = float(os.getenv("SCOOBY_PINECONE_TIMEOUT_SECONDS", "5"))
+        self.pool_size = int(os.getenv("SCOOBY_PINECONE_POOL_SIZE", "20"))
+        self.org_scope = os.getenv("SCOOBY_PINECONE_ORG_SCOPE", "none").lower()
+        self.namespace_template = os.getenv("SCOOBY_PINECONE_NAMESPACE_TEMPLATE", "{org}")
+        self.org_field = os.getenv("SCOOBY_PINECONE_ORG_FIELD", "org_name")
+        self.meeting_field = os.getenv("SCOOBY_PINECONE_MEETING_FIELD", "meeting_id")
+        self.time_field = os.getenv("SCOOBY_PINECONE_TIME_FIELD") or None
+        # org -> (namespace, base filter); resolved once per org
+        self._scopes: Dict[str, Tuple[str, Optional[Dict]]] = {}
+        self.pc: Optional[PineconeAsyncio] = None
+        self.index = None
+        self._index_lock: Optional[asyncio.Lock] = None
+
+    def _client(self) -> PineconeAsyncio:
+        if self.pc is None:
+            self.pc = PineconeAsyncio(
+                api_key=self.api_key, timeout=self.timeout, connection_pool_maxsize=self.pool_size
+            )
+        return self.pc
+
+    async def setup_indexes(self):
+        pc = self._client()
+        if not await pc.has_index(self.index_name):
+            await pc.create_index_for_model(
                 name=self.index_name,
                 cloud="aws",
                 region="us-east-1",
@@ -21,28 +70,94 @@ class PineconeStore():
                 }
             )
             logger.info(f"Created index: {self.index_name}")
-            
-        self.index = self.pc.Index(self.index_name)
-    
-    def search_main_events(self, query_text: str, top_k: int = 5, filter_dict: Optional[Dict] = None):
-        
+        return (await pc.describe_index(self.index_name)).host
+
+    async def get_index(self):
+        """Resolve the index handle once; concurrent first callers share the lookup."""
+        if self.index is not None:
+            return self.index
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        async with self._index_lock:
+            if self.index is None:
+                host = self.host or await self.setup_indexes()
+                self.index = self._client().IndexAsyncio(host=host)
+                logger.info(f"Pinecone index {self.index_name} resolved at {host}")
+        return self.index
+
+    def scope_for(self, org_name: Optional[str]) -> Tuple[str, Optional[Dict]]:
+        """Namespace and base metadata filter for an org's searches."""
+        key = org_name or ""
+        scope = self._scopes.get(key)
+        if scope is None:
+            if not org_name or self.org_scope == "none":
+                scope = (self.index_name, None)
+            elif self.org_scope == "namespace":
+                org_slug = re.sub(r"[^a-z0-9_-]+", "-", org_name.strip().lower()).strip("-") or "default"
+                scope = (self.namespace_template.format(org=org_slug, index=self.index_name), None)
+            else:
+                scope = (self.index_name, {self.org_field: {"$eq": org_name}})
+            self._scopes[key] = scope
+        return scope
+
+    def build_filter(
+        self,
+        org_name: Optional[str] = None,
+        *,
+        meeting_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        extra: Optional[Dict] = None,
+    ) -> Tuple[str, Optional[Dict]]:
+        namespace, base = self.scope_for(org_name)
+        clauses = [c for c in (base, extra) if c]
+        if meeting_id:
+            clauses.append({self.meeting_field: {"$eq": meeting_id}})
+        if since is not None or until is not None:
+            if not self.time_field:
+                raise ValueError("Date filters need SCOOBY_PINECONE_TIME_FIELD to name the records' time field")
+            window = {}
+            if since is not None:
+                window["$gte"] = since
+            if until is not None:
+                window["$lte"] = until
+            clauses.append({self.time_field: window})
+        if not clauses:
+            return namespace, None
+        return namespace, clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    async def search_main_events(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None,
+        *,
+        org_name: Optional[str] = None,
+        meeting_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ):
+
         try:
-            query_response = self.index.search(
-                namespace=self.index_name,   
-                query={
-                    "inputs": {"text": query_text},
-                    "top_k": top_k,
-                    "filter": filter_dict or {}
-                },
-                fields=["title", "main_event", "sub_events", "summary", "node_id"]
+            index = await self.get_index()
+            namespace, search_filter = self.build_filter(
+                org_name, meeting_id=meeting_id, since=since, until=until, extra=filter_dict
+            )
+            query_response = await index.search(
+                namespace=namespace,
+                top_k=top_k,
+                inputs={"text": query_text},
+                filter=search_filter,
+                fields=["title", "main_event", "sub_events", "summary", "node_id"],
+                timeout=self.timeout,
             )
-            
+
             results = []
-            for hit in query_response["result"]["hits"]:
-                fields = hit.get("fields", {})
+            for hit in query_response.result.hits:
+                fields = hit.fields or {}
                 results.append({
-                    "id": hit.get("_id"),
-                    "score": hit.get("_score"),
+                    "id": hit.id,
+                    "score": hit.score,
                     "main_event": fields.get("main_event", ""),
                     "sub_events": fields.get("sub_events", []),
                     "summary": fields.get("summary", ""),
@@ -60,4 +175,37 @@ class PineconeStore():
                 "status": "error",
                 "message": str(e),
                 "results": []
-            }
\ No newline at end of file
+            }
+
+    async def export_records(self, org_name: Optional[str] = None, batch_size: int = 100) -> List[Dict]:
+        """All main-event records in the org's scope with their stored vectors ("values"), for a local replica."""
+        index = await self.get_index()
+        namespace, _ = self.scope_for(org_name)
+        scoped_to_field = self.org_scope == "filter" and org_name
+        records: List[Dict] = []
+        async for page in index.list(namespace=namespace, limit=batch_size, timeout=self.timeout):
+            ids = [item.id for item in page.vectors]
+            if not ids:
+                continue
+            fetched = await index.fetch(ids=ids, namespace=namespace, timeout=self.timeout)
+            for record_id, vector in fetched.vectors.items():
+                fields = vector.metadata or {}
+                if scoped_to_field and fields.get(self.org_field) != org_name:
+                    continue
+                records.append({
+                    "id": record_id,
+                    "main_event": fields.get("main_event", ""),
+                    "sub_events": fields.get("sub_events", []),
+                    "summary": fields.get("summary", ""),
+                    "title": fields.get("title", ""),
+                    "values": list(vector.values or []),
+                })
+        return records
+
+    async def close(self):
+        if self.index is not None:
+            await self.index.close()
+            self.index = None
+        if self.pc is not None:
+            await self.pc.close()
+            self.pc = None
@@ -3,6 +3,11 @@ let audioContext;
 let isModelSpeaking = false;
 const BOT_TYPE = 'scooby'; // This bot only responds to scooby messages
 
+// Binary audio frame header (little-endian), see app/core/audio_frames.py
+const AUDIO_FRAME_VERSION = 1;
+const AUDIO_FRAME_HEADER_SIZE = 16;
+let lastAudioStream = { streamId: -1, seq: -1 };
+
 const pulseCoreEl = document.getElementById('pulseCore');
 const waveVisualizationEl = document.getElementById('waveVisualization');
 
@@ -27,11 +32,18 @@ async function initAudio() {
 }
 
 function connectWebSocket() { 
-    const wsUrl = `wss://pulse-dev.scooby.getpulseinsights.ai/ws`;
+    // The bot's output-media URL carries ?channel=<id>; subscribe to it so only this bot's audio plays
+    const params = new URLSearchParams({ format: 'binary' });
+    const channel = new URLSearchParams(window.location.search).get('channel');
+    if (channel) {
+        params.set('channel', channel);
+    }
+    const wsUrl = `wss://pulse-dev.scooby.getpulseinsights.ai/ws?${params.toString()}`;
     console.group("connectWebSocket()");
     console.log("🌐 Connecting to:", wsUrl);
     
     ws = new WebSocket(wsUrl);
+    ws.binaryType = 'arraybuffer';
     
     ws.onopen = function() {
         console.log('✅ WS open');
@@ -39,6 +51,12 @@ function connectWebSocket() {
     };
     
     ws.onmessage = function(event) {
+        // Audio arrives as binary frames; only control messages are JSON
+        if (event.data instanceof ArrayBuffer) {
+            handleAudioFrame(event.data);
+            return;
+        }
+
         console.groupCollapsed("📩 WS message");
 
         console.log("Raw event.data typeof:", typeof event.data);
@@ -126,10 +144,49 @@ function handleWebSocketMessage(data) {
                      
 let audioScheduleTime = 0;
 
+function handleAudioFrame(buffer) {
+    if (buffer.byteLength < AUDIO_FRAME_HEADER_SIZE) {
+        console.error("❌ Audio frame too short:", buffer.byteLength);
+        return;
+    }
+    const view = new DataView(buffer);
+    const version = view.getUint8(0);
+    if (version !== AUDIO_FRAME_VERSION) {
+        console.error("❌ Unsupported audio frame version:", version);
+        return;
+    }
+    const sampleRate = view.getUint32(4, true);
+    const streamId = view.getUint32(8, true);
+    const seq = view.getUint32(12, true);
+
+    if (streamId === lastAudioStream.streamId && seq !== lastAudioStream.seq + 1) {
+        console.warn("⚠️ Audio frame gap:", { streamId, expected: lastAudioStream.seq + 1, got: seq });
+    }
+    lastAudioStream = { streamId, seq };
+
+    if (!isModelSpeaking) {
+        showWaveVisualization(true, 'listening');
+    }
+    playPcm(new Uint8Array(buffer, AUDIO_FRAME_HEADER_SIZE), sampleRate);
+}
+
 function playAudio(base64Data) {
-    console.group("playAudio()");
+    if (typeof base64Data !== 'string' || base64Data.length === 0) {
+        console.error("❌ Invalid base64 payload:", base64Data);
+        return;
+    }
+    const raw = atob(base64Data);
+    const bytes = new Uint8Array(raw.length);
+    for (let i = 0; i < raw.length; i++) {
+        bytes[i] = raw.charCodeAt(i);
+    }
+    playPcm(bytes, 24000);
+}
+
+function playPcm(bytes, sampleRate) {
+    console.group("playPcm()");
     console.time("playAudio_total");
-    console.log("▶️ base64 length:", base64Data ? base64Data.length : 0);
+    console.log("📊 PCM bytes:", bytes.length, "sampleRate:", sampleRate);
 
     if (!audioContext) {
         console.error('❌ Audio context not initialized');
@@ -138,27 +195,8 @@ function playAudio(base64Data) {
     }
     
     try {
-        if (typeof base64Data !== 'string' || base64Data.length === 0) {
-            console.error("❌ Invalid base64 payload:", base64Data);
-            console.groupEnd();
-            return;
-        }
-
-        console.time("atob_decode");
-        const raw = atob(base64Data);
-        console.timeEnd("atob_decode");
-        console.log("🔎 Decoded raw length:", raw.length);
-
-        console.time("raw_to_uint8");
-        const bytes = new Uint8Array(raw.length);
-        for (let i = 0; i < raw.length; i++) {
-            bytes[i] = raw.charCodeAt(i);
-        }
-        console.timeEnd("raw_to_uint8");
-        console.log("📊 Uint8Array length:", bytes.length);
-
         console.time("build_wav");
-        const wav = createWAVHeaderAndBlob(bytes, 24000);
+        const wav = createWAVHeaderAndBlob(bytes, sampleRate);
         console.timeEnd("build_wav");
         console.log("📀 WAV total bytes:", wav.byteLength);
 
@@ -0,0 +1,124 @@
+"""24-hour soak of the per-bot segment deduper, on a simulated clock.
+
+Thousands of overlapping synthetic meetings, plus one that lasts the whole
+run, each get their own SegmentDeduper, as BotSession does; ended meetings
+are replaced until the simulated day is over. Every meeting streams
+transcript segments, some of which are resent by "Recall" either verbatim
+or with shifted timestamps, and a meeting's deduper is dropped when it
+ends. Traced memory is sampled every simulated hour, and the run fails if
+it keeps growing after warm-up, if a resend gets through, or if a fresh
+segment is flagged as a duplicate.
+
+Run from the repo root: python -m bench.dedup_soak  (a few minutes)
+"""
+import argparse
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+
+from app.core import dedup as dedup_module
+from app.core.dedup import SegmentDeduper
+
+
+class SimulatedClock:
+    """Stands in for the `time` module inside app.core.dedup so 24 hours pass in seconds."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrent", type=int, default=100)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    clock = SimulatedClock()
+    dedup_module.time = clock
+    horizon = args.hours * 3600
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    samples = []
+    next_sample = 3600.0
+    # (time of the meeting's next segment, meeting number)
+    events = []
+    meetings = {}  # meeting number -> [deduper, speakers, ends_at, media time of the next segment]
+    opened = 0
+    segments = resends = missed_resends = false_duplicates = 0
+    peak_entries = 0
+    marathon = None
+
+    def open_meeting(ends_at: float) -> None:
+        nonlocal opened
+        speakers = [f"Speaker {opened}-{i}" for i in range(rng.randint(2, 8))]
+        meetings[opened] = [SegmentDeduper(), speakers, ends_at, 0.0]
+        heapq.heappush(events, (clock.now + rng.uniform(0, 4), opened))
+        opened += 1
+
+    open_meeting(horizon)
+    while len(meetings) < args.concurrent:
+        open_meeting(clock.now + rng.uniform(15, 75) * 60)
+
+    while events:
+        at, number = heapq.heappop(events)
+        clock.now = at
+        while clock.now >= next_sample and next_sample <= horizon:
+            samples.append(tracemalloc.get_traced_memory()[0])
+            next_sample += 3600.0
+        meeting = meetings[number]
+        deduper, speakers, ends_at, media_time = meeting
+        if clock.now >= ends_at or clock.now >= horizon:
+            # Session end: the deduper goes away with the BotSession
+            del meetings[number]
+            if clock.now < horizon:
+                open_meeting(clock.now + rng.uniform(15, 75) * 60)
+            continue
+
+        length = rng.uniform(1.0, 6.0)
+        speaker = rng.choice(speakers)
+        segments += 1
+        if deduper.is_duplicate(media_time, media_time + length, speaker):
+            false_duplicates += 1
+        if rng.random() < 0.15:
+            # Recall resends: verbatim, or with timestamps shifted by up to 200 ms
+            shift = 0.0 if rng.random() < 0.5 else rng.uniform(-0.2, 0.2)
+            resends += 1
+            if not deduper.is_duplicate(media_time + shift, media_time + length + shift, speaker):
+                missed_resends += 1
+        peak_entries = max(peak_entries, len(deduper))
+        if number == 0:
+            marathon = len(deduper)
+        meeting[3] = media_time + length + rng.uniform(0.05, 1.5)
+        heapq.heappush(events, (clock.now + rng.uniform(2, 6), number))
+
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    print(f"simulated {args.hours:.0f}h, {opened} meetings (up to {args.concurrent} at once) in {elapsed:.1f}s")
+    print(f"segments {segments}, resends {resends}, missed resends {missed_resends}, "
+          f"fresh segments flagged {false_duplicates}")
+    print(f"largest deduper {peak_entries} entries; the 24h meeting's holds {marathon} at the end")
+    print("traced memory by hour (KiB): " + " ".join(f"{s // 1024}" for s in samples))
+
+    failed = missed_resends or false_duplicates
+    if len(samples) >= 4:
+        # After the first hours the meeting mix is steady, so memory must be too
+        settled = max(samples[1:4])
+        final = max(samples[-3:])
+        growth = final / settled - 1
+        print(f"growth from hours 2-4 to the last 3 hours: {growth * 100:+.1f}%")
+        failed = failed or growth > 0.25
+    print("FAIL" if failed else "ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
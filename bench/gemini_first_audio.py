@@ -0,0 +1,88 @@
+"""Time to first audio chunk: one Gemini Live connection per question vs the persistent per-bot session.
+
+Needs a real GEMINI_API_KEY (read from the environment or .env); nothing is
+mocked. The questions do not need tools, so Neo4j and Pinecone are never
+queried, but GeminiTools still reads their settings at import.
+
+Run from the repo root: python -m bench.gemini_first_audio [--questions 8]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.service.gemini_live import GeminiLive
+from app.service.gemini_session import GeminiLiveSession
+
+QUESTIONS = [
+    "In one short sentence, what is a stand-up meeting?",
+    "Say good morning to the team in five words.",
+    "In one sentence, why do teams write meeting notes?",
+    "Name one tip for running a shorter meeting.",
+    "In one sentence, what is an action item?",
+    "Give a one-line definition of a retrospective.",
+    "In one sentence, what makes an agenda useful?",
+    "Say thanks for joining in one short sentence.",
+]
+
+
+class FirstAudioRecorder:
+    """Takes the place of the ConnectionManager and notes when each answer's first audio chunk arrives."""
+
+    def __init__(self) -> None:
+        self.first_audio_at = None
+
+    def send_audio(self, data, *, stream_id=None, seq=0, channel=None) -> None:
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+
+
+async def _measure(ask, recorder: FirstAudioRecorder, question: str) -> float:
+    recorder.first_audio_at = None
+    started = time.perf_counter()
+    await ask(question)
+    if recorder.first_audio_at is None:
+        raise RuntimeError(f"No audio came back for {question!r}")
+    return (recorder.first_audio_at - started) * 1000
+
+
+async def per_question(questions) -> list:
+    recorder = FirstAudioRecorder()
+    model = GeminiLive(connection_manager=recorder)
+    await model.connect_to_gemini("Reply with one word: ready.")  # warm-up, not counted
+    return [await _measure(model.connect_to_gemini, recorder, q) for q in questions]
+
+
+async def persistent(questions) -> list:
+    recorder = FirstAudioRecorder()
+    model = GeminiLive(connection_manager=recorder)
+    session = GeminiLiveSession(model, bot_id="bench")
+    session.start()  # as at bot join
+    try:
+        await session.ask("Reply with one word: ready.")  # warm-up, not counted
+        return [await _measure(session.ask, recorder, q) for q in questions]
+    finally:
+        await session.close()
+
+
+def _summary(name: str, samples: list) -> str:
+    ordered = sorted(samples)
+    p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+    return (f"{name:28s} n={len(samples)}  p50 {statistics.median(samples):6.0f} ms  "
+            f"p90 {p90:6.0f} ms  max {ordered[-1]:6.0f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=len(QUESTIONS))
+    args = parser.parse_args()
+    questions = (QUESTIONS * (args.questions // len(QUESTIONS) + 1))[: args.questions]
+
+    one_shot = await per_question(questions)
+    kept = await persistent(questions)
+    print(_summary("connect per question", one_shot))
+    print(_summary("persistent session", kept))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
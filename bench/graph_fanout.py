@@ -0,0 +1,177 @@
+"""connections_retrieval_tool response size on synthetic high-degree graphs: unbounded vs capped and paged.
+
+Each case asks for one hub event of the given degree plus two ordinary
+events. The unbounded side is the result of the old query (every neighbour
+of every event); the capped side is what build_connections_page returns
+from the per-event pages the new query ships. Sizes are before
+ResponseShaper, which would otherwise cut the unbounded result down.
+
+Run from the repo root: python -m bench.graph_fanout
+
+With --neo4j, the same hubs are also created in the database named by
+NEO4J_URI/NEO4J_USER/NEO4J_PASSWORD (nodes tagged `bench: true`, removed
+afterwards), and three queries are timed against them: the unbounded one,
+the first paged one (every neighbour ranked and collected, then sliced) and
+the current fetch_neighbourhoods (cut to the page inside a subquery).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+from app.core.tools import (  # noqa: E402
+    CONNECTIONS_PER_EVENT_LIMIT,
+    CONNECTIONS_TOTAL_LIMIT,
+    GeminiTools,
+    graph,
+)
+
+DEGREES = [50, 500, 5000, 50000]
+SMALL_DEGREE = 8
+
+UNBOUNDED_CYPHER = """
+UNWIND $names AS event_name
+MATCH (e:Event {name: event_name})-[r]-(n)
+RETURN event_name AS event,
+    n.name AS related_node,
+    labels(n)[0] AS node_type,
+    type(r) AS relationship_type,
+    r.description AS relationship_description
+ORDER BY event_name, related_node
+"""
+
+
+COLLECT_ALL_CYPHER = """
+UNWIND $requests AS req
+MATCH (e:Event {name: req.name})-[r]-(n)
+WITH req, r, n, COUNT { (n)--() } AS degree
+ORDER BY req.name, (r.description IS NOT NULL) DESC, degree DESC, n.name
+WITH req, collect({
+    event: req.name,
+    related_node: n.name,
+    node_type: labels(n)[0],
+    relationship_type: type(r),
+    relationship_description: r.description
+}) AS ranked
+RETURN req.name AS event, ranked[req.offset..req.offset + $fetch] AS rows
+"""
+
+
+def neighbours(event: str, degree: int) -> list:
+    """Rows for one event, in the new query's ranking: described relationships first."""
+    return [
+        {
+            "event": event,
+            "related_node": f"{event}-node-{i:05d}",
+            "node_type": "Actor" if i % 3 else "Event",
+            "relationship_type": "INVOLVES" if i % 3 else "RELATED_TO",
+            "relationship_description": "discussed in the weekly sync" if i % 4 == 0 else None,
+        }
+        for i in sorted(range(degree), key=lambda i: (i % 4 != 0, i))
+    ]
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def offline() -> None:
+    per_event = CONNECTIONS_PER_EVENT_LIMIT
+    print(f"caps: {per_event} per event, {CONNECTIONS_TOTAL_LIMIT} in total")
+    print(f"{'hub degree':>10}  {'unbounded rows':>14} {'KiB':>8} {'json ms':>8}   "
+          f"{'capped rows':>11} {'KiB':>6} {'json ms':>8}  {'pages to read 200 hub rows':>26}")
+    for degree in DEGREES:
+        names = ["hub", "small-a", "small-b"]
+        rows = {"hub": neighbours("hub", degree)}
+        rows.update({n: neighbours(n, SMALL_DEGREE) for n in names[1:]})
+        unbounded = [row for name in names for row in rows[name]]
+        # What fetch_neighbourhoods gets back: per_event + 1 rows per event, sliced in the database
+        pages = {n: {"rows": rows[n][:per_event], "has_more": len(rows[n]) > per_event} for n in names}
+        capped = GeminiTools.build_connections_page(names, pages)
+
+        # Follow the cursor on the hub alone, as the model would
+        hub_pages, offset = 0, 0
+        while offset < min(200, degree):
+            page = {"rows": rows["hub"][offset:offset + per_event], "has_more": offset + per_event < degree}
+            result = GeminiTools.build_connections_page(["hub"], {"hub": page}, offsets={"hub": offset})
+            offset += len(result["connections"])
+            hub_pages += 1
+            if not result["truncated"]:
+                break
+
+        unbounded_json = json.dumps(unbounded)
+        capped_json = json.dumps(capped)
+        print(f"{degree:>10}  {len(unbounded):>14} {len(unbounded_json) / 1024:>8.1f} "
+              f"{_ms(lambda: json.dumps(unbounded)):>8.2f}   {len(capped['connections']):>11} "
+              f"{len(capped_json) / 1024:>6.1f} {_ms(lambda: json.dumps(capped)):>8.3f}  {hub_pages:>26}")
+
+
+async def against_neo4j(repeat: int) -> None:
+    tools = GeminiTools()
+    names = ["bench-small-a", "bench-small-b"]
+    await graph.ensure_schema()
+    try:
+        for name in names:
+            await _create_event(name, SMALL_DEGREE)
+        print(f"{'hub degree':>10}  {'unbounded p50 ms':>16}  {'collect-all p50 ms':>18}  {'capped p50 ms':>13}")
+        for degree in DEGREES:
+            hub = f"bench-hub-{degree}"
+            await _create_event(hub, degree)
+            requested = [hub] + names
+            unbounded, collect_all, capped = [], [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await graph.read(UNBOUNDED_CYPHER, names=requested)
+                unbounded.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                await graph.read(
+                    COLLECT_ALL_CYPHER,
+                    requests=[{"name": name, "offset": 0} for name in requested],
+                    fetch=CONNECTIONS_PER_EVENT_LIMIT + 1,
+                )
+                collect_all.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                await tools.fetch_neighbourhoods(requested, fresh=True)
+                capped.append((time.perf_counter() - started) * 1000)
+            print(f"{degree:>10}  {statistics.median(unbounded):>16.1f}  {statistics.median(collect_all):>18.1f}  "
+                  f"{statistics.median(capped):>13.1f}")
+    finally:
+        await graph.write("MATCH (n) WHERE n.bench = true DETACH DELETE n")
+        await graph.close()
+
+
+async def _create_event(name: str, degree: int) -> None:
+    for start in range(0, degree, 5000):
+        await graph.write(
+            """
+            MERGE (e:Event {name: $name}) SET e.bench = true
+            WITH e
+            UNWIND range($start, $end - 1) AS i
+            CREATE (n:Actor {name: $name + '-node-' + toString(i), bench: true})
+            CREATE (e)-[:INVOLVES {description: CASE WHEN i % 4 = 0 THEN 'bench' ELSE null END}]->(n)
+            """,
+            name=name, start=start, end=min(degree, start + 5000),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--neo4j", action="store_true", help="also time the queries against NEO4J_URI")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    offline()
+    if args.neo4j:
+        asyncio.run(against_neo4j(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Neighbourhood query latency under concurrent load: the shared async driver vs a sync session per query.
+
+Needs a Neo4j you can write to, e.g. a throwaway local container:
+
+    docker run --rm -p 7687:7687 -e NEO4J_AUTH=neo4j/benchpass neo4j:5
+
+Run from the repo root:
+
+    NEO4J_URI=bolt://localhost:7687 NEO4J_USER=neo4j NEO4J_PASSWORD=benchpass \\
+        python -m bench.neo4j_load --seed --concurrency 32 --seconds 20 --cleanup
+
+--seed creates a synthetic graph of :Event nodes (all tagged `bench: true`)
+and the app's indexes; --cleanup deletes the tagged nodes afterwards. The
+async run goes through GeminiTools.fetch_neighbourhoods with the retrieval
+cache bypassed; the baseline runs the same Cypher the way the old
+Neo4jDriver did: a sync driver, one session per query, records copied with
+dict(record), called from worker threads.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+from neo4j import GraphDatabase  # noqa: E402
+
+from app.core.tools import GeminiTools, graph  # noqa: E402
+
+BASELINE_CYPHER = """
+UNWIND $requests AS req
+MATCH (e:Event {name: req.name})-[r]-(n)
+WITH req, r, n, COUNT { (n)--() } AS degree
+ORDER BY req.name, (r.description IS NOT NULL) DESC, degree DESC, n.name
+WITH req, collect({
+    event: req.name,
+    related_node: n.name,
+    node_type: labels(n)[0],
+    relationship_type: type(r),
+    relationship_description: r.description
+}) AS ranked
+RETURN req.name AS event, ranked[0..$fetch] AS rows
+"""
+
+
+def event_name(i: int) -> str:
+    return f"bench-event-{i:05d}"
+
+
+async def seed(events: int, rng: random.Random) -> None:
+    await graph.ensure_schema()
+    actors = [f"bench-actor-{i:04d}" for i in range(max(50, events // 4))]
+    batch = []
+    for i in range(events):
+        degree = int(rng.paretovariate(1.3) * 4)  # a few hubs, many small events
+        batch.append({
+            "name": event_name(i),
+            "actors": rng.sample(actors, min(degree, len(actors))),
+            "described": rng.random() < 0.5,
+        })
+        if len(batch) == 500 or i == events - 1:
+            await graph.write(
+                """
+                UNWIND $batch AS row
+                MERGE (e:Event {name: row.name}) SET e.bench = true
+                WITH e, row
+                UNWIND row.actors AS actor
+                MERGE (a:Actor {name: actor}) SET a.bench = true
+                MERGE (e)-[r:INVOLVES]->(a)
+                SET r.description = CASE WHEN row.described THEN 'bench' ELSE null END
+                """,
+                batch=batch,
+            )
+            batch = []
+    print(f"seeded {events} events")
+
+
+async def cleanup() -> None:
+    await graph.write("MATCH (n) WHERE n.bench = true DETACH DELETE n")
+    print("removed bench nodes")
+
+
+async def load(call, concurrency: int, seconds: float, events: int, rng: random.Random) -> list:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            names = [event_name(rng.randrange(events)) for _ in range(rng.randint(1, 3))]
+            started = time.perf_counter()
+            await call(names)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def report(name: str, latencies: list, seconds: float) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{name:26s} {len(latencies) / seconds:7.0f} q/s  p50 {statistics.median(ordered):7.2f} ms  "
+          f"p99 {p99:7.2f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--seed", action="store_true", help="create the synthetic graph first")
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic graph afterwards")
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    if args.seed:
+        await seed(args.events, rng)
+    tools = GeminiTools()
+    sync_driver = GraphDatabase.driver(
+        os.environ["NEO4J_URI"], auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
+    )
+
+    def baseline_query(names):
+        with sync_driver.session(database="neo4j") as session:
+            result = session.run(BASELINE_CYPHER, requests=[{"name": n} for n in names], fetch=26)
+            return [dict(record) for record in result]
+
+    try:
+        for name, call in (
+            ("sync session per query", lambda names: asyncio.to_thread(baseline_query, names)),
+            ("shared async pool", lambda names: tools.fetch_neighbourhoods(names, fresh=True)),
+        ):
+            await load(call, args.concurrency, 2.0, args.events, rng)  # warm-up
+            report(name, await load(call, args.concurrency, args.seconds, args.events, rng), args.seconds)
+    finally:
+        sync_driver.close()
+        if args.cleanup:
+            await cleanup()
+        await graph.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""End-to-end transcript ingestion against a local mock intake API: one-shot vs streaming.
+
+The mock server answers init / upload / status / finalize like the Pulse
+intake API, with a fixed latency per request, and reports an intake as
+"processing" for the first few status polls. Each run writes a meeting's
+transcript through TranscriptWriter and ingests it with
+BotContext.ingest_and_cleanup_transcript, as the bot does when it leaves a
+call; the time reported is from the end of the call to the finalized
+intake. The streaming run uploads chunks while the "call" is still going.
+
+A last run marks the intake "failed" and checks that ingestion reports
+failure without finalizing it; the script exits non-zero if it does not.
+
+Run from the repo root: python -m bench.transcript_ingestion [--lines 3000] [--latency-ms 40]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("SCOOBY_INGEST_STATUS_POLL_SECONDS", "0.05")
+os.environ.setdefault("SCOOBY_INGEST_POLL_SECONDS", "0.1")
+os.environ.setdefault("SCOOBY_INGEST_CHUNK_BYTES", "16384")
+os.environ.setdefault("SCOOBY_INGEST_RETRY_BACKOFF_SECONDS", "0.01")
+os.environ.setdefault("SCOOBY_TRANSCRIPT_FLUSH_SECONDS", "0.05")
+
+from app.core.utils import BotContext, TranscriptWriter  # noqa: E402
+from app.service.streaming_ingestion import StreamingTranscriptIngestion  # noqa: E402
+from app.service.transcript_ingestion import TranscriptIngestion, close_shared_client  # noqa: E402
+
+
+class MockIntake:
+    """Thread-backed HTTP server standing in for the intake API."""
+
+    def __init__(self, latency: float, processing_polls: int) -> None:
+        self.latency = latency
+        self.processing_polls = processing_polls
+        self.final_status = "ready"
+        self.requests = 0
+        self.bytes_received = 0
+        self.finalized = []
+        self._polls = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        intake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, body: dict) -> None:
+                time.sleep(intake.latency)
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("content-length") or 0))
+                with intake._lock:
+                    intake.requests += 1
+                    if self.path.endswith("/init"):
+                        intake._next_id += 1
+                        reply = {"intake_id": f"intake-{intake._next_id}"}
+                    elif self.path.startswith("/api/upload/file/"):
+                        intake.bytes_received += len(body)
+                        reply = {"ok": True}
+                    else:
+                        intake.finalized.append(self.path.split("/")[3])
+                        reply = {"ok": True}
+                self._reply(reply)
+
+            def do_GET(self) -> None:
+                intake_id = self.path.rsplit("/", 1)[-1]
+                with intake._lock:
+                    intake.requests += 1
+                    polls = intake._polls[intake_id] = intake._polls.get(intake_id, 0) + 1
+                status = "processing" if polls <= intake.processing_polls else intake.final_status
+                self._reply({"intake_id": intake_id, "status": status})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = self.bytes_received = 0
+            self.finalized = []
+
+
+async def run_call(intake: MockIntake, lines: int, call_seconds: float, streaming: bool) -> dict:
+    directory = tempfile.mkdtemp(prefix="scooby-ingest-")
+    writer = TranscriptWriter(lambda: True, directory, lambda: None, org_name="bench")
+    ingestion = TranscriptIngestion("bench", base_url=intake.base_url)
+    ti = StreamingTranscriptIngestion(ingestion, writer) if streaming else ingestion
+    if streaming:
+        ti.start()
+    intake.reset()
+    # The meeting: lines arrive spread over the call
+    pause = call_seconds / max(lines // 50, 1)
+    for i in range(lines):
+        writer.save_line(f"Speaker {i % 4}", f"line {i} about the launch plan and the pricing review " * 2,
+                         start=float(i), end=i + 0.5)
+        if i % 50 == 49:
+            await asyncio.sleep(pause)
+    ended = time.perf_counter()
+    res = await BotContext.ingest_and_cleanup_transcript(
+        "bench-bot",
+        transcripts_enabled=True,
+        transcripts_dir=directory,
+        meeting_url=None,
+        ti=ti,
+        x_org_name="bench",
+        transcript_writer=writer,
+        logger=logging.getLogger("bench"),
+    )
+    return {
+        "ms": (time.perf_counter() - ended) * 1000,
+        "success": bool(res and res.get("success")),
+        "requests": intake.requests,
+        "kib": intake.bytes_received / 1024,
+        "finalized": list(intake.finalized),
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=3000)
+    parser.add_argument("--call-seconds", type=float, default=3.0, help="how long the simulated call lasts")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="mock server latency per request")
+    parser.add_argument("--processing-polls", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    intake = MockIntake(args.latency_ms / 1000, args.processing_polls)
+    print(f"{args.lines} lines over a {args.call_seconds:.0f}s call, {args.latency_ms:.0f} ms per request, "
+          f"{args.processing_polls} 'processing' polls")
+    failed = False
+    try:
+        for name, streaming in (("one-shot", False), ("streaming", True)):
+            runs = [await run_call(intake, args.lines, args.call_seconds, streaming) for _ in range(args.runs)]
+            if not all(r["success"] for r in runs):
+                print(f"{name}: ingestion failed against the mock server")
+                failed = True
+                continue
+            last = runs[-1]
+            print(f"{name:10s} after the call: median {statistics.median(r['ms'] for r in runs):7.0f} ms  "
+                  f"({last['requests']} requests, {last['kib']:.0f} KiB uploaded)")
+
+        intake.final_status = "failed"
+        res = await run_call(intake, 200, 0.2, streaming=False)
+        intake.final_status = "ready"
+        ok = not res["success"] and not res["finalized"]
+        print(f"failed intake: success={res['success']}, finalized={res['finalized']} -> {'ok' if ok else 'FAIL'}")
+        failed = failed or not ok
+    finally:
+        await close_shared_client()
+        intake.server.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
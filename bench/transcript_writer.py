@@ -0,0 +1,112 @@
+"""TranscriptWriter throughput and event-loop blocking, against the old per-line save_line.
+
+The old writer opened the transcript file, appended one line and closed it
+on every save_line call, on the event loop. The buffered writer appends to
+memory and flushes batches from a worker thread.
+
+Two measurements per writer, with several bots writing at once as on a busy
+server:
+- throughput: lines per second until every line is on disk (drain included);
+- blocking: total time spent inside save_line calls, and how late a 1 ms
+  ticker on the same loop wakes up while the bots write (flushes included).
+
+Run from the repo root: python -m bench.transcript_writer [--bots 20] [--lines 5000] [--dir /path/on/real/disk]
+Use --dir on the disk the transcripts live on; a tmpfs hides the cost of opening files.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from app.core.utils import TranscriptWriter
+
+TEXT = "so I think we should move the launch to next quarter because the pricing page still needs review"
+
+
+class PerLineWriter:
+    """The previous TranscriptWriter.save_line: open, append one line, close."""
+
+    def __init__(self, directory: str, org_name: str) -> None:
+        self._dir = directory
+        self.path = os.path.join(directory, f"Scooby_{org_name}_perline.txt")
+
+    def save_line(self, speaker: str, text: str, **_kwargs) -> None:
+        if not os.path.exists(self._dir):
+            os.makedirs(self._dir, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"{speaker}: {text}\n")
+
+    async def drain(self) -> None:
+        pass
+
+
+def make_writers(kind: str, directory: str, bots: int) -> list:
+    if kind == "per-line":
+        return [PerLineWriter(directory, f"org{b}") for b in range(bots)]
+    return [TranscriptWriter(lambda: True, directory, lambda: None, org_name=f"org{b}") for b in range(bots)]
+
+
+async def run(kind: str, directory: str, bots: int, lines: int) -> dict:
+    writers = make_writers(kind, directory, bots)
+    lags = []
+    in_calls = 0.0
+    done = False
+
+    async def ticker() -> None:
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - started - 0.001) * 1000)
+
+    async def bot(writer) -> None:
+        nonlocal in_calls
+        for i in range(lines):
+            started = time.perf_counter()
+            writer.save_line(f"Speaker {i % 4}", TEXT, start=float(i), end=i + 0.5)
+            in_calls += time.perf_counter() - started
+            if i % 20 == 19:
+                # Recall delivers lines in webhook bursts; let the other bots and the ticker run
+                await asyncio.sleep(0)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(bot(w) for w in writers))
+    await asyncio.gather(*(w.drain() for w in writers))
+    elapsed = time.perf_counter() - started
+    done = True
+    await tick
+    ordered = sorted(lags)
+    return {
+        "lines_per_s": bots * lines / elapsed,
+        "in_calls_ms": in_calls * 1000,
+        "lag_p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0,
+        "lag_max_ms": ordered[-1] if ordered else 0.0,
+        "lag_median_ms": statistics.median(ordered) if ordered else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bots", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=5000, help="lines per bot")
+    parser.add_argument("--dir", default=None, help="where to write (default: a temporary directory)")
+    args = parser.parse_args()
+
+    print(f"{args.bots} bots x {args.lines} lines")
+    print(f"{'writer':10s} {'lines/s':>10s} {'ms in save_line':>16s} {'lag p50':>8s} {'lag p99':>8s} {'lag max':>8s}")
+    for kind in ("per-line", "buffered"):
+        directory = tempfile.mkdtemp(prefix="scooby-writer-", dir=args.dir)
+        try:
+            r = await run(kind, directory, args.bots, args.lines)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"{kind:10s} {r['lines_per_s']:10.0f} {r['in_calls_ms']:16.1f} {r['lag_median_ms']:8.2f} "
+              f"{r['lag_p99_ms']:8.2f} {r['lag_max_ms']:8.2f}")
+    print("lag: how late a 1 ms sleep on the event loop wakes up while the bots write, in ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
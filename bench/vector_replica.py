@@ -0,0 +1,93 @@
+"""Local vector replica vs Pinecone search: recall@5 and latency over the same queries.
+
+Needs a real PINECONE_API_KEY (or PINECONE_HOST pointing at an index you
+can read) and SCOOBY_VECTOR_REPLICA_EMBEDDER naming the embedder that
+produced the index's vectors; nothing is mocked. The org's records are
+exported once into a temporary replica directory, then every query is run
+against both. Recall@5 is the share of Pinecone's top 5 ids that the
+replica also returns in its top 5; local latency includes the hop to the
+worker thread, as in VectorReplicas.search.
+
+Run from the repo root:
+
+    python -m bench.vector_replica [--org acme] [--queries queries.txt] [--repeat 3]
+
+Without --queries, the titles of the first exported records are used.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from app.service.local_vector_index import OrgVectorReplica, load_embedder
+from app.service.vector_store import PineconeStore
+
+TOP_K = 5
+
+
+def _summary(name: str, samples: list) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"{name:16s} p50 {statistics.median(ordered):8.2f} ms  p99 {p99:8.2f} ms"
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--org", default=None)
+    parser.add_argument("--queries", default=None, help="file with one query per line")
+    parser.add_argument("--count", type=int, default=50, help="queries taken from record titles")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    store = PineconeStore(api_key=os.getenv("PINECONE_API_KEY"))
+    embedder = load_embedder()
+    try:
+        started = time.perf_counter()
+        records = await store.export_records(args.org)
+        print(f"exported {len(records)} records in {(time.perf_counter() - started):.1f}s")
+        if not records:
+            print("nothing to compare")
+            return 1
+        directory = tempfile.mkdtemp(prefix="scooby-replica-")
+        replica = OrgVectorReplica(args.org or "", directory, embedder, max_age_seconds=3600)
+        await asyncio.to_thread(replica.build, records)
+
+        if args.queries:
+            with open(args.queries, "r", encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()]
+        else:
+            queries = [r["title"] or r["main_event"] for r in records[: args.count] if r["title"] or r["main_event"]]
+
+        recalls, remote_ms, local_ms = [], [], []
+        for query in queries:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                remote = await store.search_main_events(query, top_k=TOP_K, org_name=args.org)
+                remote_ms.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                local = await asyncio.to_thread(replica.search, query, TOP_K)
+                local_ms.append((time.perf_counter() - started) * 1000)
+            if remote.get("status") != "success":
+                print(f"Pinecone search failed: {remote.get('message')}")
+                return 1
+            expected = {hit["id"] for hit in remote["results"]}
+            if expected:
+                recalls.append(len(expected & {hit["id"] for hit in local}) / len(expected))
+
+        if not recalls:
+            print("Pinecone returned no hits for any query")
+            return 1
+        print(f"{len(queries)} queries x {args.repeat}, top {TOP_K}")
+        print(f"recall@{TOP_K} {statistics.mean(recalls):.3f} (min {min(recalls):.2f})")
+        print(_summary("pinecone", remote_ms))
+        print(_summary("local replica", local_ms))
+        return 0
+    finally:
+        await store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
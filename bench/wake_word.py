@@ -0,0 +1,123 @@
+"""Wake-word accuracy and cost, against the original substring check.
+
+Run from the repo root: python -m bench.wake_word
+Exits non-zero if any corpus line is misclassified.
+"""
+import sys
+import timeit
+
+from app.core.wake_word import SCOOBY_VARIANTS, WakeWordDetector
+
+# Lines that must wake the bot: list spellings, caption misspellings outside the list, punctuation
+POSITIVES = [
+    "Scooby what did we decide about the launch date",
+    "hey scoobie can you summarise the last meeting",
+    "skuby, who owns the pricing page",
+    "what were the action items, Scooby?",
+    "Scooby's take on the roadmap please",
+    "Scoobys opinion?",
+    "SCOOBY list the open risks",
+    "ok scoobi what is the budget",
+    "skoobey what did marketing say",
+    "scoobay remind me of the deadline",
+    "scobie who is presenting next",
+    "scooby-doo where are the notes",
+    "Scooby.",
+]
+
+# Lines that must not: sound-alikes, substrings, and ordinary meeting talk
+NEGATIVES = [
+    "we went scuba diving last weekend",
+    "the floor looks a bit scrubby after the move",
+    "his stubby pencil broke again",
+    "she gave me a snubby look",
+    "the scabby paint needs another coat",
+    "let me scoop up the remaining items",
+    "that is out of scope for this sprint",
+    "the scoreboard shows we are behind",
+    "scrub the data before the export",
+    "school starts on monday for the kids",
+    "I'll skip the intro and go to the numbers",
+    "the scooter rental contract is up for renewal",
+    "can you share your screen so we can see the deck",
+    "the schedule moved to thursday afternoon",
+    "scoobydoo is a cartoon",
+]
+
+# Multi-word bot names: (name, lines that must wake it, lines that must not)
+MULTI_WORD = [
+    (
+        "Pulse Assistant",
+        [
+            "hey Pulse Assistant what is up",
+            "pulse assistant, who owns the pricing page",
+            "what did we agree on, Pulse Assistant?",
+            "Pulse Assistant's view on the roadmap",
+            "pulse-assistant list the open risks",
+            "pulse asisstant what is the budget",
+        ],
+        [
+            "we need a pulse check on the team",
+            "the assistant manager will join later",
+            "the pulse survey and the assistant rollout",
+            "pulses were high after the demo",
+        ],
+    ),
+]
+
+# A typical 22-word transcript line with no wake word
+TYPICAL = "so I think we should move the launch to next quarter because the pricing page still needs review from legal and finance"
+
+# Contains "sc"/"sk" inside words, so it passes the substring gate
+ASKS = "can we discuss the risk register and ask the desk team to describe the tasks for the next sprint in detail today"
+# Worst case: several sound-alike candidates go through the phonetic comparison
+SOUND_ALIKES = "we went scuba diving and it was scrubby and stubby out there today"
+
+
+def baseline(text: str) -> bool:
+    lowered = text.lower()
+    return any(alias in lowered for alias in SCOOBY_VARIANTS)
+
+
+def main() -> int:
+    detector = WakeWordDetector("scooby")
+    errors = 0
+    for line in POSITIVES:
+        match = detector.find(line)
+        if match is None:
+            print(f"FN: {line!r}")
+            errors += 1
+    for line in NEGATIVES:
+        match = detector.find(line)
+        if match is not None:
+            print(f"FP: {line!r} ({match})")
+            errors += 1
+    for name, positives, negatives in MULTI_WORD:
+        named = WakeWordDetector(name)
+        for line in positives:
+            if named.find(line) is None:
+                print(f"FN ({name}): {line!r}")
+                errors += 1
+        for line in negatives:
+            match = named.find(line)
+            if match is not None:
+                print(f"FP ({name}): {line!r} ({match})")
+                errors += 1
+    baseline_fp = sum(baseline(line) for line in NEGATIVES)
+    baseline_fn = sum(not baseline(line) for line in POSITIVES)
+    positives = len(POSITIVES) + sum(len(p) for _, p, _ in MULTI_WORD)
+    negatives = len(NEGATIVES) + sum(len(n) for _, _, n in MULTI_WORD)
+    print(f"corpus: {positives} positives, {negatives} negatives, {errors} misclassified")
+    print(f"baseline substring check: {baseline_fn} FN, {baseline_fp} FP")
+    print(f"'Scooby.' question -> {detector.find('Scooby.').question!r}")
+
+    number = 20000
+    for label, fn in (("baseline any(alias in ...)", baseline), ("WakeWordDetector.find", detector.find)):
+        for text in (TYPICAL, ASKS, SOUND_ALIKES):
+            per_call = timeit.timeit(lambda: fn(text), number=number) / number * 1e6
+            print(f"{label:28s} {per_call:7.2f} us  ({len(text.split())} words, no wake word)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
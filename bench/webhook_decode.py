@@ -0,0 +1,94 @@
+"""Cost of decoding a Recall realtime webhook, per delivery, on the request path and in the worker.
+
+The worker's typed decode must not be slower than the untyped json.loads
+baseline; the script prints the ratio and exits non-zero if it is.
+
+Run from the repo root: python -m bench.webhook_decode
+"""
+import json
+import sys
+import timeit
+
+from app.api.payloads import RealtimeEnvelope, TranscriptEvent, decode_realtime_event, realtime_bot_id
+
+
+def _word(i: int) -> dict:
+    start = 12.0 + i * 0.35
+    return {
+        "text": f"word{i}",
+        "start_timestamp": {"relative": start, "absolute": "2025-06-01T10:00:12.000000Z"},
+        "end_timestamp": {"relative": start + 0.3, "absolute": "2025-06-01T10:00:12.300000Z"},
+    }
+
+
+def transcript_body(words: int = 40) -> bytes:
+    """A transcript.data delivery shaped like Recall's, with the ids and metadata it carries."""
+    ref = {"id": "3fa85f64-5717-4562-b3fc-2c963f66afa6", "metadata": {}}
+    return json.dumps({
+        "event": "transcript.data",
+        "data": {
+            "data": {
+                "words": [_word(i) for i in range(words)],
+                "participant": {
+                    "id": 100, "name": "Alice Example", "is_host": True, "platform": "desktop",
+                    "extra_data": {"zoom": {"user_guid": "16778240", "conf_user_id": "16778240"}},
+                },
+            },
+            "realtime_endpoint": ref,
+            "transcript": ref,
+            "recording": ref,
+            "bot": {"id": "8a7b6c5d-1234-4e5f-9a8b-7c6d5e4f3a2b", "metadata": {"org": "acme"}},
+        },
+    }).encode()
+
+
+def main() -> int:
+    body = transcript_body()
+    number = 5000
+
+    def baseline():
+        payload = json.loads(body)
+        payload["data"]["bot"]["id"]
+        words = payload["data"]["data"]["words"]
+        " ".join(w["text"] for w in words)
+
+    def envelope_then_model():
+        RealtimeEnvelope.model_validate_json(body).bot_id
+        TranscriptEvent.model_validate_json(body).data.data.text
+
+    def envelope_only():
+        RealtimeEnvelope.model_validate_json(body).bot_id
+
+    def bot_id_then_decode_once():
+        realtime_bot_id(body)
+        decode_realtime_event(body).data.data.text
+
+    def bot_id_only():
+        realtime_bot_id(body)
+
+    def worker_decode():
+        event = decode_realtime_event(body)
+        event.data.data.text
+        event.data.data.start_time
+        event.data.data.end_time
+
+    print(f"transcript.data body: {len(body)} bytes")
+    timings = {}
+    for name, fn in (
+        ("json.loads + dict access (untyped baseline)", baseline),
+        ("envelope + full model (two parses)", envelope_then_model),
+        ("  request path: envelope", envelope_only),
+        ("bot id scan + one tagged-union decode", bot_id_then_decode_once),
+        ("  request path: bot id scan", bot_id_only),
+        ("  worker: typed decode + text and times", worker_decode),
+    ):
+        per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+        timings[fn] = per_call
+        print(f"{name:48s} {per_call:7.1f} us")
+    ratio = timings[worker_decode] / timings[baseline]
+    print(f"worker decode vs untyped baseline: {ratio:.2f}x" + (" (slower: regression)" if ratio > 1 else ""))
+    return 1 if ratio > 1 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Server CPU and bytes per second of model audio on /ws: base64-in-JSON vs binary frames.
+
+Audio goes through the real ConnectionManager and Starlette WebSocket, so
+the numbers include building the message, queueing it, the writer task and
+Starlette's send_json / send_bytes. The ASGI server's socket write is not
+included: the connection's `send` only counts the bytes it is given.
+
+Run from the repo root: python -m bench.ws_audio [--seconds 600] [--chunk-ms 40]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from starlette.websockets import WebSocket
+
+from app.core.manage_connections import ConnectionManager
+
+SAMPLE_RATE = 24000
+BYTES_PER_SAMPLE = 2
+
+
+class _Sink:
+    """The ASGI side of one connection: completes the handshake, then counts what the app sends."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes = 0
+
+    async def receive(self) -> dict:
+        return {"type": "websocket.connect"}
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "websocket.send":
+            self.frames += 1
+            self.bytes += len(message.get("bytes") or b"") + len((message.get("text") or "").encode("utf-8"))
+
+
+async def run_mode(binary: bool, seconds: float, chunk_ms: int) -> dict:
+    cm = ConnectionManager()
+    sink = _Sink()
+    websocket = WebSocket({"type": "websocket", "path": "/ws", "headers": []}, sink.receive, sink.send)
+    await websocket.accept()
+    cm.add_connection("bench", websocket, binary=binary, channel="bot")
+    chunk = os.urandom(SAMPLE_RATE * BYTES_PER_SAMPLE * chunk_ms // 1000)
+    chunks = int(seconds * 1000 / chunk_ms)
+
+    cpu_started = time.process_time()
+    for seq in range(chunks):
+        cm.send_audio(chunk, stream_id=1, seq=seq, channel="bot")
+        # Let the writer keep up, as it does when Gemini streams in real time
+        if seq % 16 == 15:
+            while not cm.active_connections["bench"].queue.empty():
+                await asyncio.sleep(0)
+    while sink.frames < chunks:
+        await asyncio.sleep(0)
+    cpu = time.process_time() - cpu_started
+    cm.remove_connection("bench")
+    return {
+        "cpu_ms_per_audio_second": cpu * 1000 / seconds,
+        "bytes_per_audio_second": sink.bytes / seconds,
+        "frames": sink.frames,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=600.0, help="seconds of audio per mode")
+    parser.add_argument("--chunk-ms", type=int, default=40)
+    args = parser.parse_args()
+
+    pcm_rate = SAMPLE_RATE * BYTES_PER_SAMPLE
+    print(f"{args.seconds:.0f}s of 24 kHz PCM16 mono per mode ({pcm_rate} B/s raw), {args.chunk_ms} ms chunks")
+    for name, binary in (("json + base64", False), ("binary frames", True)):
+        # Best of three, so a stray GC or scheduler hiccup does not decide the result
+        runs = [await run_mode(binary, args.seconds, args.chunk_ms) for _ in range(3)]
+        best = min(runs, key=lambda r: r["cpu_ms_per_audio_second"])
+        print(
+            f"{name:14s} {best['cpu_ms_per_audio_second']:6.3f} ms CPU per audio second, "
+            f"{best['bytes_per_audio_second'] / pcm_rate:5.3f}x raw bytes"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())